@@ -0,0 +1,239 @@
+from datetime import datetime
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from models.model import Subject, Chapter, Quiz, Question
+from admin.response_cache import bump_version
+from near_duplicates import index_rows, minhash, unindex_question
+from signals import quizzes_changed
+
+MODES = ('atomic', 'partial')
+OPTION_FIELDS = ('option1', 'option2', 'option3', 'option4')
+
+
+def _text(max_length, required=True):
+    def parse(value):
+        if value is None and not required:
+            return None
+        if not isinstance(value, str) or (required and not value.strip()):
+            raise ValueError('must be a non-empty string' if required else 'must be a string')
+        if max_length and len(value) > max_length:
+            raise ValueError(f'must be at most {max_length} characters')
+        return value
+    return parse
+
+
+def _integer(value):
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError('must be an integer')
+
+
+def _option_number(value):
+    value = _integer(value)
+    if not 1 <= value <= 4:
+        raise ValueError('must be between 1 and 4')
+    return value
+
+
+def _day(value):
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        raise ValueError('must use YYYY-MM-DD')
+
+
+def _duration(value):
+    try:
+        return datetime.strptime(value, "%H:%M").time()
+    except (TypeError, ValueError):
+        raise ValueError('must use HH:MM')
+
+
+# model name -> (model, {field: parser}, {field: referenced model name}, response cache namespace)
+MODELS = {
+    'subject': (Subject, {'name': _text(100), 'qualification': _integer, 'description': _text(255, required=False)},
+                {}, 'subjects'),
+    'chapter': (Chapter, {'name': _text(100), 'description': _text(255, required=False), 'subject_id': _integer},
+                {'subject_id': 'subject'}, 'chapters'),
+    'quiz': (Quiz, {'chapter_id': _integer, 'date_of_quiz': _day, 'time_duration': _duration,
+                    'remarks': _text(255, required=False)},
+             {'chapter_id': 'chapter'}, 'quizzes'),
+    'question': (Question, {'question_statement': _text(None), **{field: _text(100) for field in OPTION_FIELDS},
+                            'correct_option': _option_number},
+                 {}, None),
+}
+
+
+def _parse(operation):
+    """Validate the shape of one operation; returns ``(model_name, id, values)`` or raises ValueError."""
+    if not isinstance(operation, dict):
+        raise ValueError('Each operation must be an object with model, id and fields.')
+    model_name = operation.get('model')
+    if model_name not in MODELS:
+        raise ValueError(f"model must be one of {', '.join(MODELS)}.")
+    try:
+        row_id = _integer(operation.get('id'))
+    except ValueError:
+        raise ValueError('id must be an integer.')
+    fields = operation.get('fields')
+    if not isinstance(fields, dict) or not fields:
+        raise ValueError('fields must be a non-empty object.')
+
+    parsers = MODELS[model_name][1]
+    unknown = sorted(set(fields) - set(parsers))
+    if unknown:
+        raise ValueError(f"Unknown {model_name} fields: {', '.join(unknown)}.")
+    values = {}
+    for field, value in fields.items():
+        try:
+            values[field] = parsers[field](value)
+        except ValueError as e:
+            raise ValueError(f'{field} {e}.')
+    return model_name, row_id, values
+
+
+def _existing_ids(wanted):
+    """One IN-query per model for every id that is updated or referenced.
+
+    Returns ``{model_name: {id: quiz_id or None}}``; questions carry their quiz
+    so the per-quiz caches can be invalidated without another query.
+    """
+    found = {}
+    for model_name, ids in wanted.items():
+        model = MODELS[model_name][0]
+        if not ids:
+            found[model_name] = {}
+        elif model is Question:
+            found[model_name] = dict(db.session.execute(
+                select(Question.id, Question.quiz_id).where(Question.id.in_(ids))).all())
+        else:
+            found[model_name] = dict.fromkeys(db.session.scalars(select(model.id).where(model.id.in_(ids))))
+    return found
+
+
+def _execute(rows_by_model, partial):
+    """Run the bulk UPDATEs; returns the ``(model_name, id)`` pairs that failed (only in partial mode)."""
+    try:
+        for model_name, rows in rows_by_model.items():
+            if rows:
+                db.session.execute(update(MODELS[model_name][0]), list(rows.values()))
+        db.session.flush()
+        return set()
+    except IntegrityError:
+        db.session.rollback()
+        if not partial:
+            raise
+
+    # Something in the batch broke a constraint; find out which rows by retrying each in a savepoint
+    failed = set()
+    for model_name, rows in rows_by_model.items():
+        for row_id, row in rows.items():
+            try:
+                with db.session.begin_nested():
+                    db.session.execute(update(MODELS[model_name][0]), [row])
+            except IntegrityError:
+                failed.add((model_name, row_id))
+    return failed
+
+
+def _reindex_questions(question_ids):
+    # Bulk UPDATEs skip the ORM events that keep the near-duplicate index current
+    rows = db.session.execute(
+        select(Question.id, Question.question_statement, *[getattr(Question, field) for field in OPTION_FIELDS])
+        .where(Question.id.in_(question_ids))
+    ).all()
+    connection = db.session.connection()
+    for row in rows:
+        unindex_question(connection, row.id)
+    index_rows(connection, {row.id: minhash(row.question_statement, list(row[2:])) for row in rows})
+
+
+def apply_batch(operations, mode='atomic'):
+    """Apply a list of ``{"model", "id", "fields"}`` updates; returns ``(applied, results)``.
+
+    Every referenced id is checked with one IN-query per model, then each
+    model's rows are written with one executemany UPDATE in a single
+    transaction. In ``atomic`` mode any invalid operation (or a constraint
+    failure) leaves the database untouched; in ``partial`` mode only the
+    failing operations are skipped. Several operations on the same row are
+    merged in order.
+    """
+    results = [None] * len(operations)
+    parsed = []
+    for index, operation in enumerate(operations):
+        try:
+            parsed.append((index,) + _parse(operation))
+        except ValueError as e:
+            results[index] = {"index": index, "status": "invalid", "error": str(e)}
+
+    wanted = {model_name: set() for model_name in MODELS}
+    for _, model_name, row_id, values in parsed:
+        wanted[model_name].add(row_id)
+        for field, target in MODELS[model_name][2].items():
+            if field in values:
+                wanted[target].add(values[field])
+    existing = _existing_ids(wanted)
+
+    valid = []
+    for index, model_name, row_id, values in parsed:
+        if row_id not in existing[model_name]:
+            results[index] = {"index": index, "status": "not_found", "model": model_name, "id": row_id,
+                              "error": f"{model_name.capitalize()} {row_id} not found."}
+            continue
+        missing = [f"{target.capitalize()} {values[field]} not found."
+                   for field, target in MODELS[model_name][2].items()
+                   if field in values and values[field] not in existing[target]]
+        if missing:
+            results[index] = {"index": index, "status": "invalid", "model": model_name, "id": row_id,
+                              "error": ' '.join(missing)}
+            continue
+        valid.append((index, model_name, row_id, values))
+
+    if mode == 'atomic' and len(valid) < len(operations):
+        for index, model_name, row_id, _ in valid:
+            results[index] = {"index": index, "status": "skipped", "model": model_name, "id": row_id}
+        return False, results
+
+    rows_by_model = {model_name: {} for model_name in MODELS}
+    for _, model_name, row_id, values in valid:
+        rows_by_model[model_name].setdefault(row_id, {"id": row_id}).update(values)
+
+    question_ids = list(rows_by_model['question'])
+    try:
+        failed = _execute(rows_by_model, partial=mode == 'partial')
+    except IntegrityError:
+        db.session.rollback()
+        for index, model_name, row_id, _ in valid:
+            results[index] = {"index": index, "status": "failed", "model": model_name, "id": row_id,
+                              "error": "Update conflicts with existing data."}
+        return False, results
+
+    updated_questions = [row_id for row_id in question_ids if ('question', row_id) not in failed]
+    reindex = [row_id for row_id in updated_questions
+               if set(rows_by_model['question'][row_id]) & {'question_statement', *OPTION_FIELDS}]
+    if reindex:
+        _reindex_questions(reindex)
+    db.session.commit()
+    db.session.expire_all()
+
+    for index, model_name, row_id, _ in valid:
+        if (model_name, row_id) in failed:
+            results[index] = {"index": index, "status": "failed", "model": model_name, "id": row_id,
+                              "error": "Update conflicts with existing data."}
+        else:
+            results[index] = {"index": index, "status": "updated", "model": model_name, "id": row_id}
+
+    # Core UPDATEs skip the ORM events the caches listen to
+    touched = {(model_name, row_id) for _, model_name, row_id, _ in valid} - failed
+    for namespace in {MODELS[model_name][3] for model_name, _ in touched} - {None}:
+        bump_version(namespace)
+    quizzes_changed({existing['question'][row_id] for row_id in updated_questions} |
+                    {row_id for model_name, row_id in touched if model_name == 'quiz'})
+
+    return bool(touched), results
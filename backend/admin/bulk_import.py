@@ -0,0 +1,211 @@
+import csv
+import io
+import json
+
+from sqlalchemy import insert
+
+from extensions import db
+from models.model import Quiz, Question
+from near_duplicates import BatchDuplicateChecker, index_rows, minhash
+from signals import quizzes_changed
+
+OPTION_FIELDS = ('option1', 'option2', 'option3', 'option4')
+
+
+def _iter_csv(text):
+    # Row 1 is the header, so data rows start at 2 like a spreadsheet would show
+    for row_number, row in enumerate(csv.DictReader(text), start=2):
+        yield row_number, row, None
+
+
+def _iter_jsonl(text):
+    for row_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            yield row_number, None, "Invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Each line must be a JSON object"
+            continue
+        yield row_number, row, None
+
+
+class DecodeFailed(ValueError):
+    """The upload stopped being valid UTF-8 at ``row_number``; nothing after it can be read."""
+
+    def __init__(self, row_number):
+        super().__init__("File is not valid UTF-8")
+        self.row_number = row_number
+
+
+def _decoded(rows):
+    # The decoder works a chunk ahead of the parser, so the bad bytes are at or after the next row
+    row_number = 0
+    try:
+        for row_number, row, error in rows:
+            yield row_number, row, error
+    except UnicodeDecodeError:
+        raise DecodeFailed(row_number + 1) from None
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(row_number, row, error)`` from a CSV or JSON Lines byte stream, one line at a time.
+
+    Raises ``DecodeFailed`` once the stream turns out not to be UTF-8.
+    """
+    text = io.TextIOWrapper(stream, encoding='utf-8', newline='' if fmt == 'csv' else None)
+    if fmt == 'csv':
+        return _decoded(_iter_csv(text))
+    return _decoded(_iter_jsonl(text))
+
+
+def _to_int(value):
+    # JSON gives real ints, CSV gives digit strings; floats and booleans are rejected rather than truncated
+    if isinstance(value, bool):
+        raise ValueError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().lstrip('-').isdigit():
+        return int(value)
+    raise ValueError
+
+
+def validate_row(row):
+    """Apply the same rules as ``create_question`` to one imported row."""
+    quiz_id = row.get('quiz_id')
+    question_statement = row.get('question_statement')
+    options = [row.get(field) for field in OPTION_FIELDS]
+    correct_option = row.get('correct_option')
+
+    if not all([quiz_id, question_statement, correct_option]) or None in options:
+        return None, "Missing required fields"
+
+    try:
+        quiz_id = _to_int(quiz_id)
+        correct_option = _to_int(correct_option)
+    except ValueError:
+        return None, "quiz_id and correct_option must be integers"
+    if not isinstance(question_statement, str) or not all(isinstance(option, str) for option in options):
+        return None, "question_statement and options must be strings"
+
+    values = {
+        "quiz_id": quiz_id,
+        "question_statement": question_statement,
+        "correct_option": correct_option,
+    }
+    values.update(zip(OPTION_FIELDS, options))
+    return values, None
+
+
+class QuestionImporter:
+    """Validates rows as they stream in and inserts them in batched transactions.
+
+    ``duplicates`` is ``off``, ``warn`` (insert but report near-duplicates) or
+    ``reject`` (fail rows that closely match a question in the same chapter).
+    """
+
+    def __init__(self, batch_size=500, max_errors=1000, duplicates='off', threshold=0.8):
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.duplicates = duplicates
+        self.inserted = 0
+        self.failed = 0
+        self.errors = []
+        self.warnings = []
+        self.aborted = None
+        self._pending = []
+        self._quiz_chapters = {}
+        self._checker = BatchDuplicateChecker(threshold)
+
+    def _record_error(self, row_number, message):
+        self.failed += 1
+        # Keep the report bounded no matter how bad the upload is
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row_number, "error": message})
+
+    def add(self, row_number, row, error=None):
+        if error is None:
+            row, error = validate_row(row)
+        if error is not None:
+            self._record_error(row_number, error)
+            return
+        self._pending.append((row_number, row))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._pending:
+            return
+
+        # One IN-query per batch for quiz ids we have not confirmed yet
+        unknown = {row["quiz_id"] for _, row in self._pending} - self._quiz_chapters.keys()
+        if unknown:
+            found = db.session.query(Quiz.id, Quiz.chapter_id).filter(Quiz.id.in_(unknown)).all()
+            self._quiz_chapters.update(found)
+
+        candidates = []
+        for row_number, row in self._pending:
+            if row["quiz_id"] in self._quiz_chapters:
+                signature = minhash(row["question_statement"], [row[field] for field in OPTION_FIELDS])
+                candidates.append((row_number, row, signature))
+            else:
+                self._record_error(row_number, "Quiz not found")
+        self._pending = []
+
+        if self.duplicates != 'off':
+            self._checker.load(signature for _, _, signature in candidates)
+        batch = []
+        signatures = []
+        for row_number, row, signature in candidates:
+            if self.duplicates != 'off':
+                chapter_id = self._quiz_chapters[row["quiz_id"]]
+                matches = self._checker.match(chapter_id, signature)
+                if matches and self.duplicates == 'reject':
+                    self._record_error(row_number, f"Near-duplicate of {_describe(matches[0])}")
+                    continue
+                if matches and len(self.warnings) < self.max_errors:
+                    self.warnings.append({"row": row_number, "near_duplicates": matches})
+                self._checker.remember(row_number, chapter_id, signature)
+            batch.append(row)
+            signatures.append(signature)
+
+        if batch:
+            # RETURNING hands back the new ids in row order so the batch can be indexed in bulk
+            ids = db.session.scalars(
+                insert(Question).returning(Question.id, sort_by_parameter_order=True), batch
+            ).all()
+            index_rows(db.session.connection(), dict(zip(ids, signatures)))
+            db.session.commit()
+            self.inserted += len(batch)
+            # Bulk inserts skip ORM events, so notify the per-quiz caches here
+            quizzes_changed(row["quiz_id"] for row in batch)
+
+    def run(self, rows):
+        try:
+            for row_number, row, error in rows:
+                self.add(row_number, row, error)
+        except DecodeFailed as e:
+            # Rows read before the bad bytes are still imported; the report says where it stopped
+            self._record_error(e.row_number, str(e))
+            self.aborted = str(e)
+        self.flush()
+        return self.report()
+
+    def report(self):
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+            "near_duplicates": self.warnings,
+            "aborted": self.aborted,
+        }
+
+
+def _describe(match):
+    if "question_id" in match:
+        return f"question {match['question_id']}"
+    return f"row {match['row']}"
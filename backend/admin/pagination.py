@@ -0,0 +1,49 @@
+from flask import request, jsonify
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _parse_bool(value, default):
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no', 'off')
+
+
+def keyset_paginate(query, model, collection_name, serialize):
+    """Serve one page of ``query`` using keyset pagination on ``model.id``.
+
+    Reads ``limit``, ``after`` and ``count`` from the query string. Rows are
+    always ordered by id so ``next_cursor`` can be passed back as ``after``.
+    Pass ``count=false`` to skip the ``COUNT(*)`` for the total.
+    """
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+        after = request.args.get('after')
+        after = int(after) if after not in (None, '') else None
+    except ValueError:
+        return jsonify({"message": "limit and after must be integers."}), 400
+
+    if not (1 <= limit <= MAX_PAGE_SIZE):
+        return jsonify({"message": f"limit must be between 1 and {MAX_PAGE_SIZE}."}), 400
+
+    include_total = _parse_bool(request.args.get('count'), True)
+
+    page_query = query
+    if after is not None:
+        page_query = page_query.filter(model.id > after)
+
+    # Fetch one extra row to know whether another page exists
+    rows = page_query.order_by(model.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    payload = {
+        collection_name: [serialize(row) for row in rows],
+        "limit": limit,
+        "next_cursor": rows[-1].id if has_more else None,
+    }
+    if include_total:
+        payload["total"] = query.order_by(None).count()
+
+    return jsonify(payload), 200
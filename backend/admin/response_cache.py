@@ -0,0 +1,118 @@
+import hashlib
+from functools import wraps
+
+from flask import current_app, request, make_response
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from cache import LRUCache
+from config import Config
+from extensions import db, redis_client
+from models.model import CatalogVersion
+
+# Local tier for serialized catalog responses, keyed by route, args and table versions
+response_cache = LRUCache(
+    max_size=Config.RESPONSE_CACHE_MAX_SIZE,
+    ttl=Config.RESPONSE_CACHE_TTL,
+)
+
+
+def _redis():
+    return redis_client if 'redis' in current_app.extensions else None
+
+
+def get_versions(tables):
+    """Current version of each of ``tables``, from Redis or else the ``catalog_versions`` table.
+
+    The counters must be shared by every worker: a bump on one has to change
+    the cache keys and ETags of all of them.
+    """
+    client = _redis()
+    if client is not None:
+        values = client.mget([f'catalog:version:{table}' for table in tables])
+        return 'r', tuple(int(value or 0) for value in values)
+    stored = dict(db.session.execute(
+        select(CatalogVersion.namespace, CatalogVersion.version).where(CatalogVersion.namespace.in_(tables))
+    ).all())
+    return 'db', tuple(stored.get(table, 0) for table in tables)
+
+
+def bump_version(*tables):
+    """Invalidate cached responses for ``tables``. Call after the change is committed.
+
+    Runs in its own transaction, so it also works from ``after_commit`` hooks
+    and never commits anything left in the caller's session.
+    """
+    client = _redis()
+    if client is not None:
+        pipe = client.pipeline()
+        for table in tables:
+            pipe.incr(f'catalog:version:{table}')
+        pipe.execute()
+        return
+    bump = update(CatalogVersion).values(version=CatalogVersion.version + 1)
+    with db.engine.begin() as connection:
+        for table in tables:
+            if connection.execute(bump.where(CatalogVersion.namespace == table)).rowcount:
+                continue
+            try:
+                with connection.begin_nested():
+                    connection.execute(insert(CatalogVersion).values(namespace=table, version=1))
+            except IntegrityError:
+                # Another worker created the row first
+                connection.execute(bump.where(CatalogVersion.namespace == table))
+
+
+def _cached_body(key):
+    body = response_cache.get(key)
+    if body is None:
+        client = _redis()
+        if client is not None:
+            body = client.get(f'catalog:response:{key}')
+            if body is not None:
+                response_cache.set(key, body)
+    return body
+
+
+def _store_body(key, body):
+    response_cache.set(key, body)
+    client = _redis()
+    if client is not None:
+        client.setex(f'catalog:response:{key}', current_app.config['RESPONSE_CACHE_TTL'], body)
+
+
+def cached_response(*tables):
+    """Serve a JSON GET view from cache with a strong ETag derived from ``tables``' versions.
+
+    A matching ``If-None-Match`` gets a 304 before the view or the database is
+    touched. Put it below ``token_required``/``admin_required`` so access is
+    still checked on cache hits.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            namespace, versions = get_versions(tables)
+            params = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+            raw_key = f'{request.endpoint}?{params}|{namespace}|{versions}'
+            key = hashlib.sha1(raw_key.encode('utf-8')).hexdigest()
+
+            if request.if_none_match.contains(key):
+                response = current_app.response_class(status=304)
+                response.set_etag(key)
+                return response
+
+            body = _cached_body(key)
+            if body is None:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                body = response.get_data()
+                _store_body(key, body)
+
+            response = current_app.response_class(body, status=200, mimetype='application/json')
+            response.set_etag(key)
+            # Clients may keep the body but must revalidate with the ETag each time
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated
+    return decorator
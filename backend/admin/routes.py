@@ -1,12 +1,36 @@
+import os
+import shutil
+import tempfile
 from datetime import datetime
-from flask import Blueprint, request, jsonify
-from models.model import Subject, Chapter, Quiz, db, Question
+from flask import Blueprint, request, jsonify, current_app
+from sqlalchemy.orm import joinedload
+from models.model import Subject, Chapter, Quiz, db, Question, Job, User, ArchivedQuiz, ArchivedQuestion, ArchivedScore
 from auth.protected_routes import token_required  # Import the token decorator
+from auth.auth_middleware import admin_required
+from auth.principal_cache import principal_cache
+from admin.pagination import keyset_paginate
+from admin.bulk_import import QuestionImporter, iter_rows
+from admin.batch_update import MODES as BATCH_MODES, apply_batch
+from admin.response_cache import cached_response, bump_version
+from query_budget import query_budget
+from quiz_stats import get_quiz_stats, get_leaderboard
+from database import pool_metrics
+from search import search, search_supported
+from hierarchy import delete_hierarchy
+from archive import (archive_quizzes, default_cutoff, ensure_archive_schema, restore_quiz, soft_delete_quiz,
+                     serialize_archived_quiz, serialize_archived_score)
+from near_duplicates import MODES as DUPLICATE_MODES, duplicate_clusters, find_near_duplicates, minhash
+from jobs.celery_app import enqueue, serialize_job
+from jobs import tasks
 
 
 admin_bp = Blueprint('admin', __name__)
 
 
+def _dry_run():
+    return request.args.get('dry_run') in ('1', 'true')
+
+
 @admin_bp.route('/subjects', methods=['POST'])
 @token_required
 def create_subject(current_user):
@@ -33,6 +57,7 @@ def create_subject(current_user):
     new_subject = Subject(name=name, qualification=qualification, description=description)
     db.session.add(new_subject)
     db.session.commit()
+    bump_version('subjects')
 
     return jsonify({"message": "Subject created successfully.", "subject": {
         "id": new_subject.id,
@@ -43,20 +68,16 @@ def create_subject(current_user):
 
 
 @admin_bp.route('/subjects', methods=['GET'])
+@query_budget(4)
 @token_required
+@admin_required
+@cached_response('subjects')
 def list_subjects(current_user):
-    print(current_user.is_admin)
-    if not current_user.is_admin:
-        return jsonify({"message": "Admin access required."}), 403
-
-    subjects = Subject.query.all()
-    subject_list = [{
+    return keyset_paginate(Subject.query, Subject, "subjects", lambda subject: {
         "id": subject.id,
         "name": subject.name,
         "qualification": subject.qualification
-    } for subject in subjects]
-
-    return jsonify({"subjects": subject_list}), 200
+    })
 
 @admin_bp.route('/subjects/<int:subject_id>', methods=['PUT'])
 @token_required
@@ -73,6 +94,7 @@ def update_subject(current_user, subject_id):
     subject.qualification = data.get('qualification', subject.qualification)
 
     db.session.commit()
+    bump_version('subjects')
 
     return jsonify({"message": "Subject updated successfully.", "subject": {
         "id": subject.id,
@@ -90,10 +112,13 @@ def delete_subject(current_user, subject_id):
     if not subject:
         return jsonify({"message": "Subject not found."}), 404
 
-    db.session.delete(subject)
-    db.session.commit()
+    if _dry_run():
+        return jsonify({"dry_run": True, "counts": delete_hierarchy('subject', [subject_id], dry_run=True)}), 200
+
+    # Deleting a whole subtree can be slow, so it runs as a background job
+    job = enqueue(tasks.delete_subject, 'delete_subject', current_user.id, args=(subject_id,))
 
-    return jsonify({"message": "Subject deleted successfully."}), 200
+    return jsonify({"message": "Subject deletion queued.", "job": serialize_job(job)}), 202
 
 
 
@@ -129,6 +154,7 @@ def create_chapter(current_user):
     new_chapter = Chapter(name=name, description=description, subject_id=subject_id)
     db.session.add(new_chapter)
     db.session.commit()
+    bump_version('chapters')
 
     return jsonify({"message": "Chapter created successfully", "chapter": {
         "id": new_chapter.id,
@@ -138,13 +164,14 @@ def create_chapter(current_user):
     }}), 201
 
 @admin_bp.route('/chapters', methods=['GET'])
+@query_budget(4)
 @token_required
+@admin_required
+@cached_response('chapters', 'subjects')
 def list_chapters(current_user):
-    if not current_user.is_admin:
-        return jsonify({"message": "Admin access required."}), 403
-
-    chapters = Chapter.query.all()
-    chapter_list = [{
+    # Load each chapter's subject in the same SELECT instead of one query per row
+    chapters = Chapter.query.options(joinedload(Chapter.subject))
+    return keyset_paginate(chapters, Chapter, "chapters", lambda chapter: {
         "id": chapter.id,
         "name": chapter.name,
         "description": chapter.description,
@@ -154,9 +181,7 @@ def list_chapters(current_user):
             "qualification": chapter.subject.qualification,
             "description": chapter.subject.description  
         }
-    } for chapter in chapters]
-
-    return jsonify({"chapters": chapter_list}), 200
+    })
 
 
 @admin_bp.route('/chapters/<int:chapter_id>', methods=['PUT'])
@@ -183,6 +208,7 @@ def update_chapter(current_user, chapter_id):
         chapter.subject_id = new_subject_id
 
     db.session.commit()
+    bump_version('chapters')
 
     return jsonify({"message": "Chapter updated successfully.", "chapter": {
         "id": chapter.id,
@@ -201,10 +227,12 @@ def delete_chapter(current_user, chapter_id):
     if not chapter:
         return jsonify({"message": "Chapter not found."}), 404
 
-    db.session.delete(chapter)
-    db.session.commit()
+    if _dry_run():
+        return jsonify({"dry_run": True, "counts": delete_hierarchy('chapter', [chapter_id], dry_run=True)}), 200
+
+    job = enqueue(tasks.delete_chapter, 'delete_chapter', current_user.id, args=(chapter_id,))
 
-    return jsonify({"message": "Chapter deleted successfully."}), 200
+    return jsonify({"message": "Chapter deletion queued.", "job": serialize_job(job)}), 202
 
 
 # quiz crud implementation--------------
@@ -245,6 +273,7 @@ def create_quiz(current_user):
     )
     db.session.add(new_quiz)
     db.session.commit()
+    bump_version('quizzes')
 
     return jsonify({"message": "Quiz created successfully.", "quiz": {
         "id": new_quiz.id,
@@ -256,21 +285,24 @@ def create_quiz(current_user):
 
 
 @admin_bp.route('/quizzes', methods=['GET'])
+@query_budget(4)
 @token_required
+@admin_required
+@cached_response('quizzes')
 def list_quizzes(current_user):
-    if not current_user.is_admin:
-        return jsonify({"message": "Admin access required."}), 403
+    # Soft-deleted quizzes are hidden unless asked for
+    query = Quiz.query
+    if request.args.get('include_deleted') not in ('1', 'true'):
+        query = query.filter(Quiz.deleted_at.is_(None))
 
-    quizzes = Quiz.query.all()
-    quiz_list = [{
+    return keyset_paginate(query, Quiz, "quizzes", lambda quiz: {
         "id": quiz.id,
         "chapter_id": quiz.chapter_id,
         "date_of_quiz": str(quiz.date_of_quiz),
         "time_duration": str(quiz.time_duration),
-        "remarks": quiz.remarks
-    } for quiz in quizzes]
-
-    return jsonify({"quizzes": quiz_list}), 200
+        "remarks": quiz.remarks,
+        "deleted_at": quiz.deleted_at.isoformat() if quiz.deleted_at else None
+    })
 
 
 @admin_bp.route('/quizzes/<int:quiz_id>', methods=['PUT'])
@@ -308,6 +340,7 @@ def update_quiz(current_user, quiz_id):
         quiz.chapter_id = data['chapter_id']
 
     db.session.commit()
+    bump_version('quizzes')
 
     return jsonify({"message": "Quiz updated successfully.", "quiz": {
         "id": quiz.id,
@@ -318,6 +351,33 @@ def update_quiz(current_user, quiz_id):
     }}), 200
 
 
+@admin_bp.route('/quizzes/<int:quiz_id>/stats', methods=['GET'])
+@token_required
+def quiz_stats(current_user, quiz_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    return jsonify({"stats": get_quiz_stats(quiz_id)}), 200
+
+
+@admin_bp.route('/quizzes/<int:quiz_id>/leaderboard', methods=['GET'])
+@token_required
+def quiz_leaderboard(current_user, quiz_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    top_k = current_app.config['QUIZ_STATS_TOP_K']
+    try:
+        limit = int(request.args.get('limit', top_k))
+    except ValueError:
+        return jsonify({"message": "limit must be an integer."}), 400
+    # Only the top K scores are kept per quiz
+    if not 1 <= limit <= top_k:
+        return jsonify({"message": f"limit must be between 1 and {top_k}."}), 400
+
+    return jsonify({"quiz_id": quiz_id, "leaderboard": get_leaderboard(quiz_id, limit)}), 200
+
+
 @admin_bp.route('/quizzes/<int:quiz_id>', methods=['DELETE'])
 @token_required
 def delete_quiz(current_user, quiz_id):
@@ -328,11 +388,33 @@ def delete_quiz(current_user, quiz_id):
     if not quiz:
         return jsonify({"message": "Quiz not found."}), 404
 
-    db.session.delete(quiz)
-    db.session.commit()
+    # ?soft=1 only hides the quiz and its scores; archiving removes them later
+    if request.args.get('soft') in ('1', 'true'):
+        soft_delete_quiz(quiz_id)
+        return jsonify({"message": "Quiz soft-deleted."}), 200
+
+    if _dry_run():
+        return jsonify({"dry_run": True, "counts": delete_hierarchy('quiz', [quiz_id], dry_run=True)}), 200
+
+    counts = delete_hierarchy('quiz', [quiz_id])
+
+    return jsonify({"message": "Quiz deleted successfully.", "counts": counts}), 200
+
+
+@admin_bp.route('/quizzes/<int:quiz_id>/restore', methods=['POST'])
+@token_required
+def restore_deleted_quiz(current_user, quiz_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
 
-    return jsonify({"message": "Quiz deleted successfully."}), 200
+    quiz = Quiz.query.get(quiz_id)
+    if not quiz:
+        return jsonify({"message": "Quiz not found."}), 404
+    if quiz.deleted_at is None:
+        return jsonify({"message": "Quiz is not deleted."}), 400
 
+    restore_quiz(quiz_id)
+    return jsonify({"message": "Quiz restored."}), 200
 
 
 
@@ -351,11 +433,23 @@ def create_question(current_user):
     if not all([quiz_id, question_statement, correct_option]) or None in options:
         return jsonify({"error": "Missing required fields"}), 400
 
+    duplicates = request.args.get('duplicates', current_app.config['NEAR_DUPLICATE_MODE'])
+    if duplicates not in DUPLICATE_MODES:
+        return jsonify({"error": "duplicates must be off, warn or reject"}), 400
+
     # Validate quiz exists
     quiz = Quiz.query.get(quiz_id)
     if not quiz:
         return jsonify({"error": "Quiz not found"}), 404
 
+    near_duplicates = []
+    if duplicates != 'off':
+        near_duplicates = find_near_duplicates(minhash(question_statement, options), quiz.chapter_id,
+                                               current_app.config['NEAR_DUPLICATE_THRESHOLD'])
+        if near_duplicates and duplicates == 'reject':
+            return jsonify({"error": "A near-duplicate question already exists in this chapter",
+                            "near_duplicates": near_duplicates}), 409
+
     new_question = Question(
         quiz_id=quiz_id,
         question_statement=question_statement,
@@ -369,32 +463,92 @@ def create_question(current_user):
     db.session.add(new_question)
     db.session.commit()
 
-    return jsonify({"message": "Question added successfully", "question_id": new_question.id}), 201
+    response = {"message": "Question added successfully", "question_id": new_question.id}
+    if near_duplicates:
+        response["near_duplicates"] = near_duplicates
+    return jsonify(response), 201
+
+
+@admin_bp.route('/questions/bulk', methods=['POST'])
+@token_required
+def bulk_create_questions(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    # Format comes from ?format= or the Content-Type; the body is read as a stream
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'csv' if request.mimetype == 'text/csv' else 'jsonl'
+    if fmt not in ('csv', 'jsonl'):
+        return jsonify({"message": "format must be csv or jsonl."}), 400
+
+    try:
+        batch_size = int(request.args.get('batch_size', current_app.config['QUESTION_IMPORT_BATCH_SIZE']))
+    except ValueError:
+        return jsonify({"message": "batch_size must be an integer."}), 400
+    if batch_size < 1:
+        return jsonify({"message": "batch_size must be at least 1."}), 400
+
+    duplicates = request.args.get('duplicates', current_app.config['NEAR_DUPLICATE_MODE'])
+    if duplicates not in DUPLICATE_MODES:
+        return jsonify({"message": "duplicates must be off, warn or reject."}), 400
+    threshold = current_app.config['NEAR_DUPLICATE_THRESHOLD']
+
+    # ?async=1 spools the upload to disk in chunks and imports it as a job
+    if request.args.get('async') in ('1', 'true'):
+        fd, path = tempfile.mkstemp(prefix='questions-', suffix='.' + fmt, dir=current_app.config['JOB_SPOOL_DIR'])
+        with os.fdopen(fd, 'wb') as spool:
+            shutil.copyfileobj(request.stream, spool)
+        job = enqueue(tasks.import_questions, 'import_questions', current_user.id, args=(path, fmt, batch_size, duplicates, threshold))
+        return jsonify({"message": "Bulk import queued.", "job": serialize_job(job)}), 202
+
+    importer = QuestionImporter(batch_size=batch_size, duplicates=duplicates, threshold=threshold)
+    report = importer.run(iter_rows(request.stream, fmt))
+    if report["aborted"]:
+        return jsonify({"message": "Bulk import stopped: " + report["aborted"], **report}), 400
+
+    return jsonify({"message": "Bulk import finished.", **report}), 200
 
 
 @admin_bp.route('/questions', methods=['GET'])
+@query_budget(3)
 @token_required
 def get_all_questions(current_user):
-    questions = Question.query.all()
-    
-    question_list = [
-        {
-            "id": q.id,
-            "quiz_id": q.quiz_id,
-            "question_statement": q.question_statement,
-            "options": [q.option1, q.option2, q.option3, q.option4],
-            "correct_option": q.correct_option
-        }
-        for q in questions
-    ]
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    return keyset_paginate(Question.query, Question, "questions", lambda q: {
+        "id": q.id,
+        "quiz_id": q.quiz_id,
+        "question_statement": q.question_statement,
+        "options": [q.option1, q.option2, q.option3, q.option4],
+        "correct_option": q.correct_option
+    })
+
 
-    return jsonify({"questions": question_list}), 200
 
+@admin_bp.route('/questions/duplicates', methods=['GET'])
+@token_required
+def get_duplicate_questions(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    chapter_id = request.args.get('chapter_id', type=int)
+    threshold = request.args.get('threshold', current_app.config['NEAR_DUPLICATE_THRESHOLD'], type=float)
+    limit = min(request.args.get('limit', 100, type=int), 500)
+    if not 0 < threshold <= 1:
+        return jsonify({"message": "threshold must be between 0 and 1."}), 400
+
+    clusters = duplicate_clusters(threshold, chapter_id=chapter_id, limit=limit)
+    return jsonify({"threshold": threshold, "clusters": clusters}), 200
 
 
 @admin_bp.route('/questions/<int:question_id>', methods=['GET'])
 @token_required
 def get_question_by_id(current_user, question_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
     question = Question.query.get(question_id)
     
     if not question:
@@ -445,4 +599,222 @@ def delete_question(current_user, question_id):
     db.session.delete(question)
     db.session.commit()
     
-    return jsonify({"message": "Question deleted successfully"}), 200
\ No newline at end of file
+    return jsonify({"message": "Question deleted successfully"}), 200
+
+
+# search----------------------------------
+@admin_bp.route('/search', methods=['GET'])
+@token_required
+def search_catalog(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    if not search_supported():
+        return jsonify({"message": "Search is only available on SQLite (FTS5)."}), 501
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"message": "q is required."}), 400
+
+    kind = request.args.get('kind')
+    if kind not in (None, 'question', 'chapter', 'subject'):
+        return jsonify({"message": "kind must be question, chapter or subject."}), 400
+
+    try:
+        subject_id = request.args.get('subject_id', type=int)
+        qualification = request.args.get('qualification', type=int)
+        quiz_id = request.args.get('quiz_id', type=int)
+        limit = int(request.args.get('limit', 20))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"message": "limit and offset must be integers."}), 400
+    if not (1 <= limit <= 100) or offset < 0:
+        return jsonify({"message": "limit must be between 1 and 100 and offset not negative."}), 400
+
+    results, has_more = search(query, kind=kind, subject_id=subject_id, qualification=qualification,
+                               quiz_id=quiz_id, limit=limit, offset=offset)
+
+    return jsonify({
+        "results": results,
+        "limit": limit,
+        "offset": offset,
+        "next_offset": offset + limit if has_more else None
+    }), 200
+
+
+# batch updates-----------------------
+@admin_bp.route('/batch', methods=['PATCH'])
+@token_required
+def batch_update(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    data = request.get_json() or {}
+    operations = data.get('operations')
+    mode = data.get('mode', 'atomic')
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"message": "operations must be a non-empty list."}), 400
+    if len(operations) > current_app.config['BATCH_UPDATE_MAX_OPERATIONS']:
+        return jsonify({"message": f"At most {current_app.config['BATCH_UPDATE_MAX_OPERATIONS']} operations per batch."}), 400
+    if mode not in BATCH_MODES:
+        return jsonify({"message": f"mode must be one of {', '.join(BATCH_MODES)}."}), 400
+
+    applied, results = apply_batch(operations, mode)
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    # Atomic batches that changed nothing report why with a 422
+    status = 422 if mode == 'atomic' and not applied else 200
+    return jsonify({"mode": mode, "applied": applied, "summary": summary, "results": results}), status
+
+
+# users-----------------------
+@admin_bp.route('/users/<int:user_id>/revoke-tokens', methods=['POST'])
+@token_required
+def revoke_user_tokens(current_user, user_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        return jsonify({"message": "User not found."}), 404
+
+    # Every token carrying an older version is rejected from now on
+    user.token_version = (user.token_version or 0) + 1
+    db.session.commit()
+    return jsonify({"message": "Tokens revoked.", "token_version": user.token_version}), 200
+
+
+# cache statistics-----------------------
+@admin_bp.route('/cache/principals', methods=['GET'])
+@token_required
+def principal_cache_stats(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    return jsonify({"principal_cache": principal_cache.stats()}), 200
+
+
+@admin_bp.route('/db/pool', methods=['GET'])
+@token_required
+def db_pool_stats(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    return jsonify({"pool": pool_metrics.snapshot(db.engine.pool)}), 200
+
+
+# background jobs-----------------------
+@admin_bp.route('/jobs/<job_id>', methods=['GET'])
+@token_required
+def get_job(current_user, job_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    job = Job.query.get(job_id)
+    if not job:
+        return jsonify({"message": "Job not found."}), 404
+
+    return jsonify({"job": serialize_job(job)}), 200
+
+
+@admin_bp.route('/reports/quiz-stats', methods=['POST'])
+@token_required
+def queue_quiz_stats_report(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    job = enqueue(tasks.quiz_stats_report, 'quiz_stats_report', current_user.id)
+    return jsonify({"message": "Report queued.", "job": serialize_job(job)}), 202
+
+
+@admin_bp.route('/reports/quiz-stats/rebuild', methods=['POST'])
+@token_required
+def queue_quiz_stats_rebuild(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    check_only = request.args.get('check') in ('1', 'true')
+    job = enqueue(tasks.rebuild_quiz_stats, 'rebuild_quiz_stats', current_user.id, args=(check_only,))
+    return jsonify({"message": "Stats rebuild queued.", "job": serialize_job(job)}), 202
+
+
+# archive (read-only, plus the job that fills it)---------
+
+def _parse_day(value):
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+@admin_bp.route('/archive/quizzes', methods=['POST'])
+@token_required
+def queue_archive_quizzes(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    data = request.get_json(silent=True) or {}
+    try:
+        before = _parse_day(data['before']) if data.get('before') else default_cutoff()
+    except ValueError:
+        return jsonify({"message": "Invalid date format. Use YYYY-MM-DD."}), 400
+
+    if _dry_run():
+        return jsonify(archive_quizzes(before=before, dry_run=True)), 200
+
+    job = enqueue(tasks.archive_quizzes, 'archive_quizzes', current_user.id, args=(before.isoformat(),))
+    return jsonify({"message": "Archiving queued.", "job": serialize_job(job)}), 202
+
+
+@admin_bp.route('/archive/quizzes', methods=['GET'])
+@token_required
+def list_archived_quizzes(current_user):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    ensure_archive_schema()
+    query = ArchivedQuiz.query
+    try:
+        for arg, column in (('subject_id', ArchivedQuiz.subject_id), ('chapter_id', ArchivedQuiz.chapter_id)):
+            if request.args.get(arg):
+                query = query.filter(column == int(request.args[arg]))
+        if request.args.get('date_from'):
+            query = query.filter(ArchivedQuiz.date_of_quiz >= _parse_day(request.args['date_from']))
+        if request.args.get('date_to'):
+            query = query.filter(ArchivedQuiz.date_of_quiz <= _parse_day(request.args['date_to']))
+    except ValueError:
+        return jsonify({"message": "Invalid filter. Ids are integers and dates use YYYY-MM-DD."}), 400
+
+    return keyset_paginate(query, ArchivedQuiz, "quizzes", serialize_archived_quiz)
+
+
+@admin_bp.route('/archive/quizzes/<int:quiz_id>', methods=['GET'])
+@token_required
+def get_archived_quiz(current_user, quiz_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    ensure_archive_schema()
+    quiz = db.session.get(ArchivedQuiz, quiz_id)
+    if quiz is None:
+        return jsonify({"message": "Archived quiz not found."}), 404
+
+    questions = ArchivedQuestion.query.filter_by(quiz_id=quiz_id).order_by(ArchivedQuestion.id).all()
+    return jsonify({"quiz": {
+        **serialize_archived_quiz(quiz),
+        "questions": [{
+            "id": question.id,
+            "question_statement": question.question_statement,
+            "options": [question.option1, question.option2, question.option3, question.option4],
+            "correct_option": question.correct_option
+        } for question in questions]
+    }}), 200
+
+
+@admin_bp.route('/archive/quizzes/<int:quiz_id>/scores', methods=['GET'])
+@token_required
+def get_archived_quiz_scores(current_user, quiz_id):
+    if not current_user.is_admin:
+        return jsonify({"message": "Admin access required."}), 403
+
+    ensure_archive_schema()
+    query = ArchivedScore.query.filter_by(quiz_id=quiz_id)
+    return keyset_paginate(query, ArchivedScore, "scores", serialize_archived_score)
@@ -1,28 +1,99 @@
+import click
 from flask import Flask
-from extensions import db
-from models.model import User, Subject, Chapter, Quiz, Question, Score
-from auth.routes import auth_bp
-from admin.routes import admin_bp
-from auth.protected_routes import protected_bp  # Import authentication routes
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from flask.cli import ScriptInfo
+from extensions import redis_client
+from database import init_database, init_migrations
 
-app = Flask(__name__)
-app.config.from_object('config.Config')
 
-# Initialize Extensions
-db.init_app(app)
-migrate = Migrate(app, db)
+def create_app(config='config.Config', **overrides):
+    """Build the Flask app from ``config`` (an object or import path) plus keyword overrides.
 
-# Register Blueprints
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(protected_bp, url_prefix='/protected')
-app.register_blueprint(admin_bp, url_prefix='/admin')
+    Blueprints, models and CLI groups are imported here rather than at module
+    import, so ``import app`` stays cheap. Nothing connects to the database
+    while building: the schema is managed only by ``flask db upgrade``, which
+    keeps the factory safe to call in a preloading master before forking.
+    Serve with ``gunicorn --preload 'app:create_app()'``.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.config.update(overrides)
+    if app.config['JWT_STATELESS'] and not app.config['REDIS_URL']:
+        # Token versions must be shared, or other workers keep honouring revoked tokens
+        raise RuntimeError('JWT_STATELESS requires REDIS_URL')
+    if app.config['QUIZ_SESSIONS'] == 'redis' and not app.config['REDIS_URL']:
+        # A session started on one worker would be unknown to the others
+        raise RuntimeError('QUIZ_SESSIONS=redis requires REDIS_URL')
 
+    # Deferred to here so importing this module does not load the whole application
+    import models  # noqa: F401
+    from auth.routes import auth_bp
+    from auth.protected_routes import protected_bp
+    from admin.routes import admin_bp
+    from user.routes import user_bp
+    from query_budget import init_query_budget
+    from metrics import init_metrics
+    from profiler import init_profiler
+    from rate_limit import init_rate_limits
+    from jobs.celery_app import celery_init_app
+
+    if app.config['TRUSTED_PROXY_COUNT']:
+        # Client addresses (e.g. for per-ip rate limits) come from the trusted proxies' headers
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        count = app.config['TRUSTED_PROXY_COUNT']
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=count, x_proto=count)
+
+    # Initialize Extensions
+    init_database(app)
+    if app.config['REDIS_URL']:
+        redis_client.init_app(app)
+    init_query_budget(app)
+    init_metrics(app)
+    init_profiler(app)
+    init_rate_limits(app)
+    celery_init_app(app)
+
+    # Register Blueprints
+    app.register_blueprint(auth_bp, url_prefix='/auth')
+    app.register_blueprint(protected_bp, url_prefix='/protected')
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    app.register_blueprint(user_bp, url_prefix='/user')
+
+    # Alembic is the largest import in the tree and only the flask CLI needs it. Other click
+    # programs (``celery -A app.celery_app worker``) also have a context, but no ScriptInfo.
+    if _running_flask_cli():
+        from quiz_stats import stats_cli
+        from search import search_cli
+        from near_duplicates import duplicates_cli
+        from archive import archive_cli
+        from score_writer import scores_cli
+
+        init_migrations(app)
+        app.cli.add_command(stats_cli)
+        app.cli.add_command(search_cli)
+        app.cli.add_command(duplicates_cli)
+        app.cli.add_command(archive_cli)
+        app.cli.add_command(scores_cli)
+
+    return app
+
+
+def _running_flask_cli():
+    context = click.get_current_context(silent=True)
+    return context is not None and context.find_object(ScriptInfo) is not None
+
+
+_default = {}
+
+
+def __getattr__(name):
+    # ``app.app`` and ``app.celery_app`` (celery -A app.celery_app worker) build the default app on first access
+    if name not in ('app', 'celery_app'):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if not _default:
+        _default['app'] = create_app()
+        _default['celery_app'] = _default['app'].extensions['celery']
+    return _default[name]
 
-# Create the database tables
-with app.app_context():
-    db.create_all()
 
 if __name__ == "__main__":
-    app.run(debug=True)
+    create_app().run(debug=True)
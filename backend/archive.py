@@ -0,0 +1,171 @@
+from datetime import date, datetime, timedelta
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import func, or_, select
+
+from extensions import db
+from models.model import (Subject, Chapter, Quiz, Question, Score,
+                          ArchivedQuiz, ArchivedQuestion, ArchivedScore)
+from admin.response_cache import bump_version
+from hierarchy import delete_hierarchy
+from signals import quizzes_changed
+
+_ARCHIVE_TABLES = [ArchivedQuiz.__table__, ArchivedQuestion.__table__, ArchivedScore.__table__]
+_schema_ready = set()
+
+
+def archive_engine():
+    return db.engines['archive']
+
+
+def ensure_archive_schema():
+    # The archive bind is outside the Alembic-managed database; create its tables on first use
+    engine = archive_engine()
+    if engine.url not in _schema_ready:
+        db.metadatas['archive'].create_all(engine)
+        _schema_ready.add(engine.url)
+
+
+def default_cutoff():
+    return date.today() - timedelta(days=current_app.config['ARCHIVE_AFTER_DAYS'])
+
+
+def _candidates(before):
+    # Quizzes past the cutoff, plus soft-deleted ones of any age
+    return select(Quiz.id).where(or_(Quiz.date_of_quiz < before, Quiz.deleted_at.isnot(None)))
+
+
+def _copy_batch(quiz_ids, connection, chunk_size=1000):
+    """Copy quizzes, questions and scores into the archive; returns ``(questions, scores)`` counts."""
+    quizzes = db.session.execute(
+        select(Quiz.id, Quiz.chapter_id, Chapter.name.label('chapter_name'),
+               Subject.id.label('subject_id'), Subject.name.label('subject_name'), Subject.qualification,
+               Quiz.date_of_quiz, Quiz.time_duration, Quiz.remarks, Quiz.created_at, Quiz.deleted_at)
+        .join(Chapter, Chapter.id == Quiz.chapter_id)
+        .join(Subject, Subject.id == Chapter.subject_id)
+        .where(Quiz.id.in_(quiz_ids))
+    ).mappings().all()
+
+    # Replacing what is there keeps a re-run after a partial failure idempotent
+    for table in _ARCHIVE_TABLES:
+        column = table.c.id if table is ArchivedQuiz.__table__ else table.c.quiz_id
+        connection.execute(table.delete().where(column.in_(quiz_ids)))
+    now = datetime.utcnow()
+    connection.execute(ArchivedQuiz.__table__.insert(), [dict(row, archived_at=now) for row in quizzes])
+
+    counts = []
+    for model, target in ((Question, ArchivedQuestion), (Score, ArchivedScore)):
+        copied = 0
+        columns = [model.__table__.c[column.name] for column in target.__table__.columns]
+        result = db.session.execute(
+            select(*columns).where(model.quiz_id.in_(quiz_ids)).execution_options(yield_per=chunk_size)
+        )
+        for rows in result.mappings().partitions():
+            connection.execute(target.__table__.insert(), [dict(row) for row in rows])
+            copied += len(rows)
+        counts.append(copied)
+    return tuple(counts)
+
+
+def archive_quizzes(before=None, batch_size=None, dry_run=False):
+    """Move quizzes dated before ``before`` (and all soft-deleted ones) to the archive database.
+
+    Each batch is committed to the archive first and only then removed from
+    the live tables with ``delete_hierarchy``, so a crash in between leaves a
+    duplicate that the next run overwrites rather than a gap.
+    """
+    before = before or default_cutoff()
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+    candidates = _candidates(before).subquery()
+
+    if dry_run:
+        counts = db.session.execute(select(
+            select(func.count()).select_from(candidates).scalar_subquery().label('quizzes'),
+            select(func.count(Question.id)).where(Question.quiz_id.in_(select(candidates.c.id)))
+            .scalar_subquery().label('questions'),
+            select(func.count(Score.id)).where(Score.quiz_id.in_(select(candidates.c.id)))
+            .scalar_subquery().label('scores'),
+        )).one()
+        return {"before": before.isoformat(), "dry_run": True, **counts._mapping}
+
+    ensure_archive_schema()
+    totals = {"quizzes": 0, "questions": 0, "scores": 0}
+    while True:
+        quiz_ids = db.session.scalars(_candidates(before).order_by(Quiz.id).limit(batch_size)).all()
+        if not quiz_ids:
+            break
+        with archive_engine().begin() as connection:
+            questions, scores = _copy_batch(quiz_ids, connection)
+        delete_hierarchy('quiz', quiz_ids)
+        totals["quizzes"] += len(quiz_ids)
+        totals["questions"] += questions
+        totals["scores"] += scores
+    return {"before": before.isoformat(), "dry_run": False, **totals}
+
+
+def soft_delete_quiz(quiz_id):
+    """Hide a quiz and its scores without removing them; the next archive run moves them out."""
+    now = datetime.utcnow()
+    db.session.execute(Quiz.__table__.update()
+                       .where(Quiz.id == quiz_id, Quiz.deleted_at.is_(None)).values(deleted_at=now))
+    db.session.execute(Score.__table__.update()
+                       .where(Score.quiz_id == quiz_id, Score.deleted_at.is_(None)).values(deleted_at=now))
+    db.session.commit()
+    _quiz_visibility_changed(quiz_id)
+
+
+def restore_quiz(quiz_id):
+    db.session.execute(Quiz.__table__.update().where(Quiz.id == quiz_id).values(deleted_at=None))
+    db.session.execute(Score.__table__.update().where(Score.quiz_id == quiz_id).values(deleted_at=None))
+    db.session.commit()
+    _quiz_visibility_changed(quiz_id)
+
+
+def _quiz_visibility_changed(quiz_id):
+    # Core UPDATEs skip the ORM events the per-quiz caches listen to
+    db.session.expire_all()
+    quizzes_changed([quiz_id])
+    bump_version('quizzes')
+
+
+def serialize_archived_quiz(quiz):
+    return {
+        "id": quiz.id,
+        "chapter_id": quiz.chapter_id,
+        "chapter_name": quiz.chapter_name,
+        "subject_id": quiz.subject_id,
+        "subject_name": quiz.subject_name,
+        "qualification": quiz.qualification,
+        "date_of_quiz": str(quiz.date_of_quiz),
+        "time_duration": str(quiz.time_duration),
+        "remarks": quiz.remarks,
+        "deleted_at": quiz.deleted_at.isoformat() if quiz.deleted_at else None,
+        "archived_at": quiz.archived_at.isoformat() if quiz.archived_at else None
+    }
+
+
+def serialize_archived_score(score):
+    return {
+        "id": score.id,
+        "quiz_id": score.quiz_id,
+        "user_id": score.user_id,
+        "total_scored": score.total_scored,
+        "time_stamp_of_attempt": score.time_stamp_of_attempt.isoformat() if score.time_stamp_of_attempt else None,
+        "archived": True
+    }
+
+
+archive_cli = AppGroup('archive', help='Move old quizzes into the archive database.')
+
+
+@archive_cli.command('quizzes')
+@click.option('--before', type=click.DateTime(formats=['%Y-%m-%d']), default=None,
+              help='Archive quizzes dated before this day (default: ARCHIVE_AFTER_DAYS ago).')
+@click.option('--dry-run', is_flag=True, help='Only count what would be archived.')
+def archive_command(before, dry_run):
+    report = archive_quizzes(before=before.date() if before else None, dry_run=dry_run)
+    prefix = 'Would archive' if dry_run else 'Archived'
+    click.echo(f"{prefix} {report['quizzes']} quizzes, {report['questions']} questions "
+               f"and {report['scores']} scores dated before {report['before']}")
@@ -1,8 +1,10 @@
 from functools import wraps
-from flask import request, jsonify
+from flask import request, jsonify, g
 import jwt
 from config import Config
-from models.model import User
+from auth.principal_cache import load_principal, TokenPrincipal
+from auth.revocation import revocation_list, token_versions
+from metrics import JWT_DECODE_SECONDS
 
 # Token Required Decorator
 def token_required(f):
@@ -19,12 +21,31 @@ def token_required(f):
         
         try:
             # Decode the token using the secret key
-            data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
-            current_user = User.query.filter_by(id=data['user_id']).first()
+            with JWT_DECODE_SECONDS.time():
+                data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token has expired!'}), 401
         except jwt.InvalidTokenError:
             return jsonify({'message': 'Invalid token!'}), 401
+
+        if 'jti' in data and revocation_list.is_revoked(data['jti'], data['exp']):
+            return jsonify({'message': 'Token has been revoked!'}), 401
+
+        if Config.JWT_STATELESS and 'adm' in data:
+            # Trust the signed claims; only the version map is consulted, never the users table
+            if data.get('ver', 0) < token_versions.current(data['user_id']):
+                return jsonify({'message': 'Token has been revoked!'}), 401
+            current_user = TokenPrincipal(data)
+        else:
+            # The cached principal may predate a logout-all or role change made on another worker
+            if token_versions.shared() and data.get('ver', 0) < token_versions.current(data['user_id']):
+                return jsonify({'message': 'Token has been revoked!'}), 401
+            current_user = load_principal(data['user_id'], token, data.get('exp'))
+            if current_user is None:
+                return jsonify({'message': 'Invalid token!'}), 401
+            if data.get('ver', 0) < (current_user.token_version or 0):
+                return jsonify({'message': 'Token has been revoked!'}), 401
+        g.token_claims = data
         
         # Pass the user to the endpoint
         return f(current_user, *args, **kwargs)
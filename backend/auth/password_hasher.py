@@ -0,0 +1,102 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+
+import bcrypt
+from flask import current_app
+
+from metrics import BCRYPT_SECONDS
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full or a job did not finish in time."""
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, hashed):
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread or process pool.
+
+    The calling request thread still waits for the result: the pool bounds
+    how many hashes run at once, not how many workers are blocked. At most
+    ``max_pending`` jobs may be queued or running; beyond that callers get
+    ``HasherBusy`` (a 503) immediately, and a caller that waited ``timeout``
+    seconds gets it too, so no request blocks longer than that.
+    """
+
+    def __init__(self, executor='thread', workers=4, max_pending=64, rounds=12, timeout=10):
+        self.rounds = rounds
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending)
+        if executor == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        elif executor == 'thread':
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        else:
+            self._executor = None  # 'inline': hash on the calling thread
+
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy('Password hashing queue is full')
+        try:
+            future = self._executor.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            # Nobody waits for it any more; a job that has not started yet gives its slot back
+            future.cancel()
+            raise HasherBusy('Password hashing timed out')
+
+    def hash(self, password):
+        with BCRYPT_SECONDS.time(operation='hash'):
+            return self._run(_hash, password, self.rounds)
+
+    def check(self, password, hashed):
+        with BCRYPT_SECONDS.time(operation='check'):
+            return self._run(_check, password, hashed)
+
+    def needs_rehash(self, hashed):
+        # bcrypt hashes look like $2b$<cost>$<salt+hash>
+        try:
+            return int(hashed.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+_hasher_lock = threading.Lock()
+
+
+def get_password_hasher():
+    """Return the app's hasher, creating it from config on first use."""
+    hasher = current_app.extensions.get('password_hasher')
+    if hasher is not None:
+        return hasher
+    with _hasher_lock:
+        hasher = current_app.extensions.get('password_hasher')
+        if hasher is not None:
+            return hasher
+        config = current_app.config
+        hasher = PasswordHasher(
+            executor=config['PASSWORD_HASHER_EXECUTOR'],
+            workers=config['PASSWORD_HASHER_WORKERS'],
+            max_pending=config['PASSWORD_HASHER_MAX_PENDING'],
+            rounds=config['BCRYPT_LOG_ROUNDS'],
+            timeout=config['PASSWORD_HASHER_TIMEOUT'],
+        )
+        current_app.extensions['password_hasher'] = hasher
+        return hasher
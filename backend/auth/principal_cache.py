@@ -0,0 +1,66 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from cache import LRUCache
+from config import Config
+from extensions import db
+from models.model import User
+
+# Resolved users keyed by (user_id, token_signature). Values are detached
+# User instances that get merged back into the request session without a SELECT.
+principal_cache = LRUCache(
+    max_size=Config.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=Config.PRINCIPAL_CACHE_TTL,
+)
+
+
+def load_principal(user_id, token, token_exp=None):
+    """Return the ``User`` for a decoded token, hitting the DB only on a cache miss."""
+    key = (user_id, token.rsplit('.', 1)[-1])
+    user = principal_cache.get(key)
+    if user is None:
+        user = User.query.filter_by(id=user_id).first()
+        if user is None:
+            return None
+        # Detach the loaded row so a later commit cannot expire the cached copy
+        db.session.expunge(user)
+        # Never keep a principal around longer than the token it came from
+        ttl = token_exp - time.time() if token_exp is not None else None
+        principal_cache.set(key, user, ttl=ttl)
+    return db.session.merge(user, load=False)
+
+
+# Drop cached principals whenever the underlying row changes (e.g. is_admin flips), once the
+# change is committed: evicting at flush lets a concurrent request re-cache the old row, and a
+# rolled-back change has nothing to evict
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _queue_principal_eviction(mapper, connection, target):
+    Session.object_session(target).info.setdefault('stale_principals', set()).add(target.id)
+
+
+@event.listens_for(Session, 'after_commit')
+def _evict_principals(session):
+    stale = session.info.pop('stale_principals', None)
+    if stale:
+        principal_cache.delete_where(lambda key: key[0] in stale)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _keep_principals(session):
+    session.info.pop('stale_principals', None)
+
+
+class TokenPrincipal:
+    """The caller as described by a stateless token's claims; stands in for ``User`` without a query."""
+
+    def __init__(self, claims):
+        self.id = claims['user_id']
+        self.is_admin = bool(claims['adm'])
+        self.full_name = claims.get('name')
+        self.token_version = claims.get('ver', 0)
+
+    def __repr__(self):
+        return f'<TokenPrincipal {self.id}>'
@@ -0,0 +1,220 @@
+import hashlib
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.orm import Session
+
+from config import Config
+from extensions import db, redis_client
+from models.model import RevokedToken, User
+
+
+def _redis():
+    return redis_client if 'redis' in current_app.extensions else None
+
+
+def _generation(exp):
+    # Revocations are bucketed by token expiry, so a whole bucket can be dropped
+    # once every token that could be in it has expired
+    return int(exp) // Config.JWT_EXPIRATION_DELTA
+
+
+def _bit_positions(jti, bits, hashes):
+    digest = hashlib.blake2b(jti.encode('utf-8'), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], 'little')
+    h2 = int.from_bytes(digest[8:], 'little') | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class BloomFilter:
+    def __init__(self, bits, hashes):
+        self.bits = bits
+        self.hashes = hashes
+        self._array = bytearray((bits + 7) // 8)
+
+    def add(self, jti):
+        for position in _bit_positions(jti, self.bits, self.hashes):
+            self._array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, jti):
+        return all(self._array[position >> 3] & (1 << (position & 7))
+                   for position in _bit_positions(jti, self.bits, self.hashes))
+
+
+class RevocationList:
+    """Revoked token ids: a Bloom filter in front of an exact set, per expiry generation.
+
+    Almost every token checked is not revoked, and the Bloom filter answers
+    those with a few bit tests; only its positives reach the exact set. With
+    Redis configured both live there (SETBIT/GETBIT and a set per generation)
+    so every worker sees the same revocations. Without Redis each revocation is
+    stored in ``revoked_tokens`` and a background thread in every worker copies
+    new rows into its local filters every REVOCATION_SYNC_SECONDS.
+    """
+
+    # Rows committed this long after their revoked_at was taken are still picked up
+    _SYNC_OVERLAP = 60
+
+    def __init__(self, bits=Config.REVOCATION_BLOOM_BITS, hashes=Config.REVOCATION_BLOOM_HASHES):
+        self.bits = bits
+        self.hashes = hashes
+        self._generations = {}  # generation -> (BloomFilter, set of jti)
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._loaded = threading.Event()
+        self._app = None
+        self._thread = None
+
+    def _expire_local(self):
+        current = _generation(time.time())
+        for generation in [g for g in self._generations if g < current]:
+            del self._generations[generation]
+
+    def _add_local(self, jti, exp):
+        bloom, exact = self._generations.setdefault(_generation(exp), (BloomFilter(self.bits, self.hashes), set()))
+        bloom.add(jti)
+        exact.add(jti)
+
+    def revoke(self, jti, exp):
+        generation = _generation(exp)
+        client = _redis()
+        if client is not None:
+            ttl = max(int(exp - time.time()), 0) + Config.JWT_EXPIRATION_DELTA
+            pipe = client.pipeline()
+            for position in _bit_positions(jti, self.bits, self.hashes):
+                pipe.setbit(f'auth:revoked:bloom:{generation}', position, 1)
+            pipe.sadd(f'auth:revoked:{generation}', jti)
+            pipe.expire(f'auth:revoked:bloom:{generation}', ttl)
+            pipe.expire(f'auth:revoked:{generation}', ttl)
+            pipe.execute()
+            return
+        now = time.time()
+        # Rows of tokens that have expired anyway are dropped as new ones come in
+        db.session.execute(delete(RevokedToken).where(RevokedToken.expires_at < now))
+        if db.session.scalar(select(RevokedToken.id).where(RevokedToken.jti == jti)) is None:
+            db.session.add(RevokedToken(jti=jti, expires_at=int(exp), revoked_at=now))
+        db.session.commit()
+        with self._lock:
+            self._expire_local()
+            self._add_local(jti, exp)
+
+    def is_revoked(self, jti, exp):
+        generation = _generation(exp)
+        client = _redis()
+        if client is not None:
+            pipe = client.pipeline()
+            for position in _bit_positions(jti, self.bits, self.hashes):
+                pipe.getbit(f'auth:revoked:bloom:{generation}', position)
+            if not all(pipe.execute()):
+                return False
+            return bool(client.sismember(f'auth:revoked:{generation}', jti))
+        self._ensure_syncing()
+        entry = self._generations.get(generation)
+        if entry is None or jti not in entry[0]:
+            return False
+        return jti in entry[1]
+
+    def _ensure_syncing(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    # Forked from a process that synced: start over, the rows are all in the table
+                    self._generations, self._synced_at = {}, None
+                    self._loaded.clear()
+                    self._app = current_app._get_current_object()
+                    self._thread = threading.Thread(target=self._run, name='revocation-sync', daemon=True)
+                    self._thread.start()
+        if not self._loaded.is_set():
+            # A fresh worker must know every earlier revocation before it accepts a token
+            self._loaded.wait(Config.REVOCATION_SYNC_SECONDS * 5)
+
+    def _sync(self):
+        now = time.time()
+        query = select(RevokedToken.jti, RevokedToken.expires_at).where(RevokedToken.expires_at > now)
+        if self._synced_at is not None:
+            # Re-reading the overlap catches rows that committed after the last sync; adding a jti twice is harmless
+            query = query.where(RevokedToken.revoked_at >= self._synced_at - self._SYNC_OVERLAP)
+        rows = db.session.execute(query).all()
+        with self._lock:
+            self._expire_local()
+            for jti, exp in rows:
+                self._add_local(jti, exp)
+        self._synced_at = now
+
+    def _run(self):
+        while True:
+            with self._app.app_context():
+                try:
+                    self._sync()
+                except Exception:
+                    self._app.logger.exception('Syncing revoked tokens failed')
+                finally:
+                    db.session.remove()
+            self._loaded.set()
+            time.sleep(Config.REVOCATION_SYNC_SECONDS)
+
+
+class TokenVersions:
+    """Current ``token_version`` per user in a Redis hash, so stateless tokens are checked without a query.
+
+    JWT_STATELESS requires Redis (``create_app`` refuses to start without it),
+    because a per-process map would let other workers accept tokens that a
+    logout or role change has revoked. A user missing from the hash (first
+    seen, or Redis lost its data) is seeded from ``users.token_version``.
+    With Redis configured, regular tokens are checked against it too, ahead
+    of the principal cache, which is per worker.
+    """
+
+    _KEY = 'auth:token_versions'
+
+    def shared(self):
+        """Whether the versions live in Redis, where a change made by any worker is seen at once."""
+        return _redis() is not None
+
+    def current(self, user_id):
+        value = redis_client.hget(self._KEY, user_id)
+        if value is None:
+            version = db.session.scalar(select(User.token_version).where(User.id == user_id)) or 0
+            # HSETNX: a bump published after the read above must win over this seed
+            if not redis_client.hsetnx(self._KEY, user_id, version):
+                value = redis_client.hget(self._KEY, user_id)
+            else:
+                value = version
+        return int(value or 0)
+
+    def publish(self, user_id, version):
+        client = _redis()
+        if client is not None:
+            client.hset(self._KEY, user_id, version)
+
+
+revocation_list = RevocationList()
+token_versions = TokenVersions()
+
+
+# A role change must invalidate tokens that still claim the old role
+@event.listens_for(User, 'before_update')
+def _bump_on_role_change(mapper, connection, target):
+    if inspect(target).attrs.is_admin.history.has_changes():
+        target.token_version = (target.token_version or 0) + 1
+
+
+@event.listens_for(User, 'after_update')
+def _queue_version(mapper, connection, target):
+    if inspect(target).attrs.token_version.history.has_changes():
+        session = Session.object_session(target)
+        session.info.setdefault('token_versions', {})[target.id] = target.token_version
+
+
+# Published only once committed, so a rolled-back change never locks anyone out
+@event.listens_for(Session, 'after_commit')
+def _publish_versions(session):
+    for user_id, version in session.info.pop('token_versions', {}).items():
+        token_versions.publish(user_id, version)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_versions(session):
+    session.info.pop('token_versions', None)
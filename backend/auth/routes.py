@@ -1,11 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, g
 from extensions import db
 from models.model import User
-from auth.utils import generate_jwt, check_password, hash_password
+from auth.utils import generate_jwt, check_password, hash_password, password_needs_rehash
+from auth.password_hasher import HasherBusy
+from auth.auth_middleware import token_required
+from auth.revocation import revocation_list
 from datetime import datetime
 
 auth_bp = Blueprint('auth', __name__)
 
+
+def _busy_response():
+    response = jsonify({'message': 'Server is busy, please retry shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
@@ -22,7 +31,10 @@ def register():
         return jsonify({'message': 'User already exists'}), 409
 
     # Hash the password
-    hashed_password = hash_password(password)
+    try:
+        hashed_password = hash_password(password)
+    except HasherBusy:
+        return _busy_response()
 
     # Create a new user
     new_user = User(
@@ -47,10 +59,37 @@ def login():
     user = User.query.filter_by(email=email).first()
 
     # Check if the user exists and password is correct
-    if not user or not check_password(password, user.password):
-        return jsonify({'message': 'Invalid email or password'}), 401
+    try:
+        if not user or not check_password(password, user.password):
+            return jsonify({'message': 'Invalid email or password'}), 401
+
+        # Upgrade the stored hash when the configured bcrypt cost has changed
+        if password_needs_rehash(user.password):
+            user.password = hash_password(password)
+            db.session.commit()
+    except HasherBusy:
+        return _busy_response()
 
     # Generate JWT token
-    token = generate_jwt(user.id)
+    token = generate_jwt(user)
 
     return jsonify({'token': token}), 200
+
+@auth_bp.route('/logout', methods=['POST'])
+@token_required
+def logout(current_user):
+    # Revoke just the presented token; it stays listed only until it would have expired anyway
+    claims = g.token_claims
+    if 'jti' not in claims:
+        return jsonify({'message': 'Token cannot be revoked, please log in again'}), 400
+    revocation_list.revoke(claims['jti'], claims['exp'])
+    return jsonify({'message': 'Logged out'}), 200
+
+@auth_bp.route('/logout-all', methods=['POST'])
+@token_required
+def logout_all(current_user):
+    # Bumping the version invalidates every token issued to this user so far
+    user = db.session.get(User, current_user.id)
+    user.token_version = (user.token_version or 0) + 1
+    db.session.commit()
+    return jsonify({'message': 'Logged out of all sessions'}), 200
@@ -1,20 +1,30 @@
+import uuid
+
 import jwt
 from flask import current_app
-from flask_bcrypt import Bcrypt
 from datetime import datetime, timedelta
+from auth.password_hasher import get_password_hasher
 
-bcrypt = Bcrypt()
-
+# bcrypt runs on the configured executor; both raise HasherBusy under backpressure
 def hash_password(password):
-    return bcrypt.generate_password_hash(password).decode('utf-8')
+    return get_password_hasher().hash(password)
 
 def check_password(password, hashed):
-    return bcrypt.check_password_hash(hashed, password)
+    return get_password_hasher().check(password, hashed)
+
+def password_needs_rehash(hashed):
+    return get_password_hasher().needs_rehash(hashed)
 
-def generate_jwt(user_id):
+def generate_jwt(user):
+    # The role and version claims let JWT_STATELESS deployments authorize without loading the user
     expiration = datetime.utcnow() + timedelta(seconds=current_app.config['JWT_EXPIRATION_DELTA'])
     token = jwt.encode({
-        'user_id': user_id,
-        'exp': expiration
+        'user_id': user.id,
+        'exp': expiration,
+        'iat': datetime.utcnow(),
+        'jti': uuid.uuid4().hex,
+        'ver': user.token_version or 0,
+        'adm': bool(user.is_admin),
+        'name': user.full_name
     }, current_app.config['SECRET_KEY'], algorithm=current_app.config['JWT_ALGORITHM'])
     return token
@@ -0,0 +1,365 @@
+"""Seed a throwaway database and load-test the API with scripted scenarios.
+
+Run from ``backend/``::
+
+    python -m benchmarks.api_benchmark --scale small --output bench.json
+    python -m benchmarks.api_benchmark --scale small --compare bench.json
+
+Every scenario runs against the Flask test client (in-process, no sockets) and
+a local threaded WSGI server (real HTTP), and reports throughput plus
+p50/p95/p99 latency overall and per endpoint. With ``--compare`` the run is
+checked against an earlier report and exits non-zero when a p95 regressed by
+more than ``--fail-threshold`` percent.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+SCENARIOS = ('login_storm', 'catalog_browse', 'question_listing', 'admin_bulk_edit')
+TRANSPORTS = ('test-client', 'wsgi')
+
+
+# scenarios -------------------------------------------------------------
+# Each returns [(endpoint label, method, path, body, role)]; role picks the
+# token sent (None, 'admin' or 'student') and bytes bodies are sent raw.
+
+def login_storm(rows, rng, count, datagen):
+    requests = []
+    for _ in range(count):
+        email = datagen.user_email(rng.randrange(rows["users"]))
+        # One in ten attempts uses a wrong password, like a real storm of retries
+        password = datagen.PASSWORD if rng.random() >= 0.1 else 'wrong-password'
+        requests.append(('POST /auth/login', 'POST', '/auth/login', {"email": email, "password": password}, None))
+    return requests
+
+
+def catalog_browse(rows, rng, count, datagen):
+    requests = []
+    for _ in range(count):
+        pick = rng.random()
+        if pick < 0.2:
+            after = rng.randrange(rows["subjects"])
+            requests.append(('GET /admin/subjects', 'GET', f'/admin/subjects?limit=50&after={after}', None, 'admin'))
+        elif pick < 0.4:
+            after = rng.randrange(rows["chapters"])
+            requests.append(('GET /admin/chapters', 'GET', f'/admin/chapters?limit=50&after={after}', None, 'admin'))
+        elif pick < 0.6:
+            after = rng.randrange(rows["quizzes"])
+            requests.append(('GET /admin/quizzes', 'GET', f'/admin/quizzes?limit=50&after={after}', None, 'admin'))
+        elif pick < 0.8:
+            quiz_id = rng.randint(1, rows["quizzes"])
+            requests.append(('GET /user/quizzes/<id>', 'GET', f'/user/quizzes/{quiz_id}', None, 'student'))
+        else:
+            quiz_id = rng.randint(1, rows["quizzes"])
+            requests.append(('GET /user/quizzes/<id>/questions', 'GET', f'/user/quizzes/{quiz_id}/questions',
+                             None, 'student'))
+    return requests
+
+
+def question_listing(rows, rng, count, datagen):
+    requests = []
+    for _ in range(count):
+        pick = rng.random()
+        if pick < 0.5:
+            after = rng.randrange(rows["questions"])
+            requests.append(('GET /admin/questions', 'GET', f'/admin/questions?limit=100&after={after}&count=false',
+                             None, 'admin'))
+        elif pick < 0.8:
+            question_id = rng.randint(1, rows["questions"])
+            requests.append(('GET /admin/questions/<id>', 'GET', f'/admin/questions/{question_id}', None, 'admin'))
+        else:
+            term = rng.choice(['algebra', 'energy', 'probability', 'optics', 'reasoning', 'example'])
+            requests.append(('GET /admin/search', 'GET', f'/admin/search?q={term}&kind=question', None, 'admin'))
+    return requests
+
+
+def admin_bulk_edit(rows, rng, count, datagen):
+    requests = []
+    for n in range(count):
+        pick = rng.random()
+        if pick < 0.6:
+            question_id = rng.randint(1, rows["questions"])
+            requests.append(('PUT /admin/questions/<id>', 'PUT', f'/admin/questions/{question_id}',
+                             {"question_statement": f"Edited question {question_id} revision {n}?",
+                              "correct_option": rng.randint(1, 4)}, 'admin'))
+        elif pick < 0.8:
+            quiz_id = rng.randint(1, rows["quizzes"])
+            requests.append(('PUT /admin/quizzes/<id>', 'PUT', f'/admin/quizzes/{quiz_id}',
+                             {"remarks": f"Reviewed in pass {n}"}, 'admin'))
+        else:
+            quiz_id = rng.randint(1, rows["quizzes"])
+            lines = [json.dumps({
+                "quiz_id": quiz_id, "question_statement": f"Imported {n}-{i} about {rng.random():.6f}?",
+                "option1": "a", "option2": "b", "option3": "c", "option4": "d", "correct_option": 1 + i % 4
+            }) for i in range(50)]
+            requests.append(('POST /admin/questions/bulk', 'POST', '/admin/questions/bulk?format=jsonl',
+                             '\n'.join(lines).encode('utf-8'), 'admin'))
+    return requests
+
+
+# transports ------------------------------------------------------------
+
+class TestClientTransport:
+    name = 'test-client'
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body, headers):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        if isinstance(body, bytes):
+            response = client.open(path, method=method, data=body, headers=headers)
+        else:
+            response = client.open(path, method=method, json=body, headers=headers)
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class WSGIServerTransport:
+    """Serves the app on an ephemeral localhost port with Werkzeug's threaded server."""
+    name = 'wsgi'
+
+    def __init__(self, app):
+        from werkzeug.serving import WSGIRequestHandler, make_server
+
+        class QuietHandler(WSGIRequestHandler):
+            def log_request(self, *args, **kwargs):
+                pass
+
+        self.server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+        self.port = self.server.server_port
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def request(self, method, path, body, headers):
+        headers = dict(headers)
+        if isinstance(body, bytes):
+            payload = body
+        elif body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        else:
+            payload = None
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            return response.status
+        finally:
+            connection.close()
+
+    def close(self):
+        self.server.shutdown()
+
+
+# measurement -----------------------------------------------------------
+
+def percentile(sorted_samples, pct):
+    # Nearest-rank, so p99 of 100 samples is the 99th value rather than an interpolation
+    if not sorted_samples:
+        return None
+    rank = max(1, -(-len(sorted_samples) * pct // 100))
+    return sorted_samples[int(rank) - 1]
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "count": len(samples),
+        "p50": round(percentile(samples, 50), 3),
+        "p95": round(percentile(samples, 95), 3),
+        "p99": round(percentile(samples, 99), 3),
+        "mean": round(sum(samples) / len(samples), 3),
+        "max": round(samples[-1], 3),
+    }
+
+
+def run_scenario(transport, requests, tokens, concurrency):
+    latencies = [None] * len(requests)
+    statuses = [None] * len(requests)
+
+    def worker(offset):
+        for i in range(offset, len(requests), concurrency):
+            label, method, path, body, role = requests[i]
+            headers = {"Authorization": f"Bearer {tokens[role]}"} if role else {}
+            start = time.perf_counter()
+            try:
+                statuses[i] = transport.request(method, path, body, headers)
+            except Exception:
+                statuses[i] = 'error'
+            latencies[i] = (time.perf_counter() - start) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    duration = time.perf_counter() - started
+
+    by_endpoint = {}
+    for (label, *_), latency in zip(requests, latencies):
+        by_endpoint.setdefault(label, []).append(latency)
+    status_counts = Counter(str(status) for status in statuses)
+    errors = sum(count for status, count in status_counts.items() if not status.isdigit() or int(status) >= 500)
+    return {
+        "requests": len(requests),
+        "errors": errors,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(len(requests) / duration, 2) if duration else None,
+        "latency_ms": summarize(latencies),
+        "status": dict(sorted(status_counts.items())),
+        "endpoints": {label: summarize(samples) for label, samples in sorted(by_endpoint.items())},
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def compare(baseline, report, threshold):
+    """Print p95/throughput deltas per (scenario, transport); return the regressions over ``threshold`` percent."""
+    previous = {(r["scenario"], r["transport"]): r for r in baseline["results"]}
+    regressions = []
+    print(f"{'scenario':<20} {'transport':<12} {'p95 ms':>18} {'rps':>18}", file=sys.stderr)
+    for result in report["results"]:
+        key = (result["scenario"], result["transport"])
+        old = previous.get(key)
+        if old is None:
+            continue
+        old_p95, new_p95 = old["latency_ms"]["p95"], result["latency_ms"]["p95"]
+        change = (new_p95 - old_p95) / old_p95 * 100 if old_p95 else 0.0
+        print(f"{key[0]:<20} {key[1]:<12} {old_p95:>8.2f} -> {new_p95:<8.2f}"
+              f"{old['throughput_rps']:>8.1f} -> {result['throughput_rps']:<8.1f} ({change:+.1f}% p95)", file=sys.stderr)
+        if change > threshold:
+            regressions.append({"scenario": key[0], "transport": key[1], "p95_change_pct": round(change, 1)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', default='small', help='Dataset size from benchmarks.datagen.SCALES')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--transports', default=','.join(TRANSPORTS))
+    parser.add_argument('--requests', type=int, default=300, help='Requests per scenario and transport')
+    parser.add_argument('--login-requests', type=int, default=60, help='Requests for login_storm (bcrypt-bound)')
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--bcrypt-rounds', type=int, default=None, help='Override BCRYPT_LOG_ROUNDS')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--compare', help='Earlier JSON report to compare against')
+    parser.add_argument('--fail-threshold', type=float, default=20.0, help='Allowed p95 regression in percent')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    transports = [name.strip() for name in args.transports.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS) | set(transports) - set(TRANSPORTS)
+    if unknown:
+        parser.error(f"unknown scenario or transport: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Config is read at import time, so point it at the scratch databases first
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ['ARCHIVE_DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'archive.db')}"
+        os.environ['JOB_SPOOL_DIR'] = tmp
+        os.environ['PROFILER_ENABLED'] = '0'
+        # login_storm is meant to measure bcrypt throughput, not the limiter
+        os.environ['RATE_LIMIT_ENABLED'] = '0'
+        if args.bcrypt_rounds is not None:
+            os.environ['BCRYPT_LOG_ROUNDS'] = str(args.bcrypt_rounds)
+
+        from app import create_app
+        from auth.utils import generate_jwt, hash_password
+        from benchmarks import datagen
+        from database import upgrade_schema
+        from extensions import db
+        from models.model import User
+        from quiz_stats import rebuild_stats
+
+        if args.scale not in datagen.SCALES:
+            parser.error(f"--scale must be one of {', '.join(sorted(datagen.SCALES))}")
+
+        app = create_app()
+        upgrade_schema(app)
+        with app.app_context():
+            started = time.perf_counter()
+            rows = datagen.seed(datagen.scale_counts(args.scale), hash_password(datagen.PASSWORD), args.seed)
+            rebuild_stats()
+            seed_seconds = time.perf_counter() - started
+            tokens = {"admin": generate_jwt(db.session.get(User, 1)),
+                      "student": generate_jwt(db.session.get(User, 2))}
+            db.session.remove()
+
+        commit, dirty = git_revision()
+        report = {
+            "meta": {
+                "commit": commit, "dirty": dirty, "started_at": datetime.utcnow().isoformat(),
+                "python": platform.python_version(), "platform": platform.platform(),
+                "scale": args.scale, "seed": args.seed, "concurrency": args.concurrency,
+                "bcrypt_rounds": app.config['BCRYPT_LOG_ROUNDS'], "seed_seconds": round(seed_seconds, 2),
+            },
+            "rows": rows,
+            "results": [],
+        }
+
+        builders = {"login_storm": login_storm, "catalog_browse": catalog_browse,
+                    "question_listing": question_listing, "admin_bulk_edit": admin_bulk_edit}
+        for transport_name in transports:
+            transport = (TestClientTransport if transport_name == 'test-client' else WSGIServerTransport)(app)
+            try:
+                for scenario in scenarios:
+                    count = args.login_requests if scenario == 'login_storm' else args.requests
+                    # Same request script for every transport so the numbers are comparable
+                    rng = random.Random(f'{args.seed}:{scenario}')
+                    warmup = builders[scenario](rows, rng, args.warmup, datagen)
+                    requests = builders[scenario](rows, rng, count, datagen)
+                    run_scenario(transport, warmup, tokens, args.concurrency)
+                    result = run_scenario(transport, requests, tokens, args.concurrency)
+                    report["results"].append({"scenario": scenario, "transport": transport_name, **result})
+                    print(f"{scenario} [{transport_name}]: {result['throughput_rps']} req/s, "
+                          f"p95 {result['latency_ms']['p95']}ms, errors {result['errors']}", file=sys.stderr)
+            finally:
+                transport.close()
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as out:
+            out.write(output + '\n')
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare) as source:
+            regressions = compare(json.load(source), report, args.fail_threshold)
+        if regressions:
+            print(f"p95 regressed more than {args.fail_threshold}%: {json.dumps(regressions)}", file=sys.stderr)
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
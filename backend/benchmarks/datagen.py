@@ -0,0 +1,144 @@
+"""Deterministic synthetic data for benchmarks.
+
+Run from ``backend/`` to seed the configured (already migrated) database directly::
+
+    flask db upgrade && python -m benchmarks.datagen --scale small
+"""
+import argparse
+import json
+import random
+from datetime import date, datetime, time as dtime, timedelta
+
+from sqlalchemy import insert
+
+from extensions import db
+from models.model import User, Subject, Chapter, Quiz, Question, Score
+
+# Row counts per scale; users are students except user 1, the admin
+SCALES = {
+    "tiny": {"users": 50, "subjects": 5, "chapters_per_subject": 4, "quizzes_per_chapter": 3,
+             "questions_per_quiz": 10, "scores_per_quiz": 5},
+    "small": {"users": 1000, "subjects": 40, "chapters_per_subject": 10, "quizzes_per_chapter": 5,
+              "questions_per_quiz": 10, "scores_per_quiz": 20},
+    "medium": {"users": 10000, "subjects": 200, "chapters_per_subject": 20, "quizzes_per_chapter": 5,
+               "questions_per_quiz": 15, "scores_per_quiz": 40},
+    "large": {"users": 50000, "subjects": 500, "chapters_per_subject": 25, "quizzes_per_chapter": 8,
+              "questions_per_quiz": 20, "scores_per_quiz": 60},
+}
+
+# Shared by every seeded user; user0 (id 1) is the admin
+PASSWORD = 'benchmark-password'
+
+_TOPICS = ['algebra', 'geometry', 'motion', 'energy', 'cells', 'atoms', 'grammar', 'history', 'maps', 'circuits',
+           'fractions', 'reactions', 'poetry', 'ecology', 'probability', 'optics']
+_STEMS = ['Which statement about {t} is correct', 'What is the main idea behind {t}',
+          'Choose the best example of {t}', 'How would you apply {t} to problem {n}',
+          'Identify the error in this {t} reasoning', 'What follows from the {t} rule in case {n}']
+
+
+def user_email(index):
+    return f'user{index}@example.com'
+
+
+def scale_counts(scale, **overrides):
+    counts = dict(SCALES[scale])
+    counts.update({key: value for key, value in overrides.items() if value is not None})
+    return counts
+
+
+def _batches(rows, size=5000):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def seed(counts, password_hash, seed_value=42):
+    """Insert the synthetic hierarchy with executemany batches and return the row counts.
+
+    Names follow ``Subject {i}`` / ``Chapter {i}`` and ids are dense from 1,
+    so scenarios can address rows without querying. Every user shares
+    ``password_hash`` so seeding does not pay for one bcrypt per user.
+    """
+    rng = random.Random(seed_value)
+    users = counts["users"]
+    chapter_count = counts["subjects"] * counts["chapters_per_subject"]
+    quiz_count = chapter_count * counts["quizzes_per_chapter"]
+
+    for batch in _batches({
+        "email": user_email(i), "password": password_hash, "full_name": f"User {i}",
+        "qualification": 5 + i % 8, "dob": date(2005, 1, 1) + timedelta(days=i % 2000), "is_admin": i == 0
+    } for i in range(users)):
+        db.session.execute(insert(User), batch)
+
+    db.session.execute(insert(Subject), [{
+        "name": f"Subject {i}", "qualification": 5 + i % 8, "description": f"{_TOPICS[i % len(_TOPICS)]} and more"
+    } for i in range(counts["subjects"])])
+
+    for batch in _batches({
+        "name": f"Chapter {i}", "description": f"All about {_TOPICS[rng.randrange(len(_TOPICS))]}",
+        "subject_id": i // counts["chapters_per_subject"] + 1
+    } for i in range(chapter_count)):
+        db.session.execute(insert(Chapter), batch)
+
+    for batch in _batches({
+        "chapter_id": i // counts["quizzes_per_chapter"] + 1,
+        "date_of_quiz": date(2025, 1, 1) + timedelta(days=i % 365),
+        "time_duration": rng.choice((dtime(0, 15), dtime(0, 30), dtime(0, 45), dtime(1, 0)))
+    } for i in range(quiz_count)):
+        db.session.execute(insert(Quiz), batch)
+
+    def questions():
+        for quiz_id in range(1, quiz_count + 1):
+            for n in range(counts["questions_per_quiz"]):
+                topic = _TOPICS[rng.randrange(len(_TOPICS))]
+                yield {
+                    "quiz_id": quiz_id,
+                    "question_statement": rng.choice(_STEMS).format(t=topic, n=quiz_id * 100 + n) + '?',
+                    "option1": f"{topic} option A{n}", "option2": f"{topic} option B{n}",
+                    "option3": f"{topic} option C{n}", "option4": f"{topic} option D{n}",
+                    "correct_option": rng.randint(1, 4)
+                }
+
+    def scores():
+        started = datetime(2025, 1, 1)
+        for quiz_id in range(1, quiz_count + 1):
+            for _ in range(counts["scores_per_quiz"]):
+                yield {
+                    "quiz_id": quiz_id, "user_id": rng.randint(2, users) if users > 1 else 1,
+                    "total_scored": min(counts["questions_per_quiz"],
+                                        max(0, round(rng.gauss(counts["questions_per_quiz"] * 0.6, 2)))),
+                    "time_stamp_of_attempt": started + timedelta(minutes=rng.randrange(525600))
+                }
+
+    for batch in _batches(questions()):
+        db.session.execute(insert(Question), batch)
+    for batch in _batches(scores()):
+        db.session.execute(insert(Score), batch)
+    db.session.commit()
+
+    return {"users": users, "subjects": counts["subjects"], "chapters": chapter_count, "quizzes": quiz_count,
+            "questions": quiz_count * counts["questions_per_quiz"],
+            "scores": quiz_count * counts["scores_per_quiz"]}
+
+
+def main():
+    from app import create_app
+    from auth.utils import hash_password
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(json.dumps(seed(scale_counts(args.scale), hash_password(PASSWORD), args.seed)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Seed a large SQLite database and compare hot lookups with and without the model indexes.
+
+Run from ``backend/``::
+
+    python -m benchmarks.index_benchmark --questions-per-quiz 10 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date
+
+from flask import Flask
+from sqlalchemy import text
+
+from database import init_database
+from extensions import db
+from models.model import User, Subject, Chapter, Quiz, Question, Score
+from admin.routes import admin_bp
+from auth.utils import generate_jwt
+from benchmarks import datagen
+
+
+def build_app(db_path):
+    app = Flask(__name__)
+    app.config.from_object('config.Config')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{db_path}'
+    app.config['SQLALCHEMY_BINDS'] = {'archive': f'sqlite:///{db_path}.archive'}
+    init_database(app)
+    app.register_blueprint(admin_bp, url_prefix='/admin')
+    return app
+
+
+def seed(args):
+    counts = {name: getattr(args, name) for name in datagen.SCALES['tiny']}
+    return datagen.seed(counts, password_hash='x')
+
+
+def hot_queries(args):
+    # The filters each admin route runs, keyed by the route that issues them
+    last_subject = args.subjects
+    mid_chapter = args.subjects * args.chapters_per_subject // 2
+    mid_quiz = mid_chapter * args.quizzes_per_chapter
+    return {
+        "POST /admin/subjects (duplicate check)":
+            Subject.query.filter_by(name=f"Subject {last_subject - 1}", qualification=5 + (last_subject - 1) % 8),
+        "POST /admin/chapters (duplicate check)":
+            Chapter.query.filter_by(name=f"Chapter {mid_chapter}", subject_id=mid_chapter // args.chapters_per_subject + 1),
+        "quizzes by chapter":
+            Quiz.query.filter_by(chapter_id=mid_chapter).order_by(Quiz.date_of_quiz),
+        "quizzes by date":
+            Quiz.query.filter_by(date_of_quiz=date(2025, 6, 1)),
+        "questions by quiz (answer key)":
+            Question.query.filter_by(quiz_id=mid_quiz),
+        "score by quiz and user":
+            Score.query.filter_by(quiz_id=mid_quiz, user_id=1),
+    }
+
+
+def route_requests(args):
+    mid_chapter = args.subjects * args.chapters_per_subject // 2
+    return {
+        "GET /admin/subjects": ("get", "/admin/subjects?count=false", None),
+        "GET /admin/chapters": ("get", "/admin/chapters?count=false", None),
+        "GET /admin/quizzes": ("get", "/admin/quizzes?count=false", None),
+        "GET /admin/questions": ("get", "/admin/questions?count=false", None),
+        "POST /admin/subjects (duplicate)": ("post", "/admin/subjects",
+                                             {"name": "Subject 0", "qualification": 5}),
+        "POST /admin/chapters (duplicate)": ("post", "/admin/chapters",
+                                             {"name": f"Chapter {mid_chapter}", "description": "seeded",
+                                              "subject_id": mid_chapter // args.chapters_per_subject + 1}),
+    }
+
+
+def _timings(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"median_ms": round(statistics.median(samples), 4),
+            "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 4)}
+
+
+def _query_plan(query):
+    sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    return [row[-1] for row in rows]
+
+
+def measure(app, args, token):
+    client = app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+    results = {"queries": {}, "routes": {}}
+
+    for name, query in hot_queries(args).items():
+        results["queries"][name] = {"plan": _query_plan(query), **_timings(query.all, args.repeat)}
+
+    for name, (method, url, body) in route_requests(args).items():
+        call = getattr(client, method)
+        results["routes"][name] = _timings(lambda: call(url, json=body, headers=headers), args.repeat)
+    return results
+
+
+def set_indexes(enabled):
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            if enabled:
+                index.create(bind=db.engine, checkfirst=True)
+            else:
+                index.drop(bind=db.engine, checkfirst=True)
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--subjects', type=int, default=200)
+    parser.add_argument('--chapters-per-subject', type=int, default=20)
+    parser.add_argument('--quizzes-per-chapter', type=int, default=5)
+    parser.add_argument('--questions-per-quiz', type=int, default=10)
+    parser.add_argument('--scores-per-quiz', type=int, default=5)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = build_app(os.path.join(tmp, 'bench.db'))
+        with app.app_context():
+            db.create_all()
+            report = {"rows": seed(args)}
+            token = generate_jwt(db.session.get(User, 1))
+
+            set_indexes(False)
+            report["before"] = measure(app, args, token)
+            set_indexes(True)
+            report["after"] = measure(app, args, token)
+            db.session.remove()
+            db.engine.dispose()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"Seeded: {report['rows']}")
+    for section in ("queries", "routes"):
+        print(f"\n{section.upper()}")
+        for name, before in report["before"][section].items():
+            after = report["after"][section][name]
+            print(f"  {name}: {before['median_ms']:.3f}ms -> {after['median_ms']:.3f}ms (median)")
+            if section == "queries":
+                print(f"      before: {'; '.join(before['plan'])}")
+                print(f"      after:  {'; '.join(after['plan'])}")
+
+
+if __name__ == '__main__':
+    main()
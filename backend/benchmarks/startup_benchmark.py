@@ -0,0 +1,121 @@
+"""Measure cold-start cost: module import, ``create_app()`` and the first requests.
+
+Run from ``backend/``::
+
+    python -m benchmarks.startup_benchmark --runs 7
+    python -m benchmarks.startup_benchmark --importtime 15
+
+Each run is a fresh interpreter against a migrated scratch database, so the
+numbers are what a new worker (or a test process) pays before it can serve.
+``--importtime`` also lists the slowest modules (cumulative) from
+``python -X importtime``.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PHASES = ('import_ms', 'create_app_ms', 'first_request_ms', 'second_request_ms', 'first_login_ms')
+
+
+def child(token):
+    """One cold start; prints the phase timings as JSON."""
+    started = time.perf_counter()
+    import app as app_module
+    imported = time.perf_counter()
+    app = app_module.create_app()
+    created = time.perf_counter()
+
+    client = app.test_client()
+    headers = {'Authorization': f'Bearer {token}'}
+    timings = {"import_ms": imported - started, "create_app_ms": created - imported}
+    for phase in ('first_request_ms', 'second_request_ms'):
+        begin = time.perf_counter()
+        response = client.get('/admin/subjects', headers=headers)
+        timings[phase] = time.perf_counter() - begin
+        assert response.status_code == 200, response.status_code
+
+    from benchmarks.datagen import PASSWORD, user_email
+    begin = time.perf_counter()
+    response = client.post('/auth/login', json={"email": user_email(1), "password": PASSWORD})
+    timings['first_login_ms'] = time.perf_counter() - begin
+    assert response.status_code == 200, response.status_code
+
+    print(json.dumps({key: round(value * 1000, 2) for key, value in timings.items()}))
+
+
+def slowest_imports(env, count):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app; app.create_app()'],
+                            cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.strip()))
+    rows.sort(reverse=True)
+    return [{"module": name, "cumulative_ms": round(cum / 1000, 2), "self_ms": round(own / 1000, 2)}
+            for cum, own, name in rows[:count]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters to start')
+    parser.add_argument('--importtime', type=int, default=0, metavar='N', help='Also list the N slowest imports')
+    parser.add_argument('--child', metavar='TOKEN', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ,
+                   DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}",
+                   ARCHIVE_DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'archive.db')}",
+                   JOB_SPOOL_DIR=tmp, PROFILER_ENABLED='0', RATE_LIMIT_ENABLED='0', BCRYPT_LOG_ROUNDS='4',
+                   PASSWORD_HASHER_EXECUTOR='inline')
+        os.environ.update(env)
+
+        from app import create_app
+        from auth.utils import generate_jwt, hash_password
+        from benchmarks import datagen
+        from database import upgrade_schema
+        from extensions import db
+        from models.model import User
+
+        app = create_app()
+        upgrade_schema(app)
+        with app.app_context():
+            datagen.seed(datagen.scale_counts('tiny'), hash_password(datagen.PASSWORD))
+            token = generate_jwt(db.session.get(User, 1))
+            db.session.remove()
+            db.engine.dispose()
+
+        runs = []
+        for _ in range(args.runs):
+            result = subprocess.run([sys.executable, '-m', 'benchmarks.startup_benchmark', '--child', token],
+                                    cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True)
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        report = {
+            "runs": args.runs,
+            "python": sys.version.split()[0],
+            "phases_ms": {phase: {"median": round(statistics.median(run[phase] for run in runs), 2),
+                                  "min": min(run[phase] for run in runs),
+                                  "max": max(run[phase] for run in runs)} for phase in _PHASES},
+        }
+        if args.importtime:
+            report["slowest_imports"] = slowest_imports(env, args.importtime)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,109 @@
 import os
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY', 'your_secret_key_here')
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///quiz_master_v2.db'
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///quiz_master_v2.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Archived quizzes, questions and scores live in their own database
+    ARCHIVE_DATABASE_URL = os.environ.get('ARCHIVE_DATABASE_URL', 'sqlite:///quiz_master_archive.db')
+    SQLALCHEMY_BINDS = {'archive': ARCHIVE_DATABASE_URL}
+    ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))  # Quizzes older than this are archived
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 200))  # Quizzes moved per transaction
     JWT_ALGORITHM = 'HS256'
     JWT_EXPIRATION_DELTA = 3600  # Token validity in seconds
+
+    # Connection pool (engine options are built from these in database.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+    # SQLite connect-time pragmas
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+    # Password hashing: executor is 'thread', 'process' or 'inline'
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASHER_EXECUTOR = os.environ.get('PASSWORD_HASHER_EXECUTOR', 'thread')
+    PASSWORD_HASHER_WORKERS = int(os.environ.get('PASSWORD_HASHER_WORKERS', os.cpu_count() or 2))
+    PASSWORD_HASHER_MAX_PENDING = int(os.environ.get('PASSWORD_HASHER_MAX_PENDING', 64))  # Queued + running jobs before 503
+    PASSWORD_HASHER_TIMEOUT = int(os.environ.get('PASSWORD_HASHER_TIMEOUT', 10))
+
+    # Background jobs: without a broker URL tasks run eagerly in-process
+    CELERY_BROKER_URL = os.environ.get('CELERY_BROKER_URL', '')
+    CELERY = {
+        'broker_url': CELERY_BROKER_URL or 'memory://',
+        'task_always_eager': os.environ.get('CELERY_TASK_ALWAYS_EAGER', '0' if CELERY_BROKER_URL else '1') == '1',
+        'task_ignore_result': True,  # Status lives in the jobs table
+    }
+    JOB_SPOOL_DIR = os.environ.get('JOB_SPOOL_DIR', tempfile.gettempdir())  # Uploads handed to workers
+
+    REDIS_URL = os.environ.get('REDIS_URL', '')  # Enables the Redis tier of the caches when set
+
+    # Observability: /metrics endpoint and the opt-in slow request profiler
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', '0') == '1'
+    PROFILER_INTERVAL_MS = float(os.environ.get('PROFILER_INTERVAL_MS', 5))  # Stack sampling period
+    PROFILER_SLOW_REQUEST_MS = float(os.environ.get('PROFILER_SLOW_REQUEST_MS', 500))  # Dump profiles above this
+    PROFILER_OUTPUT_DIR = os.environ.get('PROFILER_OUTPUT_DIR', os.path.join(tempfile.gettempdir(), 'quiz_master_profiles'))
+
+    # Token-bucket rate limits: "<endpoint or blueprint>: <count>/<period> <ip|email|user>, ...; ..."
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') == '1'
+    RATE_LIMITS = os.environ.get('RATE_LIMITS', 'auth.login: 10/1m ip, 5/1m email; auth.register: 5/1m ip; '
+                                                'admin: 600/1m user; user: 1200/1m user')
+    RATE_LIMIT_SHARDS = int(os.environ.get('RATE_LIMIT_SHARDS', 16))  # Independently locked bucket maps per process
+    RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', 100000))  # Idle buckets beyond this are dropped
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto are trusted (0: use the socket address)
+    TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', 0))
+
+    # Seconds a resolved user stays cached. Without REDIS_URL this is also how long other workers may
+    # still accept a token after a logout-all, token revocation or role change.
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL', 10))
+    PRINCIPAL_CACHE_MAX_SIZE = int(os.environ.get('PRINCIPAL_CACHE_MAX_SIZE', 1024))
+    # Trust the role claims signed into tokens instead of loading the user on every request (needs REDIS_URL)
+    JWT_STATELESS = os.environ.get('JWT_STATELESS', '0') == '1'
+    REVOCATION_SYNC_SECONDS = float(os.environ.get('REVOCATION_SYNC_SECONDS', 2))  # Logout propagation without Redis
+    REVOCATION_BLOOM_BITS = int(os.environ.get('REVOCATION_BLOOM_BITS', 1 << 20))  # Per token-lifetime generation
+    REVOCATION_BLOOM_HASHES = int(os.environ.get('REVOCATION_BLOOM_HASHES', 7))
+    # SQL statement budget per request (dev/CI only), used to catch N+1 regressions
+    SQL_QUERY_BUDGET_ENABLED = os.environ.get('SQL_QUERY_BUDGET_ENABLED', '0') == '1'
+    SQL_QUERY_BUDGET = int(os.environ['SQL_QUERY_BUDGET']) if os.environ.get('SQL_QUERY_BUDGET') else None
+    SQL_QUERY_BUDGET_MODE = os.environ.get('SQL_QUERY_BUDGET_MODE', 'warn')  # 'warn' or 'raise'
+    QUIZ_DELIVERY_CACHE_TTL = int(os.environ.get('QUIZ_DELIVERY_CACHE_TTL', 300))
+    QUIZ_DELIVERY_CACHE_MAX_SIZE = int(os.environ.get('QUIZ_DELIVERY_CACHE_MAX_SIZE', 256))
+    QUIZ_PAYLOAD_CACHE_TTL = int(os.environ.get('QUIZ_PAYLOAD_CACHE_TTL', 600))
+    QUIZ_PAYLOAD_CACHE_MAX_SIZE = int(os.environ.get('QUIZ_PAYLOAD_CACHE_MAX_SIZE', 256))
+    QUIZ_PAYLOAD_GZIP_LEVEL = int(os.environ.get('QUIZ_PAYLOAD_GZIP_LEVEL', 6))
+    QUESTION_IMPORT_BATCH_SIZE = int(os.environ.get('QUESTION_IMPORT_BATCH_SIZE', 500))  # Rows per INSERT transaction
+    BATCH_UPDATE_MAX_OPERATIONS = int(os.environ.get('BATCH_UPDATE_MAX_OPERATIONS', 1000))  # Per PATCH /admin/batch
+    NEAR_DUPLICATE_MODE = os.environ.get('NEAR_DUPLICATE_MODE', 'warn')  # off, warn or reject
+    NEAR_DUPLICATE_THRESHOLD = float(os.environ.get('NEAR_DUPLICATE_THRESHOLD', 0.8))  # Estimated Jaccard similarity
+    # Opt-in write-behind for score inserts: group commits by size or age, journaled to local disk first.
+    # While a score is buffered, submit responses carry "id": null and "pending": true (use "submission_id").
+    # Buffered scores are listed only by the worker holding them; other workers show them once flushed.
+    SCORE_WRITE_BEHIND = os.environ.get('SCORE_WRITE_BEHIND', '0') == '1'
+    SCORE_WRITE_BATCH_SIZE = int(os.environ.get('SCORE_WRITE_BATCH_SIZE', 200))
+    SCORE_WRITE_MAX_DELAY_MS = float(os.environ.get('SCORE_WRITE_MAX_DELAY_MS', 200))
+    # Must survive a reboot (the crash the journal exists for), so not under the often tmpfs temp dir
+    SCORE_JOURNAL_DIR = os.environ.get('SCORE_JOURNAL_DIR', os.path.join(BASE_DIR, 'instance', 'score_journal'))
+    SCORE_JOURNAL_FSYNC = os.environ.get('SCORE_JOURNAL_FSYNC', '1') == '1'
+    # Timed quiz sessions: 'redis' (shared by every worker, needs REDIS_URL), 'local' (in process memory, so
+    # only correct with a single worker process, e.g. development) or 'off'
+    QUIZ_SESSIONS = os.environ.get('QUIZ_SESSIONS', 'redis' if REDIS_URL else 'off')
+    QUIZ_SESSION_GRACE_SECONDS = int(os.environ.get('QUIZ_SESSION_GRACE_SECONDS', 5))  # Late autosaves still accepted
+    QUIZ_SESSION_POLL_SECONDS = float(os.environ.get('QUIZ_SESSION_POLL_SECONDS', 1))  # Timer poll with shared (Redis) sessions
+    QUIZ_SESSION_RETRY_SECONDS = float(os.environ.get('QUIZ_SESSION_RETRY_SECONDS', 10))  # After a failed auto-submit
+    # Sessions are kept this long past their deadline, or past their start if untimed
+    QUIZ_SESSION_TTL_SECONDS = int(os.environ.get('QUIZ_SESSION_TTL_SECONDS', 3600))
+    ANSWER_KEY_CACHE_TTL = int(os.environ.get('ANSWER_KEY_CACHE_TTL', 300))
+    ANSWER_KEY_CACHE_MAX_SIZE = int(os.environ.get('ANSWER_KEY_CACHE_MAX_SIZE', 256))
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))  # Seconds a catalog response is kept
+    RESPONSE_CACHE_MAX_SIZE = int(os.environ.get('RESPONSE_CACHE_MAX_SIZE', 512))
+    QUIZ_STATS_TOP_K = int(os.environ.get('QUIZ_STATS_TOP_K', 10))  # Leaderboard entries kept per quiz
+    QUIZ_STATS_BUCKET_WIDTH = int(os.environ.get('QUIZ_STATS_BUCKET_WIDTH', 1))  # Score histogram bucket size
@@ -0,0 +1,172 @@
+import os
+import threading
+import time
+import weakref
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from extensions import db
+
+
+class PoolMetrics:
+    """Checkout wait time and saturation counters for the connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.peak_checked_out = 0
+
+    def observe(self, wait, checked_out, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    def snapshot(self, pool):
+        with self._lock:
+            data = {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_total, 6),
+                "wait_seconds_max": round(self.wait_max, 6),
+                "wait_seconds_avg": round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+                "peak_checked_out": self.peak_checked_out,
+            }
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            data.update({
+                "pool_size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "saturation": round(pool.checkedout() / capacity, 4) if capacity else None,
+            })
+        return data
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe(time.perf_counter() - start, self.checkedout(), timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - start, self.checkedout())
+        return connection
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(config, uri=None, poolclass=InstrumentedQueuePool):
+    """Build ``SQLALCHEMY_ENGINE_OPTIONS`` for the configured (or the given) database URI."""
+    uri = uri or config['SQLALCHEMY_DATABASE_URI']
+    url = make_url(uri)
+
+    if is_sqlite(uri):
+        if url.database in (None, '', ':memory:'):
+            # In-memory databases keep SQLAlchemy's single-connection pool
+            return {}
+        return {
+            "poolclass": poolclass,
+            "pool_size": config['DB_POOL_SIZE'],
+            "max_overflow": config['DB_MAX_OVERFLOW'],
+            "pool_timeout": config['DB_POOL_TIMEOUT'],
+            "connect_args": {
+                "timeout": config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+                "check_same_thread": False,
+            },
+        }
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": config['DB_POOL_SIZE'],
+        "max_overflow": config['DB_MAX_OVERFLOW'],
+        "pool_timeout": config['DB_POOL_TIMEOUT'],
+        "pool_recycle": config['DB_POOL_RECYCLE'],
+        "pool_pre_ping": config['DB_POOL_PRE_PING'],
+    }
+
+
+# Engines built in this process; pooled connections must not survive a fork
+_engines = weakref.WeakSet()
+
+
+def _dispose_after_fork():
+    # close=False leaves the parent's sockets/files alone and just forgets them in the child
+    for engine in list(_engines):
+        engine.dispose(close=False)
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_dispose_after_fork)
+
+
+def init_database(app):
+    """Fill in engine options, bind the db and apply SQLite connect-time pragmas."""
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+    # Extra binds (the archive) get plain pools so pool_metrics keeps describing the primary
+    app.config['SQLALCHEMY_BINDS'] = {
+        key: {"url": bind, **engine_options(app.config, bind, QueuePool)} if isinstance(bind, str) else bind
+        for key, bind in (app.config.get('SQLALCHEMY_BINDS') or {}).items()
+    }
+
+    db.init_app(app)
+    with app.app_context():
+        _engines.update(db.engines.values())
+
+    if not is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']):
+        return
+
+    pragmas = [
+        # Off by default in SQLite; the ON DELETE CASCADE keys (and passive_deletes) rely on it
+        "PRAGMA foreign_keys=ON",
+        f"PRAGMA journal_mode={app.config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={app.config['SQLITE_SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(app.config['SQLITE_BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(app.config['SQLITE_MMAP_SIZE'])}",
+    ]
+
+    with app.app_context():
+        @event.listens_for(db.engine, 'connect')
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma in pragmas:
+                cursor.execute(pragma)
+            cursor.close()
+
+
+def init_migrations(app):
+    """Register Flask-Migrate (the ``flask db`` commands) on ``app``."""
+    from flask_migrate import Migrate
+
+    Migrate(app, db, directory=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations'))
+
+
+def upgrade_schema(app):
+    """Bring the primary database to the latest migration, as ``flask db upgrade`` would."""
+    from flask_migrate import upgrade
+
+    if 'migrate' not in app.extensions:
+        init_migrations(app)
+    with app.app_context():
+        upgrade()
@@ -1,4 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
+from flask_redis import FlaskRedis
 
 # Initialize the database
 db = SQLAlchemy()
+
+# Optional Redis client, only initialised when REDIS_URL is configured
+redis_client = FlaskRedis()
@@ -0,0 +1,80 @@
+from sqlalchemy import func, select
+
+from extensions import db
+from models.model import (Subject, Chapter, Quiz, Question, Score, QuizStats,
+                          QuestionSignature, QuestionBand)
+from admin.response_cache import bump_version
+from signals import quizzes_changed
+
+LEVELS = ('subject', 'chapter', 'quiz')
+
+# Catalog tables whose cached responses change when a level is deleted
+_CACHED_TABLES = {
+    'subject': ('subjects', 'chapters', 'quizzes'),
+    'chapter': ('chapters', 'quizzes'),
+    'quiz': ('quizzes',),
+}
+
+
+def _delete_plan(level, ids):
+    """``[(name, table, where clause)]`` children first, so every step only sees rows whose parents still exist."""
+    if level == 'subject':
+        chapter_ids = select(Chapter.id).where(Chapter.subject_id.in_(ids))
+    elif level == 'chapter':
+        chapter_ids = ids
+    if level == 'quiz':
+        quiz_ids = ids
+    else:
+        quiz_ids = select(Quiz.id).where(Quiz.chapter_id.in_(chapter_ids))
+    question_ids = select(Question.id).where(Question.quiz_id.in_(quiz_ids))
+
+    plan = [
+        ('question_lsh_bands', QuestionBand.__table__, QuestionBand.question_id.in_(question_ids)),
+        ('question_signatures', QuestionSignature.__table__, QuestionSignature.question_id.in_(question_ids)),
+        ('questions', Question.__table__, Question.quiz_id.in_(quiz_ids)),
+        ('scores', Score.__table__, Score.quiz_id.in_(quiz_ids)),
+        ('quiz_stats', QuizStats.__table__, QuizStats.quiz_id.in_(quiz_ids)),
+        ('quizzes', Quiz.__table__, Quiz.id.in_(quiz_ids)),
+    ]
+    if level != 'quiz':
+        plan.append(('chapters', Chapter.__table__, Chapter.id.in_(chapter_ids)))
+    if level == 'subject':
+        plan.append(('subjects', Subject.__table__, Subject.id.in_(ids)))
+    return plan, quiz_ids
+
+
+def delete_hierarchy(level, ids, dry_run=False):
+    """Delete subjects, chapters or quizzes and everything below them.
+
+    Runs one DELETE per table in a single transaction without loading ORM
+    objects, so mapper events do not fire; the per-quiz caches are notified
+    and the catalog versions bumped here instead. ``dry_run`` returns the
+    row counts the delete would touch, in one SELECT, and changes nothing.
+    """
+    if level not in LEVELS:
+        raise ValueError(f'level must be one of {", ".join(LEVELS)}')
+    ids = list(ids)
+    plan, quiz_ids = _delete_plan(level, ids)
+
+    if dry_run:
+        counts = db.session.execute(select(*[
+            select(func.count()).select_from(table).where(where).scalar_subquery().label(name)
+            for name, table, where in plan
+        ])).one()
+        return dict(counts._mapping)
+
+    affected_quizzes = ids if level == 'quiz' else db.session.scalars(quiz_ids).all()
+    counts = {}
+    try:
+        for name, table, where in plan:
+            counts[name] = db.session.execute(table.delete().where(where)).rowcount
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # Rows removed behind the session's back must not be served from its identity map
+    db.session.expire_all()
+    quizzes_changed(affected_quizzes)
+    bump_version(*_CACHED_TABLES[level])
+    return counts
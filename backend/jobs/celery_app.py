@@ -0,0 +1,76 @@
+import uuid
+from datetime import datetime
+
+from celery import Celery, Task
+
+from extensions import db
+from models.model import Job
+
+
+def celery_init_app(app):
+    """Create the Celery app bound to ``app`` and register it as ``app.extensions['celery']``.
+
+    Every task runs inside an app context. When the task id matches a ``Job``
+    row, its status, result and error are recorded there for ``/admin/jobs/<id>``.
+    """
+    class FlaskTask(Task):
+        def __call__(self, *args, **kwargs):
+            with app.app_context():
+                job_id = self.request.id
+                job = db.session.get(Job, job_id) if job_id else None
+                if job is None:
+                    return self.run(*args, **kwargs)
+
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+                try:
+                    result = self.run(*args, **kwargs)
+                except Exception as exc:
+                    db.session.rollback()
+                    job = db.session.get(Job, job_id)
+                    job.status = 'failed'
+                    job.error = str(exc)
+                    job.finished_at = datetime.utcnow()
+                    db.session.commit()
+                    raise
+
+                job = db.session.get(Job, job_id)
+                job.status = 'succeeded'
+                job.result = result
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+                return result
+
+    celery_app = Celery(app.name, task_cls=FlaskTask)
+    celery_app.config_from_object(app.config['CELERY'])
+    celery_app.set_default()
+    app.extensions['celery'] = celery_app
+    return celery_app
+
+
+def enqueue(task, name, created_by=None, args=()):
+    """Record a ``Job`` and dispatch ``task`` with the job id as its task id."""
+    job = Job(id=str(uuid.uuid4()), name=name, status='queued', created_by=created_by)
+    db.session.add(job)
+    db.session.commit()
+    job_id = job.id
+
+    task.apply_async(args=args, task_id=job_id)
+
+    # Eager runs update the row from their own session, so re-read it
+    db.session.expire_all()
+    return db.session.get(Job, job_id)
+
+
+def serialize_job(job):
+    return {
+        "id": job.id,
+        "name": job.name,
+        "status": job.status,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None
+    }
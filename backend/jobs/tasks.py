@@ -0,0 +1,55 @@
+import os
+from datetime import date
+
+from celery import shared_task
+
+from extensions import db
+from models.model import Subject, Chapter, QuizStats
+from admin.bulk_import import QuestionImporter, iter_rows
+from hierarchy import delete_hierarchy
+from archive import archive_quizzes as archive_old_quizzes
+from quiz_stats import get_quiz_stats, rebuild_stats
+
+
+@shared_task(name='jobs.delete_subject')
+def delete_subject(subject_id):
+    if db.session.get(Subject, subject_id) is None:
+        return {"deleted": False}
+    counts = delete_hierarchy('subject', [subject_id])
+    return {"deleted": True, "subject_id": subject_id, "counts": counts}
+
+
+@shared_task(name='jobs.delete_chapter')
+def delete_chapter(chapter_id):
+    if db.session.get(Chapter, chapter_id) is None:
+        return {"deleted": False}
+    counts = delete_hierarchy('chapter', [chapter_id])
+    return {"deleted": True, "chapter_id": chapter_id, "counts": counts}
+
+
+@shared_task(name='jobs.import_questions')
+def import_questions(path, fmt, batch_size, duplicates='off', threshold=0.8):
+    # The upload was spooled to disk by the request; remove it once imported
+    try:
+        with open(path, 'rb') as stream:
+            importer = QuestionImporter(batch_size=batch_size, duplicates=duplicates, threshold=threshold)
+            return importer.run(iter_rows(stream, fmt))
+    finally:
+        os.remove(path)
+
+
+@shared_task(name='jobs.quiz_stats_report')
+def quiz_stats_report():
+    # Loading every row up front lets get_quiz_stats hit the identity map
+    all_stats = QuizStats.query.order_by(QuizStats.quiz_id).all()
+    return {"quizzes": [get_quiz_stats(stats.quiz_id) for stats in all_stats]}
+
+
+@shared_task(name='jobs.rebuild_quiz_stats')
+def rebuild_quiz_stats(check_only=False):
+    return rebuild_stats(check_only=check_only)
+
+
+@shared_task(name='jobs.archive_quizzes')
+def archive_quizzes(before):
+    return archive_old_quizzes(before=date.fromisoformat(before))
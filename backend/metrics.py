@@ -0,0 +1,169 @@
+import threading
+import time
+
+from flask import g, request
+
+from admin.response_cache import response_cache
+from auth.principal_cache import principal_cache
+from database import pool_metrics
+from extensions import db
+from query_budget import start_sql_counters
+from user.answer_key import answer_key_cache
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    inner = ','.join(f'{name}="{str(value)}"' for name, value in labels)
+    return '{' + inner + '}'
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{_format_labels(zip(self.labelnames, key))} {value}')
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, '') for name in self.labelnames)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                labels = list(zip(self.labelnames, key))
+                for bound, count in zip(self.buckets, series):
+                    lines.append(f'{self.name}_bucket{_format_labels(labels + [("le", bound)])} {count}')
+                lines.append(f'{self.name}_bucket{_format_labels(labels + [("le", "+Inf")])} {series[-1]}')
+                lines.append(f'{self.name}_sum{_format_labels(labels)} {series[-2]}')
+                lines.append(f'{self.name}_count{_format_labels(labels)} {series[-1]}')
+        return lines
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Request latency by endpoint.',
+                            ('endpoint', 'method', 'status'))
+REQUEST_SQL_STATEMENTS = Histogram('http_request_sql_statements', 'SQL statements executed per request.',
+                                   ('endpoint',), buckets=COUNT_BUCKETS)
+REQUEST_SQL_SECONDS = Histogram('http_request_sql_seconds', 'Time spent in SQL per request.', ('endpoint',))
+JWT_DECODE_SECONDS = Histogram('jwt_decode_seconds', 'Time spent decoding and verifying JWTs.',
+                               buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01))
+BCRYPT_SECONDS = Histogram('bcrypt_seconds', 'Password hash/check time including executor queueing.',
+                           ('operation',))
+RATE_LIMIT_REJECTIONS = Counter('rate_limit_rejections_total', 'Requests rejected by the rate limiter.',
+                                ('endpoint', 'key'))
+
+registry = [REQUEST_LATENCY, REQUEST_SQL_STATEMENTS, REQUEST_SQL_SECONDS, JWT_DECODE_SECONDS, BCRYPT_SECONDS,
+            RATE_LIMIT_REJECTIONS]
+
+
+def render_metrics(gauge_collectors=()):
+    """Render the registry plus ``gauge_collectors``, callables returning ``[(name, help, value), ...]``."""
+    lines = []
+    for metric in registry:
+        lines.extend(metric.render())
+    for collect in gauge_collectors:
+        for name, help_text, value in collect():
+            if value is None:
+                continue
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}'])
+    return '\n'.join(lines) + '\n'
+
+
+def _cache_gauges(prefix, cache):
+    def collect():
+        stats = cache.stats()
+        return [(f'{prefix}_{field}', f'{prefix.replace("_", " ")} {field}', stats[field])
+                for field in ('hits', 'misses', 'evictions', 'invalidations', 'size')]
+    return collect
+
+
+def init_metrics(app):
+    """Record per-request latency and SQL usage and serve them on ``/metrics``."""
+    if not app.config.get('METRICS_ENABLED'):
+        return
+
+    def _pool_gauges():
+        with app.app_context():
+            snapshot = pool_metrics.snapshot(db.engine.pool)
+        return [(f'db_pool_{field}', f'db pool {field}', value) for field, value in snapshot.items()]
+
+    # Kept on the app, so another app built in this process neither repeats them nor keeps this one alive
+    app.extensions['metrics'] = [
+        _cache_gauges('principal_cache', principal_cache),
+        _cache_gauges('answer_key_cache', answer_key_cache),
+        _cache_gauges('response_cache', response_cache),
+        _pool_gauges,
+    ]
+
+    @app.before_request
+    def _start_request_metrics():
+        g.request_started = time.perf_counter()
+        start_sql_counters()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+        endpoint = request.endpoint or 'unmatched'
+        REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint=endpoint,
+                                method=request.method, status=response.status_code)
+        REQUEST_SQL_STATEMENTS.observe(g.get('sql_statement_count', 0), endpoint=endpoint)
+        REQUEST_SQL_SECONDS.observe(g.get('sql_seconds', 0.0), endpoint=endpoint)
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        return app.response_class(render_metrics(app.extensions['metrics']), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,113 @@
+"""baseline schema
+
+Revision ID: 3b1f0c9d2a11
+Revises: 
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1f0c9d2a11'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases created earlier by db.create_all() already have these tables,
+    # so only create the ones that are missing.
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table('users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password', sa.String(length=100), nullable=False),
+            sa.Column('full_name', sa.String(length=100), nullable=False),
+            sa.Column('qualification', sa.Integer(), nullable=False),
+            sa.Column('dob', sa.Date(), nullable=False),
+            sa.Column('is_admin', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email')
+        )
+    if 'subjects' not in existing:
+        op.create_table('subjects',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('description', sa.String(length=255), nullable=True),
+            sa.Column('qualification', sa.Integer(), nullable=False),
+            sa.Column('created_by', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('name')
+        )
+    if 'chapters' not in existing:
+        op.create_table('chapters',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('description', sa.String(length=255), nullable=True),
+            sa.Column('subject_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['subject_id'], ['subjects.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'quizzes' not in existing:
+        op.create_table('quizzes',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('chapter_id', sa.Integer(), nullable=False),
+            sa.Column('date_of_quiz', sa.Date(), nullable=False),
+            sa.Column('time_duration', sa.Time(), nullable=False),
+            sa.Column('remarks', sa.String(length=255), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['chapter_id'], ['chapters.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'questions' not in existing:
+        op.create_table('questions',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('quiz_id', sa.Integer(), nullable=False),
+            sa.Column('question_statement', sa.Text(), nullable=False),
+            sa.Column('option1', sa.String(length=100), nullable=False),
+            sa.Column('option2', sa.String(length=100), nullable=False),
+            sa.Column('option3', sa.String(length=100), nullable=False),
+            sa.Column('option4', sa.String(length=100), nullable=False),
+            sa.Column('correct_option', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'scores' not in existing:
+        op.create_table('scores',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('quiz_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('time_stamp_of_attempt', sa.DateTime(), nullable=True),
+            sa.Column('total_scored', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'quiz_stats' not in existing:
+        op.create_table('quiz_stats',
+            sa.Column('quiz_id', sa.Integer(), nullable=False),
+            sa.Column('attempt_count', sa.Integer(), nullable=False),
+            sa.Column('score_sum', sa.Integer(), nullable=False),
+            sa.Column('score_sum_sq', sa.Integer(), nullable=False),
+            sa.Column('top_scores', sa.JSON(), nullable=False),
+            sa.Column('histogram', sa.JSON(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ),
+            sa.PrimaryKeyConstraint('quiz_id')
+        )
+
+
+def downgrade():
+    op.drop_table('quiz_stats')
+    op.drop_table('scores')
+    op.drop_table('questions')
+    op.drop_table('quizzes')
+    op.drop_table('chapters')
+    op.drop_table('subjects')
+    op.drop_table('users')
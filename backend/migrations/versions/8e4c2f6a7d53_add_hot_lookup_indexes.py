@@ -0,0 +1,35 @@
+"""add hot lookup indexes
+
+Revision ID: 8e4c2f6a7d53
+Revises: 3b1f0c9d2a11
+Create Date: 2026-10-18 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4c2f6a7d53'
+down_revision = '3b1f0c9d2a11'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # if_not_exists: db.create_all() may already have built these from the models
+    op.create_index('ix_subjects_qualification_name', 'subjects', ['qualification', 'name'], unique=False, if_not_exists=True)
+    op.create_index('ix_chapters_subject_id_name', 'chapters', ['subject_id', 'name'], unique=False, if_not_exists=True)
+    op.create_index('ix_quizzes_chapter_id_date_of_quiz', 'quizzes', ['chapter_id', 'date_of_quiz'], unique=False, if_not_exists=True)
+    op.create_index('ix_quizzes_date_of_quiz', 'quizzes', ['date_of_quiz'], unique=False, if_not_exists=True)
+    op.create_index('ix_questions_quiz_id', 'questions', ['quiz_id'], unique=False, if_not_exists=True)
+    op.create_index('ix_scores_quiz_id_user_id', 'scores', ['quiz_id', 'user_id'], unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_scores_quiz_id_user_id', table_name='scores', if_exists=True)
+    op.drop_index('ix_questions_quiz_id', table_name='questions', if_exists=True)
+    op.drop_index('ix_quizzes_date_of_quiz', table_name='quizzes', if_exists=True)
+    op.drop_index('ix_quizzes_chapter_id_date_of_quiz', table_name='quizzes', if_exists=True)
+    op.drop_index('ix_chapters_subject_id_name', table_name='chapters', if_exists=True)
+    op.drop_index('ix_subjects_qualification_name', table_name='subjects', if_exists=True)
@@ -0,0 +1,37 @@
+"""add soft delete columns
+
+Revision ID: a7d4e2f9c150
+Revises: f3c6d2b8e415
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7d4e2f9c150'
+down_revision = 'f3c6d2b8e415'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    # The archive tables live in the separate 'archive' bind and are created by archive.py
+    for table in ('quizzes', 'scores'):
+        if not _has_column(table, 'deleted_at'):
+            with op.batch_alter_table(table) as batch_op:
+                batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_scores_user_id_time_stamp_of_attempt', 'scores', ['user_id', 'time_stamp_of_attempt'],
+                    unique=False, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_scores_user_id_time_stamp_of_attempt', table_name='scores', if_exists=True)
+    for table in ('scores', 'quizzes'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('deleted_at')
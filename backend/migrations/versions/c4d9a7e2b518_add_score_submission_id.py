@@ -0,0 +1,34 @@
+"""add score submission id
+
+Revision ID: c4d9a7e2b518
+Revises: b8e1f4a6c293
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d9a7e2b518'
+down_revision = 'b8e1f4a6c293'
+branch_labels = None
+depends_on = None
+
+
+def _has_column(table, column):
+    return column in {c['name'] for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    # Existing scores keep a NULL id; only journaled writes need one
+    if not _has_column('scores', 'submission_id'):
+        with op.batch_alter_table('scores') as batch_op:
+            batch_op.add_column(sa.Column('submission_id', sa.String(length=32), nullable=True))
+    op.create_index('ix_scores_submission_id', 'scores', ['submission_id'], unique=True, if_not_exists=True)
+
+
+def downgrade():
+    op.drop_index('ix_scores_submission_id', table_name='scores', if_exists=True)
+    with op.batch_alter_table('scores') as batch_op:
+        batch_op.drop_column('submission_id')
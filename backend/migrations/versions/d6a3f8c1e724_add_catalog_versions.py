@@ -0,0 +1,33 @@
+"""add catalog versions
+
+Revision ID: d6a3f8c1e724
+Revises: c4d9a7e2b518
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6a3f8c1e724'
+down_revision = 'c4d9a7e2b518'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'catalog_versions' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    catalog_versions = op.create_table('catalog_versions',
+        sa.Column('namespace', sa.String(length=50), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('namespace')
+    )
+    # Seeded so bumping the cached namespaces is a plain UPDATE
+    op.bulk_insert(catalog_versions, [{'namespace': namespace, 'version': 0}
+                                      for namespace in ('subjects', 'chapters', 'quizzes')])
+
+
+def downgrade():
+    op.drop_table('catalog_versions')
@@ -0,0 +1,79 @@
+"""add full-text search index
+
+Revision ID: d91b3e5c7a20
+Revises: c2a7e9b4f1d6
+Create Date: 2026-10-18 10:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91b3e5c7a20'
+down_revision = 'c2a7e9b4f1d6'
+branch_labels = None
+depends_on = None
+
+# The index as it was at this revision; rowid is id * 4 + 1/2/3 for question/chapter/subject.
+# Spelled out rather than imported from search.py, so later changes there cannot alter this revision.
+QUESTION_ROW = ("(new.id * 4 + 1, 'question', new.id, new.question_statement, "
+                "new.option1 || ' ' || new.option2 || ' ' || new.option3 || ' ' || new.option4)")
+CHAPTER_ROW = "(new.id * 4 + 2, 'chapter', new.id, new.name, coalesce(new.description, ''))"
+SUBJECT_ROW = "(new.id * 4 + 3, 'subject', new.id, new.name, coalesce(new.description, ''))"
+INSERT = "INSERT INTO search_index(rowid, kind, ref_id, title, body) VALUES "
+
+CREATE_STATEMENTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS questions_search_ai AFTER INSERT ON questions "
+    f"BEGIN {INSERT}{QUESTION_ROW}; END",
+    "CREATE TRIGGER IF NOT EXISTS questions_search_ad AFTER DELETE ON questions "
+    "BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 1; END",
+    f"CREATE TRIGGER IF NOT EXISTS questions_search_au AFTER UPDATE ON questions "
+    f"BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 1; {INSERT}{QUESTION_ROW}; END",
+    f"CREATE TRIGGER IF NOT EXISTS chapters_search_ai AFTER INSERT ON chapters "
+    f"BEGIN {INSERT}{CHAPTER_ROW}; END",
+    "CREATE TRIGGER IF NOT EXISTS chapters_search_ad AFTER DELETE ON chapters "
+    "BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 2; END",
+    f"CREATE TRIGGER IF NOT EXISTS chapters_search_au AFTER UPDATE ON chapters "
+    f"BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 2; {INSERT}{CHAPTER_ROW}; END",
+    f"CREATE TRIGGER IF NOT EXISTS subjects_search_ai AFTER INSERT ON subjects "
+    f"BEGIN {INSERT}{SUBJECT_ROW}; END",
+    "CREATE TRIGGER IF NOT EXISTS subjects_search_ad AFTER DELETE ON subjects "
+    "BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 3; END",
+    f"CREATE TRIGGER IF NOT EXISTS subjects_search_au AFTER UPDATE ON subjects "
+    f"BEGIN DELETE FROM search_index WHERE rowid = old.id * 4 + 3; {INSERT}{SUBJECT_ROW}; END",
+]
+
+DROP_STATEMENTS = [f"DROP TRIGGER IF EXISTS {table}_search_{suffix}"
+                   for table in ('questions', 'chapters', 'subjects') for suffix in ('ai', 'ad', 'au')]
+DROP_STATEMENTS.append("DROP TABLE IF EXISTS search_index")
+
+
+def upgrade():
+    # FTS5 virtual table plus sync triggers; other backends have no search index yet
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_STATEMENTS + CREATE_STATEMENTS:
+        op.execute(statement)
+    op.execute(
+        "INSERT INTO search_index(rowid, kind, ref_id, title, body) "
+        "SELECT id * 4 + 1, 'question', id, question_statement, "
+        "option1 || ' ' || option2 || ' ' || option3 || ' ' || option4 FROM questions"
+    )
+    op.execute(
+        "INSERT INTO search_index(rowid, kind, ref_id, title, body) "
+        "SELECT id * 4 + 2, 'chapter', id, name, coalesce(description, '') FROM chapters"
+    )
+    op.execute(
+        "INSERT INTO search_index(rowid, kind, ref_id, title, body) "
+        "SELECT id * 4 + 3, 'subject', id, name, coalesce(description, '') FROM subjects"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in DROP_STATEMENTS:
+        op.execute(statement)
@@ -0,0 +1,35 @@
+"""add revoked tokens
+
+Revision ID: e1b5c9d3f207
+Revises: d6a3f8c1e724
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1b5c9d3f207'
+down_revision = 'd6a3f8c1e724'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if 'revoked_tokens' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('revoked_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=36), nullable=False),
+        sa.Column('expires_at', sa.Integer(), nullable=False),
+        sa.Column('revoked_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('jti')
+    )
+    op.create_index('ix_revoked_tokens_revoked_at', 'revoked_tokens', ['revoked_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_revoked_tokens_revoked_at', table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
@@ -0,0 +1,91 @@
+"""add near-duplicate question index
+
+Revision ID: e5f8a1c3b972
+Revises: d91b3e5c7a20
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+import hashlib
+import random
+import re
+import struct
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5f8a1c3b972'
+down_revision = 'd91b3e5c7a20'
+branch_labels = None
+depends_on = None
+
+# MinHash as near_duplicates.py computed it at this revision (64 permutations, 16 bands of 4).
+# Copied rather than imported, so later changes there cannot alter this backfill.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+_PRIME = (1 << 61) - 1
+_seed = random.Random(0x5157)
+_PERMUTATIONS = [(_seed.randrange(1, _PRIME), _seed.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_PACK = struct.Struct(f'<{NUM_PERM}Q')
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _minhash(statement, options):
+    words = re.findall(r'\w+', ' '.join([statement or ''] + [option or '' for option in options]).lower())
+    shingles = set(words) if len(words) < 2 else {f'{words[i]} {words[i + 1]}' for i in range(len(words) - 1)}
+    hashes = [_hash64(shingle) for shingle in shingles]
+    if not hashes:
+        return (_PRIME,) * NUM_PERM
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def _band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'<I{ROWS}Q', band, *chunk), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def upgrade():
+    bind = op.get_bind()
+    if 'question_signatures' not in sa.inspect(bind).get_table_names():
+        op.create_table('question_signatures',
+            sa.Column('question_id', sa.Integer(), nullable=False),
+            sa.Column('signature', sa.LargeBinary(), nullable=False),
+            sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+            sa.PrimaryKeyConstraint('question_id')
+        )
+        op.create_table('question_lsh_bands',
+            sa.Column('band_key', sa.BigInteger(), autoincrement=False, nullable=False),
+            sa.Column('question_id', sa.Integer(), autoincrement=False, nullable=False),
+            sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+            sa.PrimaryKeyConstraint('band_key', 'question_id')
+        )
+        op.create_index('ix_question_lsh_bands_question_id', 'question_lsh_bands', ['question_id'], unique=False)
+
+    # Backfill existing questions; the tables may already exist, empty, from create_all()
+    if bind.execute(sa.text("SELECT 1 FROM question_signatures LIMIT 1")).first() is not None:
+        return
+    signatures = sa.table('question_signatures', sa.column('question_id'), sa.column('signature'))
+    bands = sa.table('question_lsh_bands', sa.column('band_key'), sa.column('question_id'))
+    rows = bind.execute(sa.text(
+        "SELECT id, question_statement, option1, option2, option3, option4 FROM questions"
+    )).all()
+    computed = {row[0]: _minhash(row[1], row[2:]) for row in rows}
+    if computed:
+        op.bulk_insert(signatures, [{"question_id": qid, "signature": _PACK.pack(*sig)} for qid, sig in computed.items()])
+        op.bulk_insert(bands, [{"band_key": key, "question_id": qid}
+                               for qid, sig in computed.items() for key in set(_band_keys(sig))])
+
+
+def downgrade():
+    op.drop_index('ix_question_lsh_bands_question_id', table_name='question_lsh_bands')
+    op.drop_table('question_lsh_bands')
+    op.drop_table('question_signatures')
@@ -0,0 +1,85 @@
+"""cascade hierarchy foreign keys
+
+Revision ID: f3c6d2b8e415
+Revises: e5f8a1c3b972
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3c6d2b8e415'
+down_revision = 'e5f8a1c3b972'
+branch_labels = None
+depends_on = None
+
+# (table, column, referred table)
+FOREIGN_KEYS = [
+    ('chapters', 'subject_id', 'subjects'),
+    ('quizzes', 'chapter_id', 'chapters'),
+    ('questions', 'quiz_id', 'quizzes'),
+    ('scores', 'quiz_id', 'quizzes'),
+    ('quiz_stats', 'quiz_id', 'quizzes'),
+    ('question_signatures', 'question_id', 'questions'),
+    ('question_lsh_bands', 'question_id', 'questions'),
+]
+
+# SQLite foreign keys are unnamed; batch mode reflects them under this name so they can be dropped
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+# The search triggers as created by d91b3e5c7a20, spelled out so later changes to search.py cannot alter this revision
+_INSERT = "INSERT INTO search_index(rowid, kind, ref_id, title, body) VALUES "
+_QUESTION_ROW = ("(new.id * 4 + 1, 'question', new.id, new.question_statement, "
+                 "new.option1 || ' ' || new.option2 || ' ' || new.option3 || ' ' || new.option4)")
+_CHAPTER_ROW = "(new.id * 4 + 2, 'chapter', new.id, new.name, coalesce(new.description, ''))"
+_SUBJECT_ROW = "(new.id * 4 + 3, 'subject', new.id, new.name, coalesce(new.description, ''))"
+
+
+def _search_statements():
+    statements = [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='porter unicode61')",
+    ]
+    for table, slot, row in (('questions', 1, _QUESTION_ROW), ('chapters', 2, _CHAPTER_ROW),
+                             ('subjects', 3, _SUBJECT_ROW)):
+        delete_old = f"DELETE FROM search_index WHERE rowid = old.id * 4 + {slot}"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN {_INSERT}{row}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN {delete_old}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE ON {table} "
+            f"BEGIN {delete_old}; {_INSERT}{row}; END",
+        ]
+    return statements
+
+
+def _replace_foreign_key(table, column, referred, ondelete):
+    name = f'fk_{table}_{column}_{referred}'
+    existing = next((fk for fk in sa.inspect(op.get_bind()).get_foreign_keys(table)
+                     if fk['constrained_columns'] == [column]), None)
+    # On SQLite this recreates the table, which is only safe while PRAGMA foreign_keys is off (the default)
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        # A database that never had the constraint just gets the new one; an unnamed one is dropped by its convention name
+        if existing is not None:
+            batch_op.drop_constraint(existing['name'] or name, type_='foreignkey')
+        batch_op.create_foreign_key(name, referred, [column], ['id'], ondelete=ondelete)
+
+
+def _restore_search_triggers():
+    # Recreating chapters/questions on SQLite drops their search triggers
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in _search_statements():
+            op.execute(statement)
+
+
+def upgrade():
+    for table, column, referred in FOREIGN_KEYS:
+        _replace_foreign_key(table, column, referred, 'CASCADE')
+    _restore_search_triggers()
+
+
+def downgrade():
+    for table, column, referred in reversed(FOREIGN_KEYS):
+        _replace_foreign_key(table, column, referred, None)
+    _restore_search_triggers()
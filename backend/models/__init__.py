@@ -1 +1,2 @@
-from .model import User, Subject, Chapter, Quiz, Question, Score
+from .model import User, Subject, Chapter, Quiz, Question, Score, QuizStats, Job, RevokedToken, CatalogVersion, QuestionSignature, QuestionBand, \
+    ArchivedQuiz, ArchivedQuestion, ArchivedScore
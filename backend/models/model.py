@@ -13,6 +13,8 @@ class User(db.Model):
     dob = db.Column(db.Date, nullable=False)
     is_admin = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Tokens carrying an older version are rejected; bumped on role changes and "log out everywhere"
+    token_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     def __repr__(self):
         return f'<User {self.email}>'
@@ -20,6 +22,9 @@ class User(db.Model):
 
 class Subject(db.Model):
     __tablename__ = 'subjects'
+    __table_args__ = (
+        db.Index('ix_subjects_qualification_name', 'qualification', 'name'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), unique=True, nullable=False)
@@ -27,44 +32,63 @@ class Subject(db.Model):
     qualification = db.Column(db.Integer, nullable=False)  # Class 5 to 12
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
 
-    chapters = db.relationship('Chapter', backref='subject', lazy=True)
+    # Lazy by default; endpoints opt into joinedload/selectinload explicitly.
+    # passive_deletes: children go with set-based DELETEs (see hierarchy.py) or
+    # ON DELETE CASCADE, never by loading the subtree into the session.
+    chapters = db.relationship('Chapter', back_populates='subject', lazy='select',
+                               cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f'<Subject {self.name}>'
 
 class Chapter(db.Model):
     __tablename__ = 'chapters'
+    __table_args__ = (
+        db.Index('ix_chapters_subject_id_name', 'subject_id', 'name'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(255), nullable=True)
-    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id'), nullable=False)
+    subject_id = db.Column(db.Integer, db.ForeignKey('subjects.id', ondelete='CASCADE'), nullable=False)
 
-    quizzes = db.relationship('Quiz', backref='chapter', lazy=True)
+    subject = db.relationship('Subject', back_populates='chapters', lazy='select')
+    quizzes = db.relationship('Quiz', back_populates='chapter', lazy='select',
+                              cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f'<Chapter {self.name}>'
 
 class Quiz(db.Model):
     __tablename__ = 'quizzes'
+    __table_args__ = (
+        db.Index('ix_quizzes_chapter_id_date_of_quiz', 'chapter_id', 'date_of_quiz'),
+        db.Index('ix_quizzes_date_of_quiz', 'date_of_quiz'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id'), nullable=False)
+    chapter_id = db.Column(db.Integer, db.ForeignKey('chapters.id', ondelete='CASCADE'), nullable=False)
     date_of_quiz = db.Column(db.Date, nullable=False)
     time_duration = db.Column(db.Time, nullable=False)  # hh:mm format
     remarks = db.Column(db.String(255), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Soft delete; the archiver moves these out
 
-    questions = db.relationship('Question', backref='quiz', lazy=True)
+    chapter = db.relationship('Chapter', back_populates='quizzes', lazy='select')
+    questions = db.relationship('Question', back_populates='quiz', lazy='select',
+                                cascade='all, delete-orphan', passive_deletes=True)
 
     def __repr__(self):
         return f'<Quiz {self.id}>'
         
 class Question(db.Model):
     __tablename__ = 'questions'
+    __table_args__ = (
+        db.Index('ix_questions_quiz_id', 'quiz_id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), nullable=False)
     question_statement = db.Column(db.Text, nullable=False)
     option1 = db.Column(db.String(100), nullable=False)
     option2 = db.Column(db.String(100), nullable=False)
@@ -72,17 +96,178 @@ class Question(db.Model):
     option4 = db.Column(db.String(100), nullable=False)
     correct_option = db.Column(db.Integer, nullable=False)
 
+    quiz = db.relationship('Quiz', back_populates='questions', lazy='select')
+
     def __repr__(self):
         return f'<Question {self.id}>'
     
 class Score(db.Model):
     __tablename__ = 'scores'
+    __table_args__ = (
+        db.Index('ix_scores_quiz_id_user_id', 'quiz_id', 'user_id'),
+        db.Index('ix_scores_user_id_time_stamp_of_attempt', 'user_id', 'time_stamp_of_attempt'),
+        db.Index('ix_scores_submission_id', 'submission_id', unique=True),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     time_stamp_of_attempt = db.Column(db.DateTime, default=datetime.utcnow)
     total_scored = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True)  # Set together with its quiz's
+    submission_id = db.Column(db.String(32), nullable=True)  # Client-side id that makes journal replay idempotent
 
     def __repr__(self):
         return f'<Score {self.id}>'
+
+
+class QuizStats(db.Model):
+    __tablename__ = 'quiz_stats'
+
+    # Running aggregates over scores, maintained on every Score insert
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quizzes.id', ondelete='CASCADE'), primary_key=True)
+    attempt_count = db.Column(db.Integer, nullable=False, default=0)
+    score_sum = db.Column(db.Integer, nullable=False, default=0)
+    score_sum_sq = db.Column(db.Integer, nullable=False, default=0)
+    top_scores = db.Column(db.JSON, nullable=False, default=list)  # [[total_scored, score_id, user_id], ...] best first
+    histogram = db.Column(db.JSON, nullable=False, default=dict)  # {bucket_start: count}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<QuizStats {self.quiz_id}>'
+
+
+class Job(db.Model):
+    __tablename__ = 'jobs'
+
+    # The id doubles as the Celery task id
+    id = db.Column(db.String(36), primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued, running, succeeded, failed
+    result = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.status}>'
+
+
+class RevokedToken(db.Model):
+    __tablename__ = 'revoked_tokens'
+
+    # Logged-out tokens when there is no Redis; workers pick up new rows every REVOCATION_SYNC_SECONDS
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    expires_at = db.Column(db.Integer, nullable=False)  # The token's exp; the row is useless after it
+    revoked_at = db.Column(db.Float, nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<RevokedToken {self.jti}>'
+
+
+class CatalogVersion(db.Model):
+    __tablename__ = 'catalog_versions'
+
+    # Bumped on every catalog change; cached responses are keyed by these when Redis is off
+    namespace = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f'<CatalogVersion {self.namespace} {self.version}>'
+
+
+class QuestionSignature(db.Model):
+    __tablename__ = 'question_signatures'
+
+    # MinHash signature of the question text, packed as unsigned 64-bit ints
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+    def __repr__(self):
+        return f'<QuestionSignature {self.question_id}>'
+
+
+class QuestionBand(db.Model):
+    __tablename__ = 'question_lsh_bands'
+    __table_args__ = (
+        db.Index('ix_question_lsh_bands_question_id', 'question_id'),
+    )
+
+    # One row per LSH band; questions sharing a band_key are near-duplicate candidates
+    band_key = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+    question_id = db.Column(db.Integer, db.ForeignKey('questions.id', ondelete='CASCADE'), primary_key=True,
+                            autoincrement=False)
+
+    def __repr__(self):
+        return f'<QuestionBand {self.band_key} {self.question_id}>'
+
+
+# Archive tier: lives in the 'archive' bind (ARCHIVE_DATABASE_URL), filled by archive.py.
+# Rows keep their original ids and carry the chapter/subject names they had when
+# archived, so they stay readable after the live hierarchy changes.
+
+class ArchivedQuiz(db.Model):
+    __bind_key__ = 'archive'
+    __tablename__ = 'archived_quizzes'
+    __table_args__ = (
+        db.Index('ix_archived_quizzes_subject_id_date_of_quiz', 'subject_id', 'date_of_quiz'),
+        db.Index('ix_archived_quizzes_chapter_id_date_of_quiz', 'chapter_id', 'date_of_quiz'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    chapter_id = db.Column(db.Integer, nullable=False)
+    chapter_name = db.Column(db.String(100), nullable=True)
+    subject_id = db.Column(db.Integer, nullable=True)
+    subject_name = db.Column(db.String(100), nullable=True)
+    qualification = db.Column(db.Integer, nullable=True)
+    date_of_quiz = db.Column(db.Date, nullable=False)
+    time_duration = db.Column(db.Time, nullable=False)
+    remarks = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<ArchivedQuiz {self.id}>'
+
+
+class ArchivedQuestion(db.Model):
+    __bind_key__ = 'archive'
+    __tablename__ = 'archived_questions'
+    __table_args__ = (
+        db.Index('ix_archived_questions_quiz_id', 'quiz_id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    quiz_id = db.Column(db.Integer, nullable=False)
+    question_statement = db.Column(db.Text, nullable=False)
+    option1 = db.Column(db.String(100), nullable=False)
+    option2 = db.Column(db.String(100), nullable=False)
+    option3 = db.Column(db.String(100), nullable=False)
+    option4 = db.Column(db.String(100), nullable=False)
+    correct_option = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<ArchivedQuestion {self.id}>'
+
+
+class ArchivedScore(db.Model):
+    __bind_key__ = 'archive'
+    __tablename__ = 'archived_scores'
+    __table_args__ = (
+        db.Index('ix_archived_scores_quiz_id', 'quiz_id'),
+        db.Index('ix_archived_scores_user_id_time_stamp_of_attempt', 'user_id', 'time_stamp_of_attempt'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    quiz_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    time_stamp_of_attempt = db.Column(db.DateTime, nullable=True)
+    total_scored = db.Column(db.Integer, nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<ArchivedScore {self.id}>'
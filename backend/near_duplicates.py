@@ -0,0 +1,252 @@
+import hashlib
+import random
+import re
+import struct
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func, select
+
+from extensions import db
+from models.model import Quiz, Question, QuestionSignature, QuestionBand
+
+# 16 bands of 4 rows: pairs above ~0.5 Jaccard similarity share a band with
+# high probability, so the threshold check only runs on a handful of candidates.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MODES = ('off', 'warn', 'reject')
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures must be comparable across processes and restarts
+_seed = random.Random(0x5157)
+_PERMUTATIONS = [(_seed.randrange(1, _PRIME), _seed.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_PACK = struct.Struct(f'<{NUM_PERM}Q')
+
+signature_table = QuestionSignature.__table__
+band_table = QuestionBand.__table__
+
+
+def _hash64(value):
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def shingles(statement, options):
+    words = re.findall(r'\w+', ' '.join([statement or ''] + [option or '' for option in options]).lower())
+    if len(words) < 2:
+        return set(words)
+    return {f'{words[i]} {words[i + 1]}' for i in range(len(words) - 1)}
+
+
+def minhash(statement, options):
+    hashes = [_hash64(shingle) for shingle in shingles(statement, options)]
+    if not hashes:
+        return (_PRIME,) * NUM_PERM
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(struct.pack(f'<I{ROWS}Q', band, *chunk), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, 'little', signed=True))
+    return keys
+
+
+def similarity(signature_a, signature_b):
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / NUM_PERM
+
+
+def pack(signature):
+    return _PACK.pack(*signature)
+
+
+def unpack(blob):
+    return _PACK.unpack(blob)
+
+
+def _question_signature(question):
+    return minhash(question.question_statement,
+                   [question.option1, question.option2, question.option3, question.option4])
+
+
+def index_rows(connection, signatures):
+    """Store ``{question_id: signature}`` and its bands with two executemany INSERTs."""
+    if not signatures:
+        return
+    connection.execute(signature_table.insert(), [
+        {"question_id": question_id, "signature": pack(signature)}
+        for question_id, signature in signatures.items()
+    ])
+    connection.execute(band_table.insert(), [
+        {"band_key": key, "question_id": question_id}
+        for question_id, signature in signatures.items()
+        for key in set(band_keys(signature))
+    ])
+
+
+def unindex_question(connection, question_id):
+    connection.execute(band_table.delete().where(band_table.c.question_id == question_id))
+    connection.execute(signature_table.delete().where(signature_table.c.question_id == question_id))
+
+
+@event.listens_for(Question, 'after_insert')
+@event.listens_for(Question, 'after_update')
+def _question_saved(mapper, connection, target):
+    unindex_question(connection, target.id)
+    index_rows(connection, {target.id: _question_signature(target)})
+
+
+# before_delete so the index rows go before the question they reference
+@event.listens_for(Question, 'before_delete')
+def _question_deleted(mapper, connection, target):
+    unindex_question(connection, target.id)
+
+
+def _candidates(keys):
+    """Yield ``(band_key, question_id, signature, chapter_id)`` for every indexed question sharing a band."""
+    keys = list(set(keys))
+    for start in range(0, len(keys), 5000):
+        yield from db.session.query(
+            QuestionBand.band_key, QuestionBand.question_id, QuestionSignature.signature, Quiz.chapter_id
+        ).join(QuestionSignature, QuestionSignature.question_id == QuestionBand.question_id) \
+         .join(Question, Question.id == QuestionBand.question_id) \
+         .join(Quiz, Quiz.id == Question.quiz_id) \
+         .filter(QuestionBand.band_key.in_(keys[start:start + 5000]))
+
+
+def find_near_duplicates(signature, chapter_id, threshold, exclude_id=None, limit=5):
+    """Questions in ``chapter_id`` whose estimated similarity to ``signature`` is at least ``threshold``."""
+    matches = {}
+    for _, question_id, blob, candidate_chapter in _candidates(band_keys(signature)):
+        if question_id == exclude_id or question_id in matches or candidate_chapter != chapter_id:
+            continue
+        score = similarity(signature, unpack(blob))
+        if score >= threshold:
+            matches[question_id] = score
+    ranked = sorted(matches.items(), key=lambda item: -item[1])[:limit]
+    return [{"question_id": question_id, "similarity": round(score, 3)} for question_id, score in ranked]
+
+
+class BatchDuplicateChecker:
+    """Near-duplicate check for batches of new rows with one candidate query per batch.
+
+    Rows accepted earlier in the same batch are checked too, so a file that
+    repeats a question is caught even though neither copy is stored yet.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self._stored = {}
+        self._pending = {}
+
+    def load(self, signatures):
+        """Fetch the stored candidates for every band of ``signatures``."""
+        self._stored = {}
+        self._pending = {}
+        for band_key, question_id, blob, chapter_id in _candidates(
+                key for signature in signatures for key in band_keys(signature)):
+            self._stored.setdefault((chapter_id, band_key), []).append((question_id, unpack(blob)))
+
+    def match(self, chapter_id, signature, limit=5):
+        stored = {}
+        pending = {}
+        for key in band_keys(signature):
+            for question_id, other in self._stored.get((chapter_id, key), ()):
+                if question_id not in stored:
+                    stored[question_id] = similarity(signature, other)
+            for row_number, other in self._pending.get((chapter_id, key), ()):
+                if row_number not in pending:
+                    pending[row_number] = similarity(signature, other)
+        matches = [({"question_id": question_id}, score) for question_id, score in stored.items()]
+        matches += [({"row": row_number}, score) for row_number, score in pending.items()]
+        matches = sorted((m for m in matches if m[1] >= self.threshold), key=lambda m: -m[1])[:limit]
+        return [dict(ref, similarity=round(score, 3)) for ref, score in matches]
+
+    def remember(self, row_number, chapter_id, signature):
+        for key in band_keys(signature):
+            self._pending.setdefault((chapter_id, key), []).append((row_number, signature))
+
+
+def duplicate_clusters(threshold, chapter_id=None, limit=100):
+    """Group near-duplicate questions into clusters (connected components of similar pairs)."""
+    shared = select(QuestionBand.band_key).group_by(QuestionBand.band_key) \
+        .having(func.count(QuestionBand.question_id) > 1)
+    query = db.session.query(QuestionBand.band_key, QuestionBand.question_id, QuestionSignature.signature,
+                             Quiz.chapter_id) \
+        .join(QuestionSignature, QuestionSignature.question_id == QuestionBand.question_id) \
+        .join(Question, Question.id == QuestionBand.question_id) \
+        .join(Quiz, Quiz.id == Question.quiz_id) \
+        .filter(QuestionBand.band_key.in_(shared))
+    if chapter_id is not None:
+        query = query.filter(Quiz.chapter_id == chapter_id)
+
+    buckets = {}
+    info = {}
+    for band_key, question_id, blob, question_chapter in query:
+        buckets.setdefault((question_chapter, band_key), []).append(question_id)
+        info[question_id] = (question_chapter, blob)
+
+    parent = {}
+
+    def find(x):
+        while parent.get(x, x) != x:
+            parent[x] = parent.get(parent[x], parent[x])
+            x = parent[x]
+        return x
+
+    signatures = {}
+    linked = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if find(a) == find(b):
+                    continue
+                sig_a = signatures.setdefault(a, unpack(info[a][1]))
+                sig_b = signatures.setdefault(b, unpack(info[b][1]))
+                if similarity(sig_a, sig_b) >= threshold:
+                    parent[find(a)] = find(b)
+                    linked.update((a, b))
+
+    clusters = {}
+    for question_id in linked:
+        clusters.setdefault(find(question_id), set()).add(question_id)
+    clusters = sorted((sorted(members) for members in clusters.values()), key=lambda c: (-len(c), c[0]))[:limit]
+
+    ids = [question_id for members in clusters for question_id in members]
+    statements = dict(db.session.query(Question.id, Question.question_statement)
+                      .filter(Question.id.in_(ids)).all()) if ids else {}
+    return [{
+        "chapter_id": info[members[0]][0],
+        "size": len(members),
+        "questions": [{"id": question_id, "question_statement": statements.get(question_id)}
+                      for question_id in members]
+    } for members in clusters]
+
+
+def rebuild_index(batch_size=1000):
+    """Recompute every signature from the questions table."""
+    connection = db.session.connection()
+    connection.execute(band_table.delete())
+    connection.execute(signature_table.delete())
+    total = 0
+    batch = {}
+    for question in db.session.query(Question).yield_per(batch_size):
+        batch[question.id] = _question_signature(question)
+        if len(batch) >= batch_size:
+            index_rows(connection, batch)
+            total += len(batch)
+            batch = {}
+    index_rows(connection, batch)
+    total += len(batch)
+    db.session.commit()
+    return total
+
+
+duplicates_cli = AppGroup('duplicates', help='Maintain the near-duplicate question index.')
+
+
+@duplicates_cli.command('rebuild')
+def rebuild_command():
+    click.echo(f'{rebuild_index()} questions indexed')
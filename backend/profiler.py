@@ -0,0 +1,110 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter as StackCounter
+from datetime import datetime
+
+from flask import g, request
+
+from metrics import Counter, registry
+
+SLOW_REQUESTS = Counter('slow_requests_profiled_total', 'Slow requests whose stack profile was written.', ('endpoint',))
+registry.append(SLOW_REQUESTS)
+
+
+def _collapse(frame):
+    # One "file:function" per frame, root first, joined the way flamegraph.pl expects
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class SamplingProfiler:
+    """Samples the stacks of threads that are serving a request.
+
+    A single background thread wakes every ``interval`` seconds and records
+    the current stack of every registered request thread, so the cost does
+    not grow with the number of requests being profiled.
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _ensure_running(self):
+        # Started lazily so a preloading master never forks a live sampler thread
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+            self._thread.start()
+
+    def start(self):
+        with self._lock:
+            self._active[threading.get_ident()] = StackCounter()
+            self._ensure_running()
+
+    def stop(self):
+        with self._lock:
+            return self._active.pop(threading.get_ident(), None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            frames = sys._current_frames()
+            with self._lock:
+                for ident, stacks in self._active.items():
+                    frame = frames.get(ident)
+                    if frame is not None:
+                        stacks[_collapse(frame)] += 1
+
+
+def write_profile(output_dir, endpoint, duration, stacks):
+    os.makedirs(output_dir, exist_ok=True)
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    path = os.path.join(output_dir, f'{stamp}-{endpoint}-{int(duration * 1000)}ms.folded')
+    with open(path, 'w') as out:
+        for stack, count in stacks.most_common():
+            out.write(f'{stack} {count}\n')
+    return path
+
+
+def init_profiler(app):
+    """Opt-in: dump a collapsed-stack profile for every request slower than the threshold.
+
+    The ``.folded`` files can be fed straight to ``flamegraph.pl`` or speedscope.
+    """
+    if not app.config.get('PROFILER_ENABLED'):
+        return
+
+    profiler = SamplingProfiler(interval=app.config['PROFILER_INTERVAL_MS'] / 1000)
+    threshold = app.config['PROFILER_SLOW_REQUEST_MS'] / 1000
+    output_dir = app.config['PROFILER_OUTPUT_DIR']
+
+    @app.before_request
+    def _start_profile():
+        g.profile_started = time.perf_counter()
+        profiler.start()
+
+    @app.after_request
+    def _finish_profile(response):
+        stacks = profiler.stop()
+        started = g.get('profile_started')
+        if stacks is None or started is None:
+            return response
+        duration = time.perf_counter() - started
+        if duration >= threshold and stacks:
+            endpoint = request.endpoint or 'unmatched'
+            path = write_profile(output_dir, endpoint, duration, stacks)
+            SLOW_REQUESTS.inc(endpoint=endpoint)
+            app.logger.warning('Slow request %s took %.0fms, profile written to %s', endpoint, duration * 1000, path)
+        return response
+
+    @app.teardown_request
+    def _discard_profile(exc):
+        # Requests that raised never reach after_request
+        profiler.stop()
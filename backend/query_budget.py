@@ -0,0 +1,84 @@
+import logging
+import time
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+
+def query_budget(max_statements):
+    """Attach a per-endpoint SQL statement budget to a view function.
+
+    Place it directly under the ``route`` decorator so the registered view
+    carries the attribute.
+    """
+    def decorator(f):
+        f.sql_query_budget = max_statements
+        return f
+    return decorator
+
+
+def start_sql_counters():
+    """Reset the per-request SQL counters; shared by the budget check and metrics."""
+    g.sql_statement_count = 0
+    g.sql_seconds = 0.0
+    g.pop('sql_budget_checked', None)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context() and hasattr(g, 'sql_statement_count'):
+        g.sql_statement_count += 1
+        # Kept on the statement's own context, so a statement that fails leaves nothing behind on the connection
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _time_statement(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    if started is not None and has_request_context() and hasattr(g, 'sql_seconds'):
+        g.sql_seconds += time.perf_counter() - started
+
+
+def _endpoint_budget():
+    view = current_app.view_functions.get(request.endpoint)
+    budget = getattr(view, 'sql_query_budget', None)
+    if budget is None:
+        budget = current_app.config.get('SQL_QUERY_BUDGET')
+    return budget
+
+
+def init_query_budget(app):
+    """Count SQL statements per request and enforce the configured budgets.
+
+    Only active when ``SQL_QUERY_BUDGET_ENABLED`` is set, which is meant for
+    development and CI runs. ``SQL_QUERY_BUDGET_MODE`` is ``warn`` (log) or
+    ``raise`` (fail the request with ``QueryBudgetExceeded``).
+    """
+    if not app.config.get('SQL_QUERY_BUDGET_ENABLED'):
+        return
+
+    app.before_request(start_sql_counters)
+
+    @app.after_request
+    def _check_budget(response):
+        count = g.get('sql_statement_count')
+        # Flagged so the error response for a blown budget is not checked again
+        if count is None or g.get('sql_budget_checked'):
+            return response
+        g.sql_budget_checked = True
+        response.headers['X-SQL-Statements'] = str(count)
+
+        budget = _endpoint_budget()
+        if budget is not None and count > budget:
+            message = f'{request.endpoint} ran {count} SQL statements (budget {budget})'
+            if app.config.get('SQL_QUERY_BUDGET_MODE') == 'raise':
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,211 @@
+import math
+from datetime import datetime
+
+import click
+from flask.cli import AppGroup
+from sqlalchemy import event, func, select
+
+from config import Config
+from extensions import db
+from models.model import Quiz, Score, QuizStats, User
+
+TOP_K = Config.QUIZ_STATS_TOP_K
+BUCKET_WIDTH = Config.QUIZ_STATS_BUCKET_WIDTH
+PERCENTILES = (25, 50, 75, 90, 99)
+
+stats_table = QuizStats.__table__
+
+
+def _bucket(total_scored):
+    # JSON object keys are strings, so buckets are stored that way too
+    return str((total_scored // BUCKET_WIDTH) * BUCKET_WIDTH)
+
+
+def _rank_key(entry):
+    total_scored, score_id, _ = entry
+    return (-total_scored, score_id)
+
+
+def _push_top(top_scores, entry):
+    top_scores = sorted(list(top_scores) + [entry], key=_rank_key)
+    return top_scores[:TOP_K]
+
+
+def apply_score(connection, quiz_id, score_id, user_id, total_scored):
+    """Fold one new score into the quiz's aggregates on ``connection``.
+
+    The counters are bumped with a single atomic UPDATE first, which takes the
+    row (or SQLite write) lock before the JSON columns are read and rewritten.
+    """
+    now = datetime.utcnow()
+    entry = [total_scored, score_id, user_id]
+    result = connection.execute(
+        stats_table.update()
+        .where(stats_table.c.quiz_id == quiz_id)
+        .values(attempt_count=stats_table.c.attempt_count + 1,
+                score_sum=stats_table.c.score_sum + total_scored,
+                score_sum_sq=stats_table.c.score_sum_sq + total_scored * total_scored,
+                updated_at=now)
+    )
+    if result.rowcount == 0:
+        connection.execute(stats_table.insert().values(
+            quiz_id=quiz_id,
+            attempt_count=1,
+            score_sum=total_scored,
+            score_sum_sq=total_scored * total_scored,
+            top_scores=[entry],
+            histogram={_bucket(total_scored): 1},
+            updated_at=now
+        ))
+        return
+
+    row = connection.execute(
+        select(stats_table.c.top_scores, stats_table.c.histogram)
+        .where(stats_table.c.quiz_id == quiz_id)
+    ).one()
+    histogram = dict(row.histogram)
+    bucket = _bucket(total_scored)
+    histogram[bucket] = histogram.get(bucket, 0) + 1
+    connection.execute(
+        stats_table.update()
+        .where(stats_table.c.quiz_id == quiz_id)
+        .values(top_scores=_push_top(row.top_scores, entry), histogram=histogram)
+    )
+
+
+@event.listens_for(Score, 'after_insert')
+def _score_inserted(mapper, connection, target):
+    apply_score(connection, target.quiz_id, target.id, target.user_id, target.total_scored)
+
+
+@event.listens_for(Quiz, 'after_delete')
+def _quiz_deleted(mapper, connection, target):
+    connection.execute(stats_table.delete().where(stats_table.c.quiz_id == target.id))
+
+
+def _percentiles(histogram, count):
+    if not count:
+        return {}
+    buckets = sorted((int(bucket), n) for bucket, n in histogram.items())
+    result = {}
+    for p in PERCENTILES:
+        target = math.ceil(p / 100 * count)
+        seen = 0
+        for bucket, n in buckets:
+            seen += n
+            if seen >= target:
+                result[f"p{p}"] = bucket
+                break
+    return result
+
+
+def get_quiz_stats(quiz_id):
+    stats = db.session.get(QuizStats, quiz_id)
+    if stats is None:
+        return {"quiz_id": quiz_id, "attempt_count": 0, "average": None, "stddev": None,
+                "max": None, "percentiles": {}, "histogram": {}}
+
+    count = stats.attempt_count
+    mean = stats.score_sum / count
+    variance = max(stats.score_sum_sq / count - mean * mean, 0)
+    return {
+        "quiz_id": quiz_id,
+        "attempt_count": count,
+        "average": round(mean, 4),
+        "stddev": round(math.sqrt(variance), 4),
+        "max": stats.top_scores[0][0] if stats.top_scores else None,
+        "percentiles": _percentiles(stats.histogram, count),
+        "histogram": stats.histogram,
+        "bucket_width": BUCKET_WIDTH
+    }
+
+
+def get_leaderboard(quiz_id, limit=TOP_K):
+    stats = db.session.get(QuizStats, quiz_id)
+    if stats is None:
+        return []
+    top_scores = stats.top_scores[:limit]
+    user_ids = {user_id for _, _, user_id in top_scores}
+    names = dict(db.session.query(User.id, User.full_name).filter(User.id.in_(user_ids)).all()) if user_ids else {}
+    return [{
+        "rank": rank,
+        "score_id": score_id,
+        "user_id": user_id,
+        "full_name": names.get(user_id),
+        "total_scored": total_scored
+    } for rank, (total_scored, score_id, user_id) in enumerate(top_scores, start=1)]
+
+
+def compute_all_stats():
+    """Recompute every quiz's aggregates from the ``scores`` table in three set-based queries."""
+    computed = {}
+    totals = db.session.query(
+        Score.quiz_id,
+        func.count(Score.id),
+        func.sum(Score.total_scored),
+        func.sum(Score.total_scored * Score.total_scored)
+    ).group_by(Score.quiz_id)
+    for quiz_id, count, score_sum, score_sum_sq in totals:
+        computed[quiz_id] = {
+            "attempt_count": count,
+            "score_sum": score_sum,
+            "score_sum_sq": score_sum_sq,
+            "top_scores": [],
+            "histogram": {}
+        }
+
+    bucket = (Score.total_scored // BUCKET_WIDTH) * BUCKET_WIDTH
+    buckets = db.session.query(Score.quiz_id, bucket, func.count(Score.id)).group_by(Score.quiz_id, bucket)
+    for quiz_id, bucket_start, count in buckets:
+        computed[quiz_id]["histogram"][str(bucket_start)] = count
+
+    rank = func.row_number().over(
+        partition_by=Score.quiz_id,
+        order_by=(Score.total_scored.desc(), Score.id)
+    ).label('rank')
+    ranked = db.session.query(Score.quiz_id, Score.total_scored, Score.id, Score.user_id, rank).subquery()
+    top = db.session.query(ranked).filter(ranked.c.rank <= TOP_K).order_by(ranked.c.quiz_id, ranked.c.rank)
+    for quiz_id, total_scored, score_id, user_id, _ in top:
+        computed[quiz_id]["top_scores"].append([total_scored, score_id, user_id])
+
+    return computed
+
+
+def rebuild_stats(check_only=False):
+    """Recompute aggregates, report quizzes whose stored values drifted and (unless ``check_only``) replace them."""
+    computed = compute_all_stats()
+    stored = {stats.quiz_id: stats for stats in QuizStats.query.all()}
+
+    drifted = []
+    for quiz_id in sorted(set(computed) | set(stored)):
+        expected = computed.get(quiz_id)
+        actual = stored.get(quiz_id)
+        if expected is None or actual is None or any(
+                getattr(actual, field) != value for field, value in expected.items()):
+            drifted.append(quiz_id)
+
+    if not check_only:
+        now = datetime.utcnow()
+        db.session.execute(stats_table.delete())
+        if computed:
+            db.session.execute(stats_table.insert(), [
+                {"quiz_id": quiz_id, "updated_at": now, **values}
+                for quiz_id, values in computed.items()
+            ])
+        db.session.commit()
+
+    return {"quizzes": len(computed), "drifted": drifted, "rebuilt": not check_only}
+
+
+stats_cli = AppGroup('stats', help='Maintain precomputed quiz statistics.')
+
+
+@stats_cli.command('rebuild')
+@click.option('--check', is_flag=True, help='Only report drifted quizzes, do not rewrite them.')
+def rebuild_command(check):
+    report = rebuild_stats(check_only=check)
+    click.echo(f"{report['quizzes']} quizzes with scores, {len(report['drifted'])} drifted")
+    if report['drifted']:
+        click.echo(f"Drifted quiz ids: {', '.join(map(str, report['drifted']))}")
+    if check and report['drifted']:
+        raise SystemExit(1)
@@ -0,0 +1,237 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+import jwt
+from flask import current_app, jsonify, request
+from redis.exceptions import RedisError
+
+from config import Config
+from extensions import redis_client
+from metrics import RATE_LIMIT_REJECTIONS
+
+KEY_TYPES = ('ip', 'email', 'user')
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+class Rule:
+    """``count`` requests per ``period`` seconds for one key type, as a token bucket.
+
+    The bucket holds up to ``count`` tokens and refills continuously, so a
+    client may burst ``count`` requests and then gets one every
+    ``period / count`` seconds.
+    """
+
+    __slots__ = ('scope', 'count', 'period', 'key_type')
+
+    def __init__(self, scope, count, period, key_type):
+        self.scope = scope
+        self.count = count
+        self.period = period
+        self.key_type = key_type
+
+    @property
+    def refill_rate(self):
+        return self.count / self.period
+
+    def __repr__(self):
+        return f'<Rule {self.scope}: {self.count}/{self.period}s {self.key_type}>'
+
+
+def parse_rules(spec):
+    """Parse ``"auth.login: 10/1m ip, 20/1h email; admin: 600/1m user"`` into ``{scope: [Rule, ...]}``.
+
+    A scope is an endpoint (``auth.login``) or a whole blueprint (``admin``);
+    periods take an s/m/h/d suffix and default to seconds.
+    """
+    rules = {}
+    for section in filter(None, (part.strip() for part in spec.split(';'))):
+        scope, _, limits = section.partition(':')
+        scope = scope.strip()
+        for limit in filter(None, (part.strip() for part in limits.split(','))):
+            rate, key_type = limit.split()
+            count, period = rate.split('/')
+            unit = _UNITS.get(period[-1])
+            seconds = float(period[:-1] or 1) * unit if unit else float(period)
+            if key_type not in KEY_TYPES:
+                raise ValueError(f'Unknown rate limit key {key_type!r}; expected one of {", ".join(KEY_TYPES)}')
+            rules.setdefault(scope, []).append(Rule(scope, int(count), seconds, key_type))
+    return rules
+
+
+class LocalBuckets:
+    """Token buckets in this process, spread over independently locked shards.
+
+    Each bucket is just ``(tokens, last_refill)``. Shards are kept in
+    recency order and capped, so idle keys (whose buckets would be full
+    again anyway) are the ones dropped.
+    """
+
+    def __init__(self, shards=16, max_keys=100000):
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+        self._max_per_shard = max(1, max_keys // shards)
+
+    def hit(self, limits):
+        """Take a token from every ``(key, capacity, refill_rate)`` bucket, or from none of them.
+
+        Returns the wait in seconds for each bucket: all zero when the
+        request is allowed, otherwise nothing is taken, so a request
+        rejected by one rule does not use up the others.
+        """
+        indexes = [hash(key) % len(self._shards) for key, _, _ in limits]
+        # Every involved shard is locked (in index order, so two requests cannot deadlock)
+        locks = [self._shards[index][0] for index in sorted(set(indexes))]
+        now = time.monotonic()
+        for lock in locks:
+            lock.acquire()
+        try:
+            levels = []
+            for (key, capacity, refill_rate), index in zip(limits, indexes):
+                tokens, last = self._shards[index][1].get(key, (capacity, now))
+                levels.append(min(capacity, tokens + (now - last) * refill_rate))
+            waits = [0.0 if tokens >= 1 else (1 - tokens) / refill_rate
+                     for tokens, (_, _, refill_rate) in zip(levels, limits)]
+            if not any(waits):
+                for (key, _, _), index, tokens in zip(limits, indexes, levels):
+                    buckets = self._shards[index][1]
+                    buckets.pop(key, None)
+                    buckets[key] = (tokens - 1, now)
+                    if len(buckets) > self._max_per_shard:
+                        buckets.popitem(last=False)
+            return waits
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+# Same all-or-nothing arithmetic as LocalBuckets.hit, done atomically on the Redis server with its clock
+_REDIS_HIT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local levels, waits, allowed = {}, {}, true
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local last = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - last) * rate)
+    levels[i] = tokens
+    if tokens >= 1 then
+        waits[i] = '0'
+    else
+        waits[i] = tostring((1 - tokens) / rate)
+        allowed = false
+    end
+end
+if allowed then
+    for i, key in ipairs(KEYS) do
+        local capacity = tonumber(ARGV[2 * i - 1])
+        local rate = tonumber(ARGV[2 * i])
+        redis.call('HSET', key, 'tokens', levels[i] - 1, 'ts', now)
+        redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+    end
+end
+return waits
+"""
+
+
+class RedisBuckets:
+    """Token buckets shared by every worker, one small hash per key."""
+
+    def __init__(self):
+        self._script = None
+
+    def hit(self, limits):
+        if self._script is None:
+            self._script = redis_client.register_script(_REDIS_HIT)
+        args = [value for _, capacity, refill_rate in limits for value in (capacity, refill_rate)]
+        waits = self._script(keys=[f'ratelimit:{key}' for key, _, _ in limits], args=args)
+        return [float(wait) for wait in waits]
+
+
+def _request_keys():
+    """Resolve each key type for this request lazily, at most once."""
+    resolved = {}
+
+    def get(key_type):
+        if key_type not in resolved:
+            value = None
+            if key_type == 'ip':
+                value = request.remote_addr
+            elif key_type == 'email':
+                email = (request.get_json(silent=True) or {}).get('email')
+                value = email.strip().lower() if isinstance(email, str) and email.strip() else None
+            elif key_type == 'user':
+                value = _token_user_id()
+            resolved[key_type] = value
+        return resolved[key_type]
+    return get
+
+
+def _token_user_id():
+    # Verified, so nobody can drain another user's bucket; invalid tokens fall through to token_required
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Bearer '):
+        return None
+    try:
+        return jwt.decode(header[7:], Config.SECRET_KEY, algorithms=["HS256"]).get('user_id')
+    except jwt.InvalidTokenError:
+        return None
+
+
+def init_rate_limits(app):
+    """Apply the ``RATE_LIMITS`` token buckets before every matching request.
+
+    Rules for the endpoint and for its blueprint all apply; a request is
+    rejected with 429 and ``Retry-After`` when any of its buckets is empty,
+    and then takes no token from the others. With ``REDIS_URL`` set the
+    buckets are shared by all workers, otherwise each process limits on its
+    own. A Redis outage lets requests through. The ``ip`` key is the client
+    address as resolved by ProxyFix when TRUSTED_PROXY_COUNT is set.
+    """
+    if not app.config.get('RATE_LIMIT_ENABLED'):
+        return
+
+    rules = parse_rules(app.config['RATE_LIMITS'])
+    local = LocalBuckets(app.config['RATE_LIMIT_SHARDS'], app.config['RATE_LIMIT_MAX_KEYS'])
+    shared = RedisBuckets()
+    by_endpoint = {}
+
+    def _rules_for(endpoint):
+        if endpoint not in by_endpoint:
+            blueprint = endpoint.rsplit('.', 1)[0] if '.' in endpoint else None
+            by_endpoint[endpoint] = rules.get(endpoint, []) + (rules.get(blueprint, []) if blueprint else [])
+        return by_endpoint[endpoint]
+
+    @app.before_request
+    def _check_rate_limits():
+        if request.endpoint is None:
+            return None
+        endpoint_rules = _rules_for(request.endpoint)
+        if not endpoint_rules:
+            return None
+
+        buckets = shared if 'redis' in current_app.extensions else local
+        keys = _request_keys()
+        applied = []
+        for rule in endpoint_rules:
+            value = keys(rule.key_type)
+            if value is not None:
+                applied.append((rule, f'{rule.scope}:{rule.key_type}:{value}'))
+        if not applied:
+            return None
+        try:
+            waits = buckets.hit([(key, rule.count, rule.refill_rate) for rule, key in applied])
+        except RedisError:
+            current_app.logger.warning('Rate limiter unavailable, allowing request', exc_info=True)
+            return None
+        if not any(waits):
+            return None
+
+        retry_after, (rule, _) = max(zip(waits, applied), key=lambda pair: pair[0])
+        RATE_LIMIT_REJECTIONS.inc(endpoint=request.endpoint, key=rule.key_type)
+        response = jsonify({'message': 'Too many requests, please retry later'})
+        response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+        return response, 429
@@ -0,0 +1,336 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy.exc import IntegrityError
+
+from config import Config
+from extensions import db
+from models.model import Score
+
+
+_owner = {}
+
+
+def _journal_owner_id():
+    """``<pid>-<token>`` naming this process's journal; the token is new after every fork or restart.
+
+    A PID alone is not enough: a restarted container often gets the PID of
+    the process it replaces, whose journal must be replayed, not appended to.
+    """
+    pid = os.getpid()
+    if _owner.get('pid') != pid:
+        _owner.update(pid=pid, id=f'{pid}-{uuid.uuid4().hex[:12]}')
+    return _owner['id']
+
+
+def _journal_path(owner_id):
+    return os.path.join(Config.SCORE_JOURNAL_DIR, f'scores-{owner_id}.journal')
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _read_journal(path):
+    rows = []
+    with open(path) as journal:
+        for line in journal:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                break  # A torn last line from a crash mid-write; everything before it is intact
+    return rows
+
+
+def _row_to_score(row):
+    return Score(submission_id=row['submission_id'], quiz_id=row['quiz_id'], user_id=row['user_id'],
+                 total_scored=row['total_scored'],
+                 time_stamp_of_attempt=datetime.fromisoformat(row['time_stamp_of_attempt']))
+
+
+def insert_scores(rows):
+    """Insert journaled score rows in one transaction, skipping any already stored; returns the count inserted.
+
+    Goes through the ORM so the quiz stats ``after_insert`` hook still sees
+    every score. ``submission_id`` makes replaying a journal idempotent.
+    """
+    if not rows:
+        return 0
+    ids = [row['submission_id'] for row in rows]
+    stored = set()
+    for start in range(0, len(ids), 500):
+        stored.update(db.session.scalars(
+            db.select(Score.submission_id).where(Score.submission_id.in_(ids[start:start + 500]))
+        ))
+    missing = [row for row in rows if row['submission_id'] not in stored]
+    db.session.add_all([_row_to_score(row) for row in missing])
+    db.session.commit()
+    return len(missing)
+
+
+def _insert_one_by_one(rows, done=None):
+    # One bad row (e.g. its quiz was deleted) must not block the rest of the batch forever.
+    # ``done`` collects the submission ids already stored or dropped, for a caller that must retry the rest.
+    inserted = 0
+    for row in rows:
+        try:
+            inserted += insert_scores([row])
+        except IntegrityError:
+            db.session.rollback()
+            current_app.logger.error('Dropping score that cannot be stored: %s', row)
+        if done is not None:
+            done.add(row['submission_id'])
+    return inserted
+
+
+class ScoreWriter:
+    """Write-behind buffer that turns many score submissions into a few group commits.
+
+    ``submit`` appends the row to this process's journal (fsynced) and returns
+    at once. A background thread inserts the buffer when it reaches
+    SCORE_WRITE_BATCH_SIZE rows or its oldest row is SCORE_WRITE_MAX_DELAY_MS
+    old. Each flush first moves the journal aside, so a crash at any point
+    leaves every unflushed row in some journal file; journals of dead
+    processes are replayed when the next writer starts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._pending = []
+        self._inflight = []  # The batch being inserted, still visible to its users until committed
+        self._oldest = None
+        self._journal = None
+        self._pid = None
+        self._owner_id = None
+        self._app = None
+        self._thread = None
+
+    def _open_journal(self):
+        os.makedirs(Config.SCORE_JOURNAL_DIR, exist_ok=True)
+        self._pid = os.getpid()
+        self._owner_id = _journal_owner_id()
+        # The name is unique to this process, so a journal left by a dead one is never appended to
+        self._journal = open(_journal_path(self._owner_id), 'a')
+
+    def ensure_running(self, app):
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked from a process that had a writer: nothing it buffered belongs to this one
+                self._pending, self._oldest, self._journal = [], None, None
+            if self._thread is None or not self._thread.is_alive():
+                self._app = app
+                self._thread = threading.Thread(target=self._run, name='score-writer', daemon=True)
+                self._thread.start()
+
+    def submit(self, quiz_id, user_id, total_scored, time_stamp_of_attempt=None):
+        """Queue a score and return its journaled row (with ``submission_id``, but no ``id`` yet)."""
+        row = {
+            "submission_id": uuid.uuid4().hex,
+            "quiz_id": quiz_id,
+            "user_id": user_id,
+            "total_scored": total_scored,
+            "time_stamp_of_attempt": (time_stamp_of_attempt or datetime.utcnow()).isoformat()
+        }
+        self.ensure_running(current_app._get_current_object())
+        line = json.dumps(row) + '\n'
+        with self._lock:
+            if self._journal is None:
+                self._open_journal()
+            self._journal.write(line)
+            self._journal.flush()
+            if Config.SCORE_JOURNAL_FSYNC:
+                os.fsync(self._journal.fileno())
+            self._pending.append(row)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            if len(self._pending) >= Config.SCORE_WRITE_BATCH_SIZE or len(self._pending) == 1:
+                self._wakeup.notify()
+        return row
+
+    def pending_for_user(self, user_id):
+        """The user's rows still buffered in this process.
+
+        Read-your-writes holds only for requests served by the worker that
+        took the submission; the others see the score once it is flushed,
+        normally within SCORE_WRITE_MAX_DELAY_MS.
+        """
+        with self._lock:
+            return [dict(row) for row in self._inflight + self._pending if row['user_id'] == user_id]
+
+    def _take_batch(self):
+        # Called with the lock held; the rows move with their journal file
+        batch, self._pending, self._oldest = self._pending, [], None
+        self._inflight = batch
+        if self._journal is None:
+            return batch, None
+        self._journal.close()
+        self._journal = None
+        flushing = f'{_journal_path(self._owner_id)}.{uuid.uuid4().hex[:8]}.flushing'
+        os.replace(_journal_path(self._owner_id), flushing)
+        return batch, flushing
+
+    def flush(self):
+        """Insert everything buffered so far; returns the number of rows inserted."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            batch, flushing = self._take_batch()
+        done = set()
+        try:
+            try:
+                inserted = insert_scores(batch)
+            except IntegrityError:
+                db.session.rollback()
+                inserted = _insert_one_by_one(batch, done)
+        except Exception:
+            # Also a failure part way through the row-by-row fallback: rows it stored are not queued again
+            db.session.rollback()
+            self._requeue([row for row in batch if row['submission_id'] not in done])
+            if flushing:
+                os.remove(flushing)
+            raise
+        with self._lock:
+            self._inflight = []
+        if flushing:
+            os.remove(flushing)
+        return inserted
+
+    def _requeue(self, batch):
+        # Back into the active journal before the moved file goes, so a crash can only duplicate rows
+        with self._lock:
+            if self._journal is None:
+                self._open_journal()
+            self._journal.write(''.join(json.dumps(row) + '\n' for row in batch))
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pending[:0] = batch
+            self._inflight = []
+            self._oldest = time.monotonic()
+
+    def _run(self):
+        with self._app.app_context():
+            try:
+                replay_journals()
+            except Exception:
+                self._app.logger.exception('Replaying score journals failed')
+            finally:
+                db.session.remove()
+
+        max_delay = Config.SCORE_WRITE_MAX_DELAY_MS / 1000
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._wakeup.wait()
+                # Pending may be emptied by a direct flush() (e.g. at exit) while this waits
+                while self._pending and len(self._pending) < Config.SCORE_WRITE_BATCH_SIZE:
+                    remaining = self._oldest + max_delay - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+            with self._app.app_context():
+                try:
+                    self.flush()
+                except Exception:
+                    self._app.logger.exception('Flushing buffered scores failed')
+                    time.sleep(max_delay)
+                finally:
+                    db.session.remove()
+
+    def close(self):
+        # Best effort on a clean shutdown; anything left over is replayed from the journal
+        if self._app is None or self._pid != os.getpid():
+            return
+        with self._app.app_context():
+            try:
+                self.flush()
+            except Exception:
+                pass
+            finally:
+                db.session.remove()
+
+
+score_writer = ScoreWriter()
+atexit.register(score_writer.close)
+
+
+def _journal_owner(path):
+    """``(pid, owner_id)`` of a journal file, or of the replay that claimed it.
+
+    Names are scores-<pid>-<token>.journal[.<tag>.flushing], with
+    .replaying-<pid>-<token> appended once a replay claimed the file.
+    Journals from before the token was added have none.
+    """
+    name = os.path.basename(path)
+    if '.replaying-' in name:
+        owner_id = name.rsplit('.replaying-', 1)[1]
+    else:
+        owner_id = name[len('scores-'):].split('.', 1)[0]
+    return int(owner_id.split('-', 1)[0]), owner_id
+
+
+def replay_journals():
+    """Insert rows left in the journals of processes that are gone; returns the count inserted.
+
+    A file carrying this PID but another token was left by an earlier
+    process that had the same PID, so it is replayed too.
+    """
+    replayed = 0
+    own_id = _journal_owner_id()
+    for path in sorted(glob.glob(os.path.join(Config.SCORE_JOURNAL_DIR, 'scores-*.journal*'))):
+        pid, owner_id = _journal_owner(path)
+        if owner_id == own_id or (pid != os.getpid() and _pid_alive(pid)):
+            continue
+        # Claim the file first so two starting workers never replay the same journal
+        claimed = f"{path.split('.replaying-')[0]}.replaying-{own_id}"
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            continue
+        rows = _read_journal(claimed)
+        try:
+            replayed += insert_scores(rows)
+        except IntegrityError:
+            db.session.rollback()
+            replayed += _insert_one_by_one(rows)
+        os.remove(claimed)
+    return replayed
+
+
+def submit_score(quiz_id, user_id, total_scored, time_stamp_of_attempt=None):
+    """Record a score, buffered when SCORE_WRITE_BEHIND is on; returns a dict shaped like the stored row."""
+    if current_app.config['SCORE_WRITE_BEHIND']:
+        row = score_writer.submit(quiz_id, user_id, total_scored, time_stamp_of_attempt)
+        return {**row, "id": None, "pending": True}
+
+    score = Score(submission_id=uuid.uuid4().hex, quiz_id=quiz_id, user_id=user_id, total_scored=total_scored,
+                  time_stamp_of_attempt=time_stamp_of_attempt or datetime.utcnow())
+    db.session.add(score)
+    db.session.commit()
+    return {"id": score.id, "submission_id": score.submission_id, "quiz_id": quiz_id, "user_id": user_id,
+            "total_scored": total_scored, "time_stamp_of_attempt": score.time_stamp_of_attempt.isoformat(),
+            "pending": False}
+
+
+scores_cli = AppGroup('scores', help='Manage buffered score writes.')
+
+
+@scores_cli.command('replay')
+def replay_command():
+    """Insert scores left in the journals of stopped processes."""
+    click.echo(f'Replayed {replay_journals()} scores')
@@ -0,0 +1,159 @@
+import click
+from flask.cli import AppGroup
+from sqlalchemy import text
+
+from extensions import db
+
+# Each indexed row gets rowid = ref_id * KIND_SLOTS + kind code, so triggers
+# can replace or delete an entry by rowid instead of scanning the FTS table.
+KIND_SLOTS = 4
+KINDS = {'question': 1, 'chapter': 2, 'subject': 3}
+
+# (kind, table, title expression, body expression) over the NEW/OLD row alias
+_SOURCES = [
+    ('question', 'questions', '{row}.question_statement',
+     "{row}.option1 || ' ' || {row}.option2 || ' ' || {row}.option3 || ' ' || {row}.option4"),
+    ('chapter', 'chapters', '{row}.name', "coalesce({row}.description, '')"),
+    ('subject', 'subjects', '{row}.name', "coalesce({row}.description, '')"),
+]
+
+CREATE_TABLE = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+    "kind UNINDEXED, ref_id UNINDEXED, title, body, tokenize='porter unicode61')"
+)
+
+
+def _rowid(kind, row):
+    return f'{row}.id * {KIND_SLOTS} + {KINDS[kind]}'
+
+
+def _insert_sql(kind, row):
+    _, _, title, body = next(source for source in _SOURCES if source[0] == kind)
+    return (
+        f"INSERT INTO search_index(rowid, kind, ref_id, title, body) VALUES "
+        f"({_rowid(kind, row)}, '{kind}', {row}.id, {title.format(row=row)}, {body.format(row=row)})"
+    )
+
+
+def trigger_statements():
+    """DDL for the FTS5 table and the triggers that keep it in sync (SQLite only)."""
+    statements = [CREATE_TABLE]
+    for kind, table, _, _ in _SOURCES:
+        delete_old = f"DELETE FROM search_index WHERE rowid = {_rowid(kind, 'old')}"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} "
+            f"BEGIN {_insert_sql(kind, 'new')}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} "
+            f"BEGIN {delete_old}; END",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE ON {table} "
+            f"BEGIN {delete_old}; {_insert_sql(kind, 'new')}; END",
+        ]
+    return statements
+
+
+def drop_statements():
+    statements = []
+    for _, table, _, _ in _SOURCES:
+        for suffix in ('ai', 'ad', 'au'):
+            statements.append(f"DROP TRIGGER IF EXISTS {table}_search_{suffix}")
+    statements.append("DROP TABLE IF EXISTS search_index")
+    return statements
+
+
+def search_supported():
+    return db.engine.dialect.name == 'sqlite'
+
+
+def rebuild_search_index():
+    """Recreate the FTS table and triggers and repopulate them with set-based INSERT ... SELECTs."""
+    counts = {}
+    with db.engine.begin() as connection:
+        for statement in drop_statements() + trigger_statements():
+            connection.exec_driver_sql(statement)
+        for kind, table, title, body in _SOURCES:
+            result = connection.exec_driver_sql(
+                f"INSERT INTO search_index(rowid, kind, ref_id, title, body) "
+                f"SELECT {_rowid(kind, 't')}, '{kind}', t.id, {title.format(row='t')}, {body.format(row='t')} "
+                f"FROM {table} t"
+            )
+            counts[kind] = result.rowcount
+    return counts
+
+
+def build_match_query(raw):
+    # Quote every term so user input cannot inject FTS5 syntax; the last term
+    # is a prefix match so partially typed words still hit.
+    terms = [term.replace('"', '""') for term in raw.split()]
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' '.join(quoted)
+
+
+def search(raw_query, kind=None, subject_id=None, qualification=None, quiz_id=None, limit=20, offset=0):
+    """Ranked search over questions, chapters and subjects.
+
+    Returns ``(results, has_more)``. Filters join back to the hierarchy so a
+    chapter moving to another subject never leaves stale filter values in the index.
+    """
+    match = build_match_query(raw_query)
+    if match is None:
+        return [], False
+
+    filters = []
+    params = {"match": match, "limit": limit + 1, "offset": offset}
+    if kind is not None:
+        filters.append("s.kind = :kind")
+        params["kind"] = kind
+    if subject_id is not None:
+        filters.append("sub.id = :subject_id")
+        params["subject_id"] = subject_id
+    if qualification is not None:
+        filters.append("sub.qualification = :qualification")
+        params["qualification"] = qualification
+    if quiz_id is not None:
+        filters.append("q.quiz_id = :quiz_id")
+        params["quiz_id"] = quiz_id
+
+    sql = f"""
+        SELECT s.kind, s.ref_id, s.title,
+               snippet(search_index, 3, '[', ']', '...', 12) AS snippet,
+               bm25(search_index, 0.0, 0.0, 2.0, 1.0) AS rank,
+               q.quiz_id, c.id AS chapter_id, sub.id AS subject_id, sub.qualification
+        FROM search_index s
+        LEFT JOIN questions q ON s.kind = 'question' AND q.id = s.ref_id
+        LEFT JOIN quizzes qz ON qz.id = q.quiz_id
+        LEFT JOIN chapters c ON c.id = CASE s.kind WHEN 'question' THEN qz.chapter_id
+                                                   WHEN 'chapter' THEN s.ref_id END
+        LEFT JOIN subjects sub ON sub.id = CASE s.kind WHEN 'subject' THEN s.ref_id
+                                                       ELSE c.subject_id END
+        WHERE search_index MATCH :match {''.join(' AND ' + f for f in filters)}
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """
+    rows = db.session.execute(text(sql), params).mappings().all()
+    has_more = len(rows) > limit
+    results = [{
+        "kind": row["kind"],
+        "id": row["ref_id"],
+        "title": row["title"],
+        "snippet": row["snippet"],
+        "score": round(-row["rank"], 4),
+        "quiz_id": row["quiz_id"],
+        "chapter_id": row["chapter_id"],
+        "subject_id": row["subject_id"],
+        "qualification": row["qualification"]
+    } for row in rows[:limit]]
+    return results, has_more
+
+
+search_cli = AppGroup('search', help='Maintain the full-text search index.')
+
+
+@search_cli.command('rebuild')
+def rebuild_command():
+    if not search_supported():
+        raise click.ClickException('Full-text search needs SQLite FTS5.')
+    counts = rebuild_search_index()
+    click.echo(', '.join(f'{count} {kind}s' for kind, count in counts.items()) + ' indexed')
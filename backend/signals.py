@@ -0,0 +1,67 @@
+from blinker import Namespace
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from admin.response_cache import bump_version, get_versions
+from models.model import Quiz, Question
+
+_signals = Namespace()
+
+# Sent with the quiz id once a change to that quiz or its questions is committed.
+# Per-quiz caches (answer keys, delivery sets, payloads) connect to it to evict locally;
+# other workers notice through quiz_version.
+quiz_questions_changed = _signals.signal('quiz-questions-changed')
+
+
+def quiz_version(quiz_id):
+    """Version of a quiz's questions shared by every worker (Redis or ``catalog_versions``).
+
+    Per-quiz caches keep the version they were built at and rebuild once it moves.
+    """
+    return get_versions((f'quiz:{quiz_id}',))[1][0]
+
+
+def quizzes_changed(quiz_ids):
+    """Bump the shared versions of ``quiz_ids`` and evict them locally. Call after the change is committed."""
+    quiz_ids = sorted(set(quiz_ids))
+    if not quiz_ids:
+        return
+    bump_version(*(f'quiz:{quiz_id}' for quiz_id in quiz_ids))
+    for quiz_id in quiz_ids:
+        quiz_questions_changed.send(quiz_id)
+
+
+def _queue(target, quiz_id):
+    Session.object_session(target).info.setdefault('changed_quizzes', set()).add(quiz_id)
+
+
+@event.listens_for(Question, 'after_insert')
+@event.listens_for(Question, 'after_update')
+@event.listens_for(Question, 'after_delete')
+def _question_changed(mapper, connection, target):
+    _queue(target, target.quiz_id)
+    # A question moved to another quiz changes the one it left too
+    for quiz_id in inspect(target).attrs.quiz_id.history.deleted:
+        if quiz_id is not None:
+            _queue(target, quiz_id)
+
+
+# Quiz details are part of the delivered payload
+@event.listens_for(Quiz, 'after_update')
+@event.listens_for(Quiz, 'after_delete')
+def _quiz_changed(mapper, connection, target):
+    _queue(target, target.id)
+
+
+# Announced only once committed: other workers would otherwise rebuild from the old rows,
+# and a rolled-back edit has nothing to invalidate
+@event.listens_for(Session, 'after_commit')
+def _announce_changes(session):
+    changed = session.info.pop('changed_quizzes', None)
+    if changed:
+        quizzes_changed(changed)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changes(session):
+    session.info.pop('changed_quizzes', None)
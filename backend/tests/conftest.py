@@ -0,0 +1,88 @@
+import os
+import sys
+from datetime import date, time
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from database import upgrade_schema  # noqa: E402
+from extensions import db  # noqa: E402
+
+
+def _process_caches():
+    from auth.principal_cache import principal_cache
+    from admin.response_cache import response_cache
+    from user.answer_key import answer_key_cache
+    from user.quiz_delivery import delivery_cache
+    from user.quiz_payload import payload_cache
+    return [principal_cache, answer_key_cache, response_cache, delivery_cache, payload_cache]
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'app_config(**overrides): extra config for the app fixture')
+
+
+@pytest.fixture
+def app(request, tmp_path, monkeypatch):
+    """An app on a fresh migrated SQLite database, with its score journals in ``tmp_path``."""
+    monkeypatch.setattr(Config, 'SCORE_JOURNAL_DIR', str(tmp_path / 'journal'))
+    marker = request.node.get_closest_marker('app_config')
+    app = create_app(**{
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'SQLALCHEMY_BINDS': {'archive': f"sqlite:///{tmp_path / 'archive.db'}"},
+        'JOB_SPOOL_DIR': str(tmp_path),
+        'RATE_LIMIT_ENABLED': False,
+        'PROFILER_ENABLED': False,
+        'SCORE_WRITE_BEHIND': True,
+        'QUIZ_SESSIONS': 'local',
+        **(marker.kwargs if marker else {}),
+    })
+    upgrade_schema(app)
+    # Module-level caches outlive an app; ids restart in every test database
+    for cache in _process_caches():
+        cache.clear()
+    with app.app_context():
+        yield app
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def quiz(app):
+    """Ids of one user and one quiz to attach scores to."""
+    from models.model import Chapter, Quiz, Subject, User
+    user = User(email='student@example.com', password='x', full_name='Student', qualification=10,
+                dob=date(2000, 1, 1))
+    subject = Subject(name='Maths', qualification=10)
+    chapter = Chapter(name='Algebra', subject=subject)
+    quiz = Quiz(chapter=chapter, date_of_quiz=date(2026, 1, 1), time_duration=time(0, 30))
+    db.session.add_all([user, subject, chapter, quiz])
+    db.session.commit()
+    return user.id, quiz.id
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin(app):
+    from models.model import User
+    user = User(email='admin@example.com', password='x', full_name='Admin', qualification=10,
+                dob=date(1990, 1, 1), is_admin=True)
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def auth_headers(app):
+    """Build Authorization headers carrying a fresh token for a user."""
+    from auth.utils import generate_jwt
+    return lambda user: {'Authorization': f'Bearer {generate_jwt(user)}'}
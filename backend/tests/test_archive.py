@@ -0,0 +1,34 @@
+from datetime import date, datetime
+
+from archive import archive_quizzes
+from extensions import db
+from models.model import ArchivedQuestion, ArchivedScore, Question, Quiz, Score
+
+
+def test_archiving_moves_old_quizzes_with_their_questions_and_scores(client, admin, auth_headers, quiz):
+    user_id, quiz_id = quiz
+    db.session.add_all([
+        Question(quiz_id=quiz_id, question_statement='What is 1 + 1?', option1='1', option2='2', option3='3',
+                 option4='4', correct_option=2),
+        Score(submission_id='a' * 32, quiz_id=quiz_id, user_id=user_id, total_scored=1,
+              time_stamp_of_attempt=datetime(2026, 1, 1, 12, 0)),
+    ])
+    db.session.commit()
+
+    assert archive_quizzes(before=date(2026, 1, 2), dry_run=True)["quizzes"] == 1
+    totals = archive_quizzes(before=date(2026, 1, 2))
+    assert (totals["quizzes"], totals["questions"], totals["scores"]) == (1, 1, 1)
+
+    assert db.session.get(Quiz, quiz_id) is None
+    assert db.session.scalars(db.select(Question)).all() == db.session.scalars(db.select(Score)).all() == []
+    assert db.session.scalar(db.select(db.func.count(ArchivedQuestion.id))) == 1
+    assert db.session.scalar(db.select(db.func.count(ArchivedScore.id))) == 1
+
+    listed = client.get('/admin/archive/quizzes', headers=auth_headers(admin)).json
+    assert [archived["id"] for archived in listed["quizzes"]] == [quiz_id]
+
+
+def test_archiving_leaves_recent_quizzes(quiz):
+    _, quiz_id = quiz
+    assert archive_quizzes(before=date(2025, 1, 1))["quizzes"] == 0
+    assert db.session.get(Quiz, quiz_id) is not None
@@ -0,0 +1,31 @@
+from extensions import db
+from models.model import Subject
+
+
+def _subject_names():
+    db.session.expire_all()
+    return [subject.name for subject in Subject.query.order_by(Subject.id)]
+
+
+def test_atomic_batch_with_a_bad_operation_changes_nothing(client, admin, auth_headers, quiz):
+    subject_id = db.session.scalar(db.select(Subject.id))
+    response = client.patch('/admin/batch', headers=auth_headers(admin), json={"operations": [
+        {"model": "subject", "id": subject_id, "fields": {"name": "Mathematics"}},
+        {"model": "subject", "id": subject_id + 100, "fields": {"name": "Missing"}},
+    ]})
+
+    assert response.status_code == 422
+    assert [result["status"] for result in response.json["results"]] == ["skipped", "not_found"]
+    assert _subject_names() == ['Maths']
+
+
+def test_partial_batch_applies_the_valid_operations(client, admin, auth_headers, quiz):
+    subject_id = db.session.scalar(db.select(Subject.id))
+    response = client.patch('/admin/batch', headers=auth_headers(admin), json={"mode": "partial", "operations": [
+        {"model": "subject", "id": subject_id, "fields": {"name": "Mathematics"}},
+        {"model": "subject", "id": subject_id, "fields": {"colour": "red"}},
+    ]})
+
+    assert response.status_code == 200
+    assert response.json["summary"] == {"updated": 1, "invalid": 1}
+    assert _subject_names() == ['Mathematics']
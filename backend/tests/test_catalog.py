@@ -0,0 +1,42 @@
+from models.model import Subject
+from extensions import db
+
+
+def _subjects(count):
+    db.session.add_all([Subject(name=f'Subject {n}', qualification=10) for n in range(count)])
+    db.session.commit()
+
+
+def test_keyset_pages_walk_every_row_once(client, admin, auth_headers):
+    _subjects(5)
+    headers = auth_headers(admin)
+
+    seen, after = [], None
+    while True:
+        query = '?limit=2' + (f'&after={after}' if after else '')
+        page = client.get(f'/admin/subjects{query}', headers=headers).json
+        assert page["total"] == 5
+        seen += [subject["id"] for subject in page["subjects"]]
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert len(seen) == 5 and seen == sorted(set(seen))
+
+
+def test_page_size_is_validated(client, admin, auth_headers):
+    headers = auth_headers(admin)
+    assert client.get('/admin/subjects?limit=0', headers=headers).status_code == 400
+    assert client.get('/admin/subjects?after=x', headers=headers).status_code == 400
+
+
+def test_conditional_get_until_the_catalog_changes(client, admin, auth_headers):
+    _subjects(1)
+    headers = auth_headers(admin)
+    etag = client.get('/admin/subjects', headers=headers).headers['ETag']
+    assert client.get('/admin/subjects', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    assert client.post('/admin/subjects', json={"name": "Physics", "qualification": 11},
+                       headers=headers).status_code == 201
+    response = client.get('/admin/subjects', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json["total"] == 2
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from extensions import db
+from models.model import Question, Quiz, Score
+
+
+def test_deleting_a_quiz_cascades_to_its_rows_in_the_database(quiz):
+    user_id, quiz_id = quiz
+    db.session.add_all([
+        Question(quiz_id=quiz_id, question_statement='2 + 2?', option1='3', option2='4', option3='5', option4='6',
+                 correct_option=2),
+        Score(quiz_id=quiz_id, user_id=user_id, total_scored=1, time_stamp_of_attempt=datetime(2026, 1, 1)),
+    ])
+    db.session.commit()
+
+    # passive_deletes leaves the children to ON DELETE CASCADE
+    db.session.delete(db.session.get(Quiz, quiz_id))
+    db.session.commit()
+
+    assert db.session.scalar(select(func.count()).select_from(Question)) == 0
+    assert db.session.scalar(select(func.count()).select_from(Score)) == 0
@@ -0,0 +1,11 @@
+from app import create_app
+
+
+def test_each_app_renders_its_own_gauges_once(app, client):
+    other = create_app(SQLALCHEMY_DATABASE_URI=app.config['SQLALCHEMY_DATABASE_URI'],
+                       SQLALCHEMY_BINDS={'archive': 'sqlite://'}, RATE_LIMIT_ENABLED=False)
+    assert other.extensions['metrics'] is not app.extensions['metrics']
+
+    body = client.get('/metrics').get_data(as_text=True)
+    assert body.count('# TYPE principal_cache_hits gauge') == 1
+    assert body.count('# TYPE db_pool_checkouts gauge') == 1
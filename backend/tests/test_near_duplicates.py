@@ -0,0 +1,29 @@
+import pytest
+
+QUESTION = {"question_statement": "Which planet is known as the red planet in our solar system?",
+            "option1": "Venus", "option2": "Mars", "option3": "Jupiter", "option4": "Saturn", "correct_option": 2}
+
+
+@pytest.fixture
+def post_question(client, admin, auth_headers, quiz):
+    _, quiz_id = quiz
+    headers = auth_headers(admin)
+    return lambda body, mode: client.post(f'/admin/questions?duplicates={mode}', json={"quiz_id": quiz_id, **body},
+                                          headers=headers)
+
+
+def test_near_duplicate_is_reported_in_warn_mode(post_question):
+    original = post_question(QUESTION, 'warn').json["question_id"]
+
+    response = post_question({**QUESTION, "question_statement": QUESTION["question_statement"] + "?"}, 'warn')
+    assert response.status_code == 201
+    assert original in [duplicate["question_id"] for duplicate in response.json["near_duplicates"]]
+
+
+def test_near_duplicate_is_refused_in_reject_mode(post_question):
+    post_question(QUESTION, 'warn')
+
+    assert post_question(QUESTION, 'reject').status_code == 409
+    unrelated = {**QUESTION, "question_statement": "How many sides does a regular hexagon have in total?",
+                 "option1": "4", "option2": "5", "option3": "6", "option4": "8", "correct_option": 3}
+    assert post_question(unrelated, 'reject').status_code == 201
@@ -0,0 +1,44 @@
+import threading
+
+import pytest
+
+from auth.password_hasher import HasherBusy, PasswordHasher
+
+
+@pytest.fixture
+def hasher():
+    hasher = PasswordHasher(executor='thread', workers=1, max_pending=2, rounds=4, timeout=0.2)
+    yield hasher
+    hasher.shutdown()
+
+
+def _occupy(hasher, release):
+    # A job that holds the only worker until released
+    return hasher._executor.submit(release.wait)
+
+
+def test_full_queue_is_rejected_without_waiting(hasher):
+    release = threading.Event()
+    hasher._slots.acquire()
+    hasher._slots.acquire()
+    try:
+        with pytest.raises(HasherBusy, match='full'):
+            hasher.hash('secret')
+    finally:
+        hasher._slots.release()
+        hasher._slots.release()
+        release.set()
+
+
+def test_timed_out_job_is_cancelled_and_frees_its_slot(hasher):
+    release = threading.Event()
+    blocker = _occupy(hasher, release)
+    ran = []
+    with pytest.raises(HasherBusy, match='timed out'):
+        hasher._run(ran.append, 'job')
+    release.set()
+    blocker.result()
+    hasher._executor.shutdown(wait=True)
+
+    assert ran == []
+    assert hasher._slots.acquire(blocking=False) and hasher._slots.acquire(blocking=False)
@@ -0,0 +1,60 @@
+from auth import auth_middleware
+from auth.principal_cache import principal_cache
+from extensions import db
+from models.model import User
+
+
+def _cached_ids():
+    return {key[0] for key in principal_cache._entries}
+
+
+def test_role_change_evicts_cached_principal_on_commit(client, admin, auth_headers):
+    headers = auth_headers(admin)
+    assert client.get('/admin/cache/principals', headers=headers).status_code == 200
+    assert admin.id in _cached_ids()
+
+    # Requests end the test's session too, so the row is loaded again
+    user = db.session.get(User, admin.id)
+    user.is_admin = False
+    db.session.flush()
+    # Not committed yet: other requests must keep seeing the committed row
+    assert admin.id in _cached_ids()
+    db.session.commit()
+    assert admin.id not in _cached_ids()
+
+    assert client.get('/admin/cache/principals', headers=headers).status_code == 401
+
+
+def test_rolled_back_change_keeps_cached_principal(client, admin, auth_headers):
+    assert client.get('/admin/cache/principals', headers=auth_headers(admin)).status_code == 200
+
+    user = db.session.get(User, admin.id)
+    user.token_version += 1
+    db.session.flush()
+    db.session.rollback()
+
+    assert admin.id in _cached_ids()
+
+
+def test_revoked_tokens_are_rejected_on_the_next_request(client, admin, auth_headers):
+    headers = auth_headers(admin)
+    assert client.get('/admin/cache/principals', headers=headers).status_code == 200
+
+    response = client.post(f'/admin/users/{admin.id}/revoke-tokens', headers=headers)
+    assert response.status_code == 200
+
+    assert client.get('/admin/cache/principals', headers=headers).status_code == 401
+    assert client.get('/admin/cache/principals',
+                      headers=auth_headers(db.session.get(User, admin.id))).status_code == 200
+
+
+def test_shared_version_rejects_token_revoked_on_another_worker(client, admin, auth_headers, monkeypatch):
+    headers = auth_headers(admin)
+    assert client.get('/admin/cache/principals', headers=headers).status_code == 200
+
+    # Another worker bumped the version: this one's cached principal still has the old one
+    monkeypatch.setattr(auth_middleware.token_versions, 'shared', lambda: True)
+    monkeypatch.setattr(auth_middleware.token_versions, 'current', lambda user_id: admin.token_version + 1)
+
+    assert admin.id in _cached_ids()
+    assert client.get('/admin/cache/principals', headers=headers).status_code == 401
@@ -0,0 +1,28 @@
+import pytest
+
+from auth.principal_cache import principal_cache
+
+pytestmark = pytest.mark.app_config(SQL_QUERY_BUDGET_ENABLED=True, SQL_QUERY_BUDGET_MODE='raise')
+
+
+@pytest.mark.parametrize('path', ['/admin/subjects', '/admin/chapters', '/admin/quizzes'])
+def test_cached_list_views_stay_within_budget_with_a_cold_principal_cache(client, admin, auth_headers, quiz, path):
+    headers = auth_headers(admin)
+    # A response cache miss, then a hit; each with the principal loaded from the database
+    statements = []
+    for _ in range(2):
+        principal_cache.clear()
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        statements.append(int(response.headers['X-SQL-Statements']))
+
+    # Principal, versions, page and count; a hit needs only the first two
+    assert statements == [4, 2]
+
+
+def test_blown_budget_fails_the_request_in_raise_mode(app, client, admin, auth_headers):
+    app.view_functions['admin.list_subjects'].sql_query_budget = 1
+    try:
+        assert client.get('/admin/subjects', headers=auth_headers(admin)).status_code == 500
+    finally:
+        app.view_functions['admin.list_subjects'].sql_query_budget = 4
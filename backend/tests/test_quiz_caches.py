@@ -0,0 +1,105 @@
+import pytest
+
+from extensions import db
+from models.model import Question, Quiz, User
+from signals import quiz_version
+from user.answer_key import answer_key_cache, get_answer_key
+from user.quiz_delivery import delivery_cache, get_quiz_questions
+from user.quiz_payload import get_quiz_payload, payload_cache
+
+
+@pytest.fixture
+def questions(quiz):
+    _, quiz_id = quiz
+    rows = [Question(quiz_id=quiz_id, question_statement=f'What is {n} + {n}?', option1=str(n), option2=str(2 * n),
+                     option3=str(3 * n), option4=str(4 * n), correct_option=2) for n in (1, 2)]
+    db.session.add_all(rows)
+    db.session.commit()
+    return [row.id for row in rows]
+
+
+def _edit(question_id, **values):
+    question = db.session.get(Question, question_id)
+    for name, value in values.items():
+        setattr(question, name, value)
+    db.session.flush()
+
+
+def test_answer_key_follows_an_edit_committed_on_another_worker(quiz, questions):
+    _, quiz_id = quiz
+    before = quiz_version(quiz_id)
+    stale = get_answer_key(quiz_id)
+
+    _edit(questions[0], correct_option=4)
+    db.session.commit()
+    assert quiz_version(quiz_id) > before
+
+    # What another worker still holds: the key it built at the old version
+    answer_key_cache.set(quiz_id, (before, stale))
+    assert get_answer_key(quiz_id) == {questions[0]: 4, questions[1]: 2}
+
+
+def test_uncommitted_edit_keeps_the_cached_answer_key(quiz, questions):
+    _, quiz_id = quiz
+    before = quiz_version(quiz_id)
+    get_answer_key(quiz_id)
+
+    _edit(questions[0], correct_option=4)
+    assert answer_key_cache.get(quiz_id) is not None
+    db.session.rollback()
+
+    assert quiz_version(quiz_id) == before
+    assert get_answer_key(quiz_id) == {questions[0]: 2, questions[1]: 2}
+
+
+def test_delivery_set_follows_a_deletion_committed_on_another_worker(quiz, questions):
+    _, quiz_id = quiz
+    before = quiz_version(quiz_id)
+    stale = get_quiz_questions(quiz_id)
+
+    db.session.delete(db.session.get(Question, questions[0]))
+    db.session.commit()
+
+    delivery_cache.set(quiz_id, (before, stale))
+    assert [question_id for question_id, _, _ in get_quiz_questions(quiz_id)] == [questions[1]]
+
+
+def test_student_sees_edited_question_after_commit(client, quiz, questions, auth_headers):
+    user_id, quiz_id = quiz
+    headers = auth_headers(db.session.get(User, user_id))
+    assert client.get(f'/user/quizzes/{quiz_id}/questions', headers=headers).status_code == 200
+
+    _edit(questions[0], question_statement='What is 1 + 1, really?')
+    db.session.commit()
+
+    statements = {question["id"]: question["question_statement"]
+                  for question in client.get(f'/user/quizzes/{quiz_id}/questions', headers=headers).json["questions"]}
+    assert statements[questions[0]] == 'What is 1 + 1, really?'
+
+
+def test_payload_follows_a_quiz_edit_committed_on_another_worker(quiz, questions):
+    _, quiz_id = quiz
+    before = quiz_version(quiz_id)
+    stale = get_quiz_payload(quiz_id)
+
+    db.session.get(Quiz, quiz_id).remarks = 'Calculators allowed'
+    db.session.commit()
+
+    payload_cache.set(quiz_id, (before, stale))
+    payload = get_quiz_payload(quiz_id)
+    assert payload["etag"] != stale["etag"]
+    assert b'Calculators allowed' in payload["identity"]
+
+
+def test_payload_etag_changes_after_a_question_edit(client, quiz, questions, auth_headers):
+    user_id, quiz_id = quiz
+    headers = auth_headers(db.session.get(User, user_id))
+    etag = client.get(f'/user/quizzes/{quiz_id}', headers=headers).headers['ETag']
+    assert client.get(f'/user/quizzes/{quiz_id}', headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    _edit(questions[1], option4='eight')
+    db.session.commit()
+
+    response = client.get(f'/user/quizzes/{quiz_id}', headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert 'eight' in response.json["questions"][1]["options"]
@@ -0,0 +1,55 @@
+import pytest
+
+from app import create_app
+from extensions import db
+from models.model import Question, Score, User
+
+
+@pytest.fixture
+def question(quiz):
+    _, quiz_id = quiz
+    row = Question(quiz_id=quiz_id, question_statement='What is 2 + 2?', option1='3', option2='4', option3='5',
+                   option4='6', correct_option=2)
+    db.session.add(row)
+    db.session.commit()
+    return row.id
+
+
+@pytest.fixture
+def headers(quiz, auth_headers):
+    user_id, _ = quiz
+    return auth_headers(db.session.get(User, user_id))
+
+
+def test_timed_quiz_cannot_be_submitted_without_a_session(client, quiz, question, headers):
+    _, quiz_id = quiz
+    response = client.post(f'/user/quizzes/{quiz_id}/submit', json={"answers": {str(question): 2}}, headers=headers)
+
+    assert response.status_code == 409
+    assert db.session.scalars(db.select(Score)).all() == []
+
+
+def test_timed_quiz_submit_goes_through_the_running_session(app, client, quiz, question, headers):
+    _, quiz_id = quiz
+    assert client.post(f'/user/quizzes/{quiz_id}/session', headers=headers).status_code == 201
+
+    response = client.post(f'/user/quizzes/{quiz_id}/submit', json={"answers": {str(question): 2}}, headers=headers)
+    assert response.status_code == 201
+    assert response.json["score"]["total_scored"] == 1
+    # The session is finished: submitting again must not score a second attempt
+    assert client.post(f'/user/quizzes/{quiz_id}/submit', json={"answers": {str(question): 2}},
+                       headers=headers).status_code == 409
+
+
+@pytest.mark.app_config(QUIZ_SESSIONS='off')
+def test_session_endpoints_are_off_without_a_store(client, quiz, question, headers):
+    _, quiz_id = quiz
+    assert client.post(f'/user/quizzes/{quiz_id}/session', headers=headers).status_code == 404
+    # With sessions off the plain submit stays the only way in
+    assert client.post(f'/user/quizzes/{quiz_id}/submit', json={"answers": {str(question): 2}},
+                       headers=headers).status_code == 201
+
+
+def test_shared_sessions_require_redis(tmp_path):
+    with pytest.raises(RuntimeError):
+        create_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'test.db'}", QUIZ_SESSIONS='redis', REDIS_URL=None)
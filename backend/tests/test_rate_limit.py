@@ -0,0 +1,23 @@
+import pytest
+
+from rate_limit import LocalBuckets
+
+
+@pytest.mark.app_config(RATE_LIMIT_ENABLED=True, RATE_LIMITS='auth.login: 2/1m ip')
+def test_requests_over_the_limit_get_429_with_retry_after(client):
+    credentials = {"email": "nobody@example.com", "password": "wrong"}
+    for _ in range(2):
+        assert client.post('/auth/login', json=credentials).status_code == 401
+
+    response = client.post('/auth/login', json=credentials)
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+
+
+def test_rejected_request_takes_no_token_from_other_buckets():
+    buckets = LocalBuckets(shards=4)
+    assert not any(buckets.hit([('ip:a', 1, 0.001)]))
+
+    # The empty ip bucket rejects the request, so the email bucket keeps its only token
+    assert buckets.hit([('ip:a', 1, 0.001), ('email:b', 1, 0.001)])[0] > 0
+    assert not any(buckets.hit([('email:b', 1, 0.001)]))
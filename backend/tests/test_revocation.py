@@ -0,0 +1,13 @@
+def test_logout_revokes_only_the_presented_token(client, admin, auth_headers):
+    revoked, other = auth_headers(admin), auth_headers(admin)
+    assert client.post('/auth/logout', headers=revoked).status_code == 200
+
+    assert client.get('/admin/subjects', headers=revoked).status_code == 401
+    assert client.get('/admin/subjects', headers=other).status_code == 200
+
+
+def test_logout_all_revokes_every_earlier_token(client, admin, auth_headers):
+    first, second = auth_headers(admin), auth_headers(admin)
+    assert client.post('/auth/logout-all', headers=first).status_code == 200
+
+    assert client.get('/admin/subjects', headers=second).status_code == 401
@@ -0,0 +1,163 @@
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+import score_writer
+from config import Config
+from extensions import db
+from models.model import Score
+from score_writer import ScoreWriter, replay_journals
+
+
+def _dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def _row(quiz, submission_id, total_scored=3):
+    user_id, quiz_id = quiz
+    return {"submission_id": submission_id, "quiz_id": quiz_id, "user_id": user_id, "total_scored": total_scored,
+            "time_stamp_of_attempt": datetime(2026, 1, 1, 12, 0).isoformat()}
+
+
+def _write_journal(name, rows, torn_tail=False):
+    os.makedirs(Config.SCORE_JOURNAL_DIR, exist_ok=True)
+    path = os.path.join(Config.SCORE_JOURNAL_DIR, name)
+    with open(path, 'w') as journal:
+        journal.write(''.join(json.dumps(row) + '\n' for row in rows))
+        if torn_tail:
+            journal.write('{"submission_id": "tor')
+    return path
+
+
+def _stored_ids():
+    return sorted(db.session.scalars(db.select(Score.submission_id)))
+
+
+@pytest.fixture
+def writer(app, monkeypatch):
+    # No background thread: the tests flush explicitly
+    writer = ScoreWriter()
+    monkeypatch.setattr(writer, 'ensure_running', lambda app: None)
+    return writer
+
+
+def test_replay_inserts_rows_left_by_a_dead_process(quiz):
+    path = _write_journal(f'scores-{_dead_pid()}-0123456789ab.journal',
+                          [_row(quiz, 'a' * 32), _row(quiz, 'b' * 32)], torn_tail=True)
+
+    assert replay_journals() == 2
+    assert _stored_ids() == ['a' * 32, 'b' * 32]
+    assert not os.path.exists(path)
+
+
+def test_replay_recovers_journal_of_an_earlier_process_with_the_same_pid(quiz):
+    # A restarted container often gets its predecessor's PID; the old journal is not this process's
+    _write_journal(f'scores-{os.getpid()}-deadbeef0000.journal', [_row(quiz, 'orphan000'.ljust(32, '0'))])
+    _write_journal(f'scores-{os.getpid()}.journal', [_row(quiz, 'legacy000'.ljust(32, '0'))])
+
+    assert replay_journals() == 2
+    assert _stored_ids() == ['legacy000'.ljust(32, '0'), 'orphan000'.ljust(32, '0')]
+    assert os.listdir(Config.SCORE_JOURNAL_DIR) == []
+
+
+def test_replay_leaves_journals_of_live_processes_and_its_own(quiz):
+    live = _write_journal(f'scores-{os.getppid()}-0123456789ab.journal', [_row(quiz, 'c' * 32)])
+    own = _write_journal(f'scores-{score_writer._journal_owner_id()}.journal', [_row(quiz, 'd' * 32)])
+
+    assert replay_journals() == 0
+    assert _stored_ids() == []
+    assert os.path.exists(live) and os.path.exists(own)
+
+
+def test_replay_is_idempotent(quiz):
+    score_writer.insert_scores([_row(quiz, 'e' * 32)])
+    _write_journal(f'scores-{_dead_pid()}-0123456789ab.journal', [_row(quiz, 'e' * 32), _row(quiz, 'f' * 32)])
+
+    assert replay_journals() == 1
+    assert _stored_ids() == ['e' * 32, 'f' * 32]
+
+
+def test_writer_journal_name_is_unique_to_the_process(quiz, writer):
+    # The predecessor's file must be left alone, not appended to and then moved aside by the first flush
+    stale = _write_journal(f'scores-{os.getpid()}.journal', [_row(quiz, 'orphan000'.ljust(32, '0'))])
+    user_id, quiz_id = quiz
+    writer.submit(quiz_id, user_id, 4)
+    assert writer.flush() == 1
+
+    with open(stale) as journal:
+        assert len(journal.readlines()) == 1
+    assert replay_journals() == 1
+    assert 'orphan000'.ljust(32, '0') in _stored_ids()
+
+
+def test_flush_inserts_batch_and_removes_its_journal(quiz, writer):
+    user_id, quiz_id = quiz
+    rows = [writer.submit(quiz_id, user_id, total) for total in range(5)]
+    assert len(writer.pending_for_user(user_id)) == 5
+
+    assert writer.flush() == 5
+    assert _stored_ids() == sorted(row['submission_id'] for row in rows)
+    assert writer.pending_for_user(user_id) == []
+    assert os.listdir(Config.SCORE_JOURNAL_DIR) == []
+
+
+def test_flush_falls_back_to_row_by_row_on_integrity_error(quiz, writer):
+    user_id, quiz_id = quiz
+    good = writer.submit(quiz_id, user_id, 2)
+    writer.submit(quiz_id, user_id, None)  # Violates NOT NULL, so the batch INSERT fails
+    also_good = writer.submit(quiz_id, user_id, 5)
+
+    assert writer.flush() == 2
+    assert _stored_ids() == sorted([good['submission_id'], also_good['submission_id']])
+    assert writer.pending_for_user(user_id) == []
+
+
+def test_failed_flush_keeps_rows_pending_and_journaled(quiz, writer, monkeypatch):
+    user_id, quiz_id = quiz
+    row = writer.submit(quiz_id, user_id, 7)
+
+    def unavailable(rows):
+        raise OperationalError('INSERT', {}, Exception('database is locked'))
+    with monkeypatch.context() as patch:
+        patch.setattr(score_writer, 'insert_scores', unavailable)
+        with pytest.raises(OperationalError):
+            writer.flush()
+
+    assert [pending['submission_id'] for pending in writer.pending_for_user(user_id)] == [row['submission_id']]
+    journals = os.listdir(Config.SCORE_JOURNAL_DIR)
+    assert len(journals) == 1 and journals[0].endswith('.journal')
+    with open(os.path.join(Config.SCORE_JOURNAL_DIR, journals[0])) as journal:
+        assert [json.loads(line)['submission_id'] for line in journal] == [row['submission_id']]
+
+    assert writer.flush() == 1
+    assert _stored_ids() == [row['submission_id']]
+
+
+def test_failure_in_row_by_row_fallback_requeues_only_rows_not_stored(quiz, writer, monkeypatch):
+    user_id, quiz_id = quiz
+    first = writer.submit(quiz_id, user_id, 2)
+    writer.submit(quiz_id, user_id, None)  # Forces the row-by-row fallback
+    last = writer.submit(quiz_id, user_id, 5)
+
+    insert = score_writer.insert_scores
+
+    def locked_at_last(rows):
+        if len(rows) == 1 and rows[0]['submission_id'] == last['submission_id']:
+            raise OperationalError('INSERT', {}, Exception('database is locked'))
+        return insert(rows)
+    with monkeypatch.context() as patch:
+        patch.setattr(score_writer, 'insert_scores', locked_at_last)
+        with pytest.raises(OperationalError):
+            writer.flush()
+
+    assert _stored_ids() == [first['submission_id']]
+    assert [pending['submission_id'] for pending in writer.pending_for_user(user_id)] == [last['submission_id']]
+    assert writer.flush() == 1
+    assert _stored_ids() == sorted([first['submission_id'], last['submission_id']])
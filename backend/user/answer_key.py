@@ -0,0 +1,56 @@
+from cache import LRUCache
+from config import Config
+from extensions import db
+from models.model import Quiz, Question
+from signals import quiz_questions_changed, quiz_version
+
+# quiz_id -> (quiz version, {question_id: correct_option}), shared by every submission for that quiz
+answer_key_cache = LRUCache(
+    max_size=Config.ANSWER_KEY_CACHE_MAX_SIZE,
+    ttl=Config.ANSWER_KEY_CACHE_TTL,
+)
+
+
+def get_answer_key(quiz_id):
+    """Return the answer key for a quiz, or ``None`` if the quiz does not exist."""
+    # An edit committed on another worker moves the shared version, never grade with the old key
+    version = quiz_version(quiz_id)
+    cached = answer_key_cache.get(quiz_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None or quiz.deleted_at is not None:
+        return None
+    rows = db.session.query(Question.id, Question.correct_option) \
+        .filter(Question.quiz_id == quiz_id) \
+        .order_by(Question.id) \
+        .all()
+    answer_key = {question_id: correct_option for question_id, correct_option in rows}
+    answer_key_cache.set(quiz_id, (version, answer_key))
+    return answer_key
+
+
+@quiz_questions_changed.connect
+def invalidate_answer_key(quiz_id):
+    answer_key_cache.delete(quiz_id)
+
+
+def grade_answers(answer_key, answers):
+    """Grade ``{question_id: selected_option}`` against an answer key in one pass.
+
+    Unanswered questions count as incorrect. Returns the total and the
+    per-question results in question order.
+    """
+    results = []
+    total_scored = 0
+    for question_id, correct_option in answer_key.items():
+        selected_option = answers.get(question_id)
+        correct = selected_option == correct_option
+        total_scored += correct
+        results.append({
+            "question_id": question_id,
+            "selected_option": selected_option,
+            "correct": correct
+        })
+    return total_scored, results
+
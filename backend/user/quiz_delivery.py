@@ -0,0 +1,93 @@
+import hashlib
+import hmac
+import random
+
+from cache import LRUCache
+from config import Config
+from extensions import db
+from models.model import Quiz, Question
+from signals import quiz_questions_changed, quiz_version
+
+OPTION_COUNT = 4
+
+# quiz_id -> (quiz version, ((question_id, question_statement, (option1..option4)), ...) in id order)
+delivery_cache = LRUCache(
+    max_size=Config.QUIZ_DELIVERY_CACHE_MAX_SIZE,
+    ttl=Config.QUIZ_DELIVERY_CACHE_TTL,
+)
+
+
+def get_quiz_questions(quiz_id, version=None):
+    """Return the compact, answer-free question set of a quiz, or ``None`` if it does not exist.
+
+    Pass ``version`` when the caller already read the quiz's shared version.
+    """
+    if version is None:
+        version = quiz_version(quiz_id)
+    cached = delivery_cache.get(quiz_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None or quiz.deleted_at is not None:
+        return None
+    rows = db.session.query(
+        Question.id, Question.question_statement,
+        Question.option1, Question.option2, Question.option3, Question.option4
+    ).filter(Question.quiz_id == quiz_id).order_by(Question.id).all()
+    questions = tuple((row[0], row[1], tuple(row[2:])) for row in rows)
+    delivery_cache.set(quiz_id, (version, questions))
+    return questions
+
+
+@quiz_questions_changed.connect
+def invalidate_quiz_questions(quiz_id):
+    delivery_cache.delete(quiz_id)
+
+
+def _rng(*parts):
+    # Keyed with SECRET_KEY so students cannot predict each other's ordering
+    message = ':'.join(str(part) for part in parts).encode('utf-8')
+    digest = hmac.new(Config.SECRET_KEY.encode('utf-8'), message, hashlib.sha256).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def option_order(user_id, quiz_id, question_id):
+    """Original option indexes (0-based) in the order this user sees them."""
+    order = list(range(OPTION_COUNT))
+    _rng('options', quiz_id, user_id, question_id).shuffle(order)
+    return order
+
+
+def deliver_quiz(user_id, quiz_id):
+    """Return the user's permutation of the quiz, or ``None`` if the quiz does not exist.
+
+    Question order is seeded from (quiz, user) and each question's option
+    order from (quiz, user, question), so grading can rebuild the mapping for
+    any single question without storing a per-user copy.
+    """
+    questions = get_quiz_questions(quiz_id)
+    if questions is None:
+        return None
+
+    shuffled = list(questions)
+    _rng('questions', quiz_id, user_id).shuffle(shuffled)
+    delivered = []
+    for question_id, statement, options in shuffled:
+        order = option_order(user_id, quiz_id, question_id)
+        delivered.append({
+            "id": question_id,
+            "question_statement": statement,
+            "options": [options[i] for i in order]
+        })
+    return delivered
+
+
+def unshuffle_answers(user_id, quiz_id, answers):
+    """Map ``{question_id: displayed_option}`` (1-based) back to the stored option numbers."""
+    original = {}
+    for question_id, displayed_option in answers.items():
+        if not 1 <= displayed_option <= OPTION_COUNT:
+            raise ValueError(f'Option must be between 1 and {OPTION_COUNT}.')
+        order = option_order(user_id, quiz_id, question_id)
+        original[question_id] = order[displayed_option - 1] + 1
+    return original
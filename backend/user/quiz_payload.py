@@ -0,0 +1,98 @@
+import gzip
+import hashlib
+import json
+import threading
+
+from cache import LRUCache
+from config import Config
+from extensions import db
+from models.model import Quiz
+from signals import quiz_questions_changed, quiz_version
+from user.quiz_delivery import get_quiz_questions
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the optional brotli package is installed
+    brotli = None
+
+# quiz_id -> (quiz version, {"etag": str, "identity": bytes, "gzip": bytes, "br": bytes})
+payload_cache = LRUCache(
+    max_size=Config.QUIZ_PAYLOAD_CACHE_MAX_SIZE,
+    ttl=Config.QUIZ_PAYLOAD_CACHE_TTL,
+)
+
+# A fixed stripe of locks: quizzes that share one only wait on each other's (rare) builds
+_build_locks = [threading.Lock() for _ in range(64)]
+
+
+def _build_lock(quiz_id):
+    return _build_locks[quiz_id % len(_build_locks)]
+
+
+def _build_payload(quiz_id, version):
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None or quiz.deleted_at is not None:
+        return None
+    questions = get_quiz_questions(quiz_id, version)
+    body = json.dumps({
+        "quiz": {
+            "id": quiz.id,
+            "chapter_id": quiz.chapter_id,
+            "date_of_quiz": str(quiz.date_of_quiz),
+            "time_duration": str(quiz.time_duration),
+            "remarks": quiz.remarks
+        },
+        "questions": [{
+            "id": question_id,
+            "question_statement": statement,
+            "options": list(options)
+        } for question_id, statement, options in questions]
+    }, separators=(',', ':')).encode('utf-8')
+
+    payload = {
+        "etag": hashlib.sha1(body).hexdigest(),
+        "identity": body,
+        "gzip": gzip.compress(body, compresslevel=Config.QUIZ_PAYLOAD_GZIP_LEVEL),
+    }
+    if brotli is not None:
+        payload["br"] = brotli.compress(body)
+    return payload
+
+
+def get_quiz_payload(quiz_id):
+    """Return the pre-serialized student payload of a quiz, or ``None`` if it does not exist.
+
+    Only one request per quiz builds the payload; concurrent misses wait for
+    it instead of all serializing the same quiz at exam start. A payload
+    built before the quiz's shared version moved (an edit committed on any
+    worker) is rebuilt.
+    """
+    version = quiz_version(quiz_id)
+    cached = payload_cache.get(quiz_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    with _build_lock(quiz_id):
+        cached = payload_cache.get(quiz_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        payload = _build_payload(quiz_id, version)
+        if payload is not None:
+            payload_cache.set(quiz_id, (version, payload))
+    return payload
+
+
+def pick_encoding(accept_encodings, payload):
+    for encoding in ('br', 'gzip'):
+        if encoding in payload and accept_encodings[encoding]:
+            return encoding
+    return 'identity'
+
+
+def payload_etag(payload, encoding):
+    # Each content coding is a different representation, so each gets its own strong validator
+    return payload["etag"] if encoding == 'identity' else f'{payload["etag"]}-{encoding}'
+
+
+@quiz_questions_changed.connect
+def invalidate_quiz_payload(quiz_id):
+    payload_cache.delete(quiz_id)
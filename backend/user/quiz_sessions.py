@@ -0,0 +1,332 @@
+import heapq
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app
+from redis.exceptions import WatchError
+
+from config import Config
+from extensions import db, redis_client
+from models.model import Quiz
+from score_writer import submit_score
+from user.answer_key import get_answer_key, grade_answers
+
+
+class QuizSession:
+    """One timed attempt: when it started, when it ends and the answers saved so far."""
+
+    __slots__ = ('user_id', 'quiz_id', 'started_at', 'deadline', 'answers')
+
+    def __init__(self, user_id, quiz_id, started_at, deadline, answers=None):
+        self.user_id = user_id
+        self.quiz_id = quiz_id
+        self.started_at = started_at
+        self.deadline = deadline  # Epoch seconds, or None for an untimed quiz
+        self.answers = answers if answers is not None else {}  # question_id -> stored option number
+
+    def accepts(self, now):
+        # A short grace period absorbs autosaves that were in flight when time ran out
+        return self.deadline is None or now <= self.deadline + Config.QUIZ_SESSION_GRACE_SECONDS
+
+    def to_dict(self, now=None):
+        now = now or time.time()
+        return {
+            "quiz_id": self.quiz_id,
+            "started_at": datetime.utcfromtimestamp(self.started_at).isoformat(),
+            "deadline": datetime.utcfromtimestamp(self.deadline).isoformat() if self.deadline else None,
+            "remaining_seconds": max(0, round(self.deadline - now)) if self.deadline else None,
+            "answers": {str(question_id): option for question_id, option in self.answers.items()}
+        }
+
+
+class LocalSessionStore:
+    """Sessions in this process, with every deadline in one min-heap.
+
+    Untimed sessions have no deadline, so they are kept in a second heap and
+    dropped unscored QUIZ_SESSION_TTL_SECONDS after they started, as the Redis
+    store's key expiry does.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._sessions = {}  # (user_id, quiz_id) -> QuizSession
+        # (due, user_id, quiz_id, started_at); entries of sessions that already ended are skipped when popped
+        self._deadlines = []
+        self._expiries = []  # (expires_at, user_id, quiz_id, started_at) of untimed sessions
+        self._lock = threading.Lock()
+
+    def _is_current(self, user_id, quiz_id, started_at):
+        # A later attempt at the same quiz must not be ended by its predecessor's heap entry
+        session = self._sessions.get((user_id, quiz_id))
+        return session is not None and session.started_at == started_at
+
+    def start(self, session):
+        """Store ``session`` unless one is already running; returns ``(session, created)``."""
+        key = (session.user_id, session.quiz_id)
+        with self._lock:
+            existing = self._sessions.get(key)
+            if existing is not None:
+                return existing, False
+            self._sessions[key] = session
+            if session.deadline is not None:
+                heapq.heappush(self._deadlines, (session.deadline + Config.QUIZ_SESSION_GRACE_SECONDS,) + key +
+                               (session.started_at,))
+            else:
+                heapq.heappush(self._expiries, (session.started_at + Config.QUIZ_SESSION_TTL_SECONDS,) + key +
+                               (session.started_at,))
+        return session, True
+
+    def get(self, user_id, quiz_id):
+        return self._sessions.get((user_id, quiz_id))
+
+    def save_answers(self, user_id, quiz_id, answers, now):
+        with self._lock:
+            session = self._sessions.get((user_id, quiz_id))
+            if session is None or not session.accepts(now):
+                return None
+            session.answers.update(answers)
+            return session
+
+    def take(self, user_id, quiz_id):
+        # Whoever takes a session finalizes it, so a submit and the timer cannot both score it
+        with self._lock:
+            return self._sessions.pop((user_id, quiz_id), None)
+
+    def restore(self, session, retry_at):
+        # A taken session whose auto-submit failed goes back, to be retried at retry_at
+        key = (session.user_id, session.quiz_id)
+        with self._lock:
+            if self._sessions.setdefault(key, session) is session:
+                heapq.heappush(self._deadlines, (retry_at,) + key + (session.started_at,))
+
+    def due(self, now):
+        keys = []
+        with self._lock:
+            while self._expiries and self._expiries[0][0] <= now:
+                _, user_id, quiz_id, started_at = heapq.heappop(self._expiries)
+                if self._is_current(user_id, quiz_id, started_at):
+                    del self._sessions[(user_id, quiz_id)]
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, user_id, quiz_id, started_at = heapq.heappop(self._deadlines)
+                if self._is_current(user_id, quiz_id, started_at):
+                    keys.append((user_id, quiz_id))
+        return keys
+
+    def next_due(self):
+        with self._lock:
+            heads = [heap[0][0] for heap in (self._deadlines, self._expiries) if heap]
+            return min(heads) if heads else None
+
+
+class RedisSessionStore:
+    """Sessions shared by every worker: a hash per session plus one sorted set of deadlines.
+
+    Answers are hash fields (``a:<question_id>``), so an autosave writes only
+    what changed. Any worker's timer may claim a due session; ``take`` reads
+    and deletes the hash in one transaction, so exactly one of them scores it.
+    """
+
+    shared = True
+    _DEADLINES = 'quiz_sessions:deadlines'
+
+    @staticmethod
+    def _key(user_id, quiz_id):
+        return f'quiz_session:{user_id}:{quiz_id}'
+
+    @staticmethod
+    def _load(user_id, quiz_id, fields):
+        if not fields:
+            return None
+        fields = {key.decode(): value.decode() for key, value in fields.items()}
+        deadline = fields.get('deadline')
+        answers = {int(key[2:]): int(value) for key, value in fields.items() if key.startswith('a:')}
+        return QuizSession(user_id, quiz_id, float(fields['started_at']),
+                           float(deadline) if deadline else None, answers)
+
+    def _ttl(self, session):
+        # Kept a while past the deadline in case no timer is running to finalize it
+        return int((session.deadline or session.started_at) - session.started_at) + Config.QUIZ_SESSION_TTL_SECONDS
+
+    def start(self, session):
+        key = self._key(session.user_id, session.quiz_id)
+        if not redis_client.hsetnx(key, 'started_at', session.started_at):
+            return self.get(session.user_id, session.quiz_id), False
+        pipe = redis_client.pipeline()
+        if session.deadline is not None:
+            pipe.hset(key, 'deadline', session.deadline)
+            pipe.zadd(self._DEADLINES, {f'{session.user_id}:{session.quiz_id}':
+                                        session.deadline + Config.QUIZ_SESSION_GRACE_SECONDS})
+        pipe.expire(key, self._ttl(session))
+        pipe.execute()
+        return session, True
+
+    def get(self, user_id, quiz_id):
+        return self._load(user_id, quiz_id, redis_client.hgetall(self._key(user_id, quiz_id)))
+
+    def save_answers(self, user_id, quiz_id, answers, now):
+        key = self._key(user_id, quiz_id)
+        with redis_client.pipeline() as pipe:
+            # WATCH makes the write fail instead of recreating a session a timer just took
+            pipe.watch(key)
+            started_at, deadline = pipe.hmget(key, 'started_at', 'deadline')
+            if started_at is None:
+                return None
+            session = QuizSession(user_id, quiz_id, float(started_at), float(deadline) if deadline else None)
+            if not session.accepts(now):
+                return None
+            pipe.multi()
+            if answers:
+                pipe.hset(key, mapping={f'a:{question_id}': option for question_id, option in answers.items()})
+            try:
+                pipe.execute()
+            except WatchError:
+                return None
+        return session
+
+    def take(self, user_id, quiz_id):
+        key = self._key(user_id, quiz_id)
+        pipe = redis_client.pipeline(transaction=True)
+        pipe.hgetall(key)
+        pipe.delete(key)
+        pipe.zrem(self._DEADLINES, f'{user_id}:{quiz_id}')
+        fields, _, _ = pipe.execute()
+        return self._load(user_id, quiz_id, fields)
+
+    def restore(self, session, retry_at):
+        key = self._key(session.user_id, session.quiz_id)
+        # Only if the student has not started a new attempt since the take
+        if not redis_client.hsetnx(key, 'started_at', session.started_at):
+            return
+        fields = {f'a:{question_id}': option for question_id, option in session.answers.items()}
+        if session.deadline is not None:
+            fields['deadline'] = session.deadline
+        pipe = redis_client.pipeline()
+        if fields:
+            pipe.hset(key, mapping=fields)
+        pipe.zadd(self._DEADLINES, {f'{session.user_id}:{session.quiz_id}': retry_at})
+        pipe.expire(key, self._ttl(session))
+        pipe.execute()
+
+    def due(self, now):
+        members = redis_client.zrangebyscore(self._DEADLINES, '-inf', now, start=0, num=100)
+        return [tuple(int(part) for part in member.decode().split(':')) for member in members]
+
+    def next_due(self):
+        first = redis_client.zrange(self._DEADLINES, 0, 0, withscores=True)
+        return first[0][1] if first else None
+
+
+_local_store = LocalSessionStore()
+_redis_store = RedisSessionStore()
+
+
+def sessions_enabled():
+    return current_app.config['QUIZ_SESSIONS'] in ('redis', 'local')
+
+
+def session_store():
+    return _redis_store if current_app.config['QUIZ_SESSIONS'] == 'redis' else _local_store
+
+
+def quiz_duration(quiz):
+    """Time limit of ``quiz`` in seconds; zero means the quiz is untimed."""
+    return quiz.time_duration.hour * 3600 + quiz.time_duration.minute * 60 + quiz.time_duration.second
+
+
+def finalize_session(session, submitted_at=None):
+    """Grade a taken session and record its score; returns ``(score, results, total)`` or ``None``."""
+    answer_key = get_answer_key(session.quiz_id)
+    if answer_key is None:
+        return None  # The quiz was deleted while the attempt was running
+    total_scored, results = grade_answers(answer_key, session.answers)
+    score = submit_score(session.quiz_id, session.user_id, total_scored, submitted_at)
+    return score, results, len(answer_key)
+
+
+class SessionTimer:
+    """One thread per process that auto-submits sessions as their deadlines pass.
+
+    It sleeps until the earliest deadline (or until woken for an earlier one)
+    instead of keeping a timer per student. The thread starts lazily on the
+    first session request, so a preloading master never owns it.
+    """
+
+    def __init__(self):
+        self._app = None
+        self._thread = None
+        self._wakeup = threading.Condition()
+        self._woken = False  # Set by wake() so a wake during a tick is not lost before the wait
+
+    def ensure_running(self, app):
+        with self._wakeup:
+            if self._thread is None or not self._thread.is_alive():
+                self._app = app
+                self._thread = threading.Thread(target=self._run, name='quiz-session-timer', daemon=True)
+                self._thread.start()
+
+    def wake(self):
+        with self._wakeup:
+            self._woken = True
+            self._wakeup.notify()
+
+    def _run(self):
+        while True:
+            with self._app.app_context():
+                try:
+                    timeout = self._tick()
+                except Exception:
+                    self._app.logger.exception('Quiz session timer failed')
+                    timeout = Config.QUIZ_SESSION_POLL_SECONDS
+                finally:
+                    db.session.remove()
+            with self._wakeup:
+                if not self._woken:
+                    self._wakeup.wait(timeout)
+                self._woken = False
+
+    def _tick(self):
+        store = session_store()
+        for user_id, quiz_id in store.due(time.time()):
+            # One at a time, so a failure only delays that session and never the ones after it
+            session = None
+            try:
+                session = store.take(user_id, quiz_id)
+                if session is not None:
+                    finalize_session(session, submitted_at=datetime.utcfromtimestamp(session.deadline))
+            except Exception:
+                self._app.logger.exception('Auto-submitting quiz session %s:%s failed', user_id, quiz_id)
+                db.session.rollback()
+                if session is not None:
+                    store.restore(session, time.time() + Config.QUIZ_SESSION_RETRY_SECONDS)
+
+        next_due = store.next_due()
+        timeout = None if next_due is None else max(0.0, next_due - time.time())
+        if store.shared:
+            # Other workers add deadlines this thread is never told about
+            timeout = min(timeout if timeout is not None else Config.QUIZ_SESSION_POLL_SECONDS,
+                          Config.QUIZ_SESSION_POLL_SECONDS)
+        return timeout
+
+
+session_timer = SessionTimer()
+
+
+def start_session(user_id, quiz_id):
+    """Start (or resume) the user's attempt; returns ``(session, created)`` or ``None`` if the quiz is missing."""
+    store = session_store()
+    session_timer.ensure_running(current_app._get_current_object())
+    existing = store.get(user_id, quiz_id)
+    if existing is not None:
+        return existing, False
+
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None or quiz.deleted_at is not None:
+        return None
+    now = time.time()
+    duration = quiz_duration(quiz)
+    session, created = store.start(QuizSession(user_id, quiz_id, now, now + duration if duration else None))
+    if created:
+        session_timer.wake()
+    return session, created
@@ -0,0 +1,254 @@
+import time
+from datetime import datetime
+
+from flask import Blueprint, request, jsonify, current_app
+from models.model import Score, ArchivedScore, Quiz, db
+from archive import ensure_archive_schema, serialize_archived_score
+from auth.auth_middleware import token_required
+from user.answer_key import get_answer_key, grade_answers
+from user.quiz_delivery import OPTION_COUNT, deliver_quiz, unshuffle_answers
+from user.quiz_payload import get_quiz_payload, payload_etag, pick_encoding
+from score_writer import score_writer, submit_score
+from user.quiz_sessions import finalize_session, quiz_duration, session_store, sessions_enabled, start_session
+
+
+user_bp = Blueprint('user', __name__)
+
+
+def _submitted_score(score, total_questions, results):
+    # "id" is null while the score is still buffered; "submission_id" identifies it either way
+    return {
+        "id": score["id"],
+        "submission_id": score["submission_id"],
+        "pending": score["pending"],
+        "quiz_id": score["quiz_id"],
+        "total_scored": score["total_scored"],
+        "total_questions": total_questions,
+        "time_stamp_of_attempt": score["time_stamp_of_attempt"],
+        "results": results
+    }
+
+
+def _sessions_disabled():
+    return jsonify({"message": "Timed quiz sessions are not enabled."}), 404
+
+
+def _submit_session(session, now):
+    # Past the deadline the answers saved in time are graded, as the timer would have
+    submitted_at = datetime.utcfromtimestamp(min(now, session.deadline) if session.deadline else now)
+    finalized = finalize_session(session, submitted_at=submitted_at)
+    if finalized is None:
+        return jsonify({"message": "Quiz not found."}), 404
+
+    score, results, total_questions = finalized
+    return jsonify({"message": "Quiz submitted successfully.",
+                    "score": _submitted_score(score, total_questions, results)}), 201
+
+
+@user_bp.route('/quizzes/<int:quiz_id>', methods=['GET'])
+@token_required
+def get_quiz(current_user, quiz_id):
+    payload = get_quiz_payload(quiz_id)
+    if payload is None:
+        return jsonify({"message": "Quiz not found."}), 404
+
+    encoding = pick_encoding(request.accept_encodings, payload)
+    etag = payload_etag(payload, encoding)
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+        response.headers['Vary'] = 'Accept-Encoding'
+        response.set_etag(etag)
+        return response
+
+    # The body is already serialized and compressed; send the bytes as they are
+    response = current_app.response_class(payload[encoding], mimetype='application/json')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.set_etag(etag)
+    return response
+
+
+@user_bp.route('/quizzes/<int:quiz_id>/questions', methods=['GET'])
+@token_required
+def get_shuffled_quiz(current_user, quiz_id):
+    questions = deliver_quiz(current_user.id, quiz_id)
+    if questions is None:
+        return jsonify({"message": "Quiz not found."}), 404
+
+    # Options are numbered 1-4 in the order shown; submit with "shuffled": true
+    return jsonify({"quiz_id": quiz_id, "shuffled": True, "questions": questions}), 200
+
+
+@user_bp.route('/quizzes/<int:quiz_id>/submit', methods=['POST'])
+@token_required
+def submit_quiz(current_user, quiz_id):
+    data = request.get_json() or {}
+    raw_answers = data.get('answers')
+
+    # Answers are sent as {"<question_id>": <selected_option>}
+    if not isinstance(raw_answers, dict):
+        return jsonify({"message": "answers must be an object of question_id to option."}), 400
+    try:
+        answers = {int(question_id): int(option) for question_id, option in raw_answers.items()}
+    except (TypeError, ValueError):
+        return jsonify({"message": "Question ids and options must be integers."}), 400
+
+    # Answers picked from the shuffled delivery refer to displayed positions
+    if data.get('shuffled'):
+        try:
+            answers = unshuffle_answers(current_user.id, quiz_id, answers)
+        except ValueError as e:
+            return jsonify({"message": str(e)}), 400
+
+    answer_key = get_answer_key(quiz_id)
+    if answer_key is None:
+        return jsonify({"message": "Quiz not found."}), 404
+
+    unknown = set(answers) - set(answer_key)
+    if unknown:
+        return jsonify({"message": "Some questions do not belong to this quiz.",
+                        "question_ids": sorted(unknown)}), 400
+
+    quiz = db.session.get(Quiz, quiz_id) if sessions_enabled() else None
+    if quiz is not None and quiz_duration(quiz):
+        # A timed quiz is only graded through its session, so its deadline cannot be skipped
+        session = session_store().take(current_user.id, quiz_id)
+        if session is None:
+            return jsonify({"message": "This quiz is timed; start a session first. "
+                                       "A running session may have been submitted when time ran out."}), 409
+        now = time.time()
+        if session.accepts(now):
+            session.answers.update(answers)
+        return _submit_session(session, now)
+
+    total_scored, results = grade_answers(answer_key, answers)
+
+    score = submit_score(quiz_id, current_user.id, total_scored)
+    return jsonify({"message": "Quiz submitted successfully.",
+                    "score": _submitted_score(score, len(answer_key), results)}), 201
+
+
+# timed quiz sessions-----------------------
+@user_bp.route('/quizzes/<int:quiz_id>/session', methods=['POST'])
+@token_required
+def start_quiz_session(current_user, quiz_id):
+    if not sessions_enabled():
+        return _sessions_disabled()
+    started = start_session(current_user.id, quiz_id)
+    if started is None:
+        return jsonify({"message": "Quiz not found."}), 404
+
+    session, created = started
+    return jsonify({"session": session.to_dict()}), 201 if created else 200
+
+
+@user_bp.route('/quizzes/<int:quiz_id>/session', methods=['GET'])
+@token_required
+def get_quiz_session(current_user, quiz_id):
+    if not sessions_enabled():
+        return _sessions_disabled()
+    session = session_store().get(current_user.id, quiz_id)
+    if session is None:
+        return jsonify({"message": "No running session for this quiz."}), 404
+
+    return jsonify({"session": session.to_dict()}), 200
+
+
+@user_bp.route('/quizzes/<int:quiz_id>/session/answers', methods=['PATCH'])
+@token_required
+def autosave_quiz_answers(current_user, quiz_id):
+    if not sessions_enabled():
+        return _sessions_disabled()
+    data = request.get_json() or {}
+    raw_answers = data.get('answers')
+
+    # Only the answers that changed since the last autosave need to be sent
+    if not isinstance(raw_answers, dict):
+        return jsonify({"message": "answers must be an object of question_id to option."}), 400
+    try:
+        answers = {int(question_id): int(option) for question_id, option in raw_answers.items()}
+    except (TypeError, ValueError):
+        return jsonify({"message": "Question ids and options must be integers."}), 400
+
+    try:
+        if data.get('shuffled'):
+            answers = unshuffle_answers(current_user.id, quiz_id, answers)
+        elif any(not 1 <= option <= OPTION_COUNT for option in answers.values()):
+            raise ValueError(f'Option must be between 1 and {OPTION_COUNT}.')
+    except ValueError as e:
+        return jsonify({"message": str(e)}), 400
+
+    answer_key = get_answer_key(quiz_id)
+    if answer_key is None:
+        return jsonify({"message": "Quiz not found."}), 404
+    unknown = set(answers) - set(answer_key)
+    if unknown:
+        return jsonify({"message": "Some questions do not belong to this quiz.",
+                        "question_ids": sorted(unknown)}), 400
+
+    now = time.time()
+    session = session_store().save_answers(current_user.id, quiz_id, answers, now)
+    if session is None:
+        return jsonify({"message": "No running session for this quiz; it may have been submitted when time ran out."}), 409
+
+    return jsonify({"saved": len(answers),
+                    "remaining_seconds": max(0, round(session.deadline - now)) if session.deadline else None}), 200
+
+
+@user_bp.route('/quizzes/<int:quiz_id>/session/submit', methods=['POST'])
+@token_required
+def submit_quiz_session(current_user, quiz_id):
+    if not sessions_enabled():
+        return _sessions_disabled()
+    session = session_store().take(current_user.id, quiz_id)
+    if session is None:
+        return jsonify({"message": "No running session for this quiz; it may have been submitted when time ran out."}), 409
+    return _submit_session(session, time.time())
+
+
+@user_bp.route('/scores', methods=['GET'])
+@token_required
+def get_my_scores(current_user):
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({"message": "limit must be an integer."}), 400
+    if not 1 <= limit <= 500:
+        return jsonify({"message": "limit must be between 1 and 500."}), 400
+
+    scores = Score.query.filter(Score.user_id == current_user.id, Score.deleted_at.is_(None)) \
+        .order_by(Score.time_stamp_of_attempt.desc()).limit(limit).all()
+    results = [{
+        "id": score.id,
+        "quiz_id": score.quiz_id,
+        "user_id": score.user_id,
+        "total_scored": score.total_scored,
+        "time_stamp_of_attempt": score.time_stamp_of_attempt.isoformat() if score.time_stamp_of_attempt else None,
+        "archived": False
+    } for score in scores]
+
+    # Read-your-writes: the caller's own submissions still waiting in the write-behind buffer
+    stored = {score.submission_id for score in scores}
+    pending = [{
+        "id": None,
+        "quiz_id": row["quiz_id"],
+        "user_id": row["user_id"],
+        "total_scored": row["total_scored"],
+        "time_stamp_of_attempt": row["time_stamp_of_attempt"],
+        "archived": False,
+        "pending": True
+    } for row in score_writer.pending_for_user(current_user.id) if row["submission_id"] not in stored]
+    if pending:
+        results = sorted(pending + results, key=lambda score: score["time_stamp_of_attempt"] or '',
+                         reverse=True)[:limit]
+
+    # History moved out by the archiver is only read when asked for
+    if request.args.get('include_archived') in ('1', 'true') and len(results) < limit:
+        ensure_archive_schema()
+        archived = ArchivedScore.query \
+            .filter(ArchivedScore.user_id == current_user.id, ArchivedScore.deleted_at.is_(None)) \
+            .order_by(ArchivedScore.time_stamp_of_attempt.desc()).limit(limit - len(results)).all()
+        results += [serialize_archived_score(score) for score in archived]
+
+    return jsonify({"scores": results}), 200